@@ -892,16 +892,37 @@ const isNode = typeof module !== 'undefined' && module.exports;
     // ============================================
     // Calculate Route (Multi-Stop Water-Based Routing)
     // ============================================
-    function calculateRoute() {
+    function showRoutingProgress(message = null) {
+        elements.calculateBtn.textContent = message || 'Calculate Route';
+        if (message) {
+            elements.calculateBtn.setAttribute('aria-busy', 'true');
+        } else {
+            elements.calculateBtn.removeAttribute('aria-busy');
+        }
+    }
+
+    async function calculateRoute() {
         // Filter to only valid (selected) stops
         const validStops = state.stops.filter(id => id);
 
         if (validStops.length < 2) {
+            RoutingService.cancel();
+            showRoutingProgress();
             showToast('Please select at least a start and destination', 'error');
             clearRoute();
             return;
         }
 
+        // Route every leg in the routing worker (see routing-service.js);
+        // a newer request cancels this one and resolves it with null
+        showRoutingProgress('Routing…');
+        const routeResults = await RoutingService.route(validStops, (legsDone, legs) => {
+            showRoutingProgress(`Routing ${legsDone} of ${legs}…`);
+        });
+        if (!routeResults) return;
+
+        showRoutingProgress();
+
         let totalDistanceKm = 0;
         let allCoordinates = [];
         const legs = [];  // Store leg information for itinerary
@@ -913,8 +934,8 @@ const isNode = typeof module !== 'undefined' && module.exports;
 
             if (!startPoi || !endPoi) continue;
 
-            // Calculate water-based route for this segment
-            const routeResult = calculateWaterRoute(validStops[i], validStops[i + 1]);
+            // Water-based route for this segment
+            const routeResult = routeResults[i];
 
             let segmentDistanceKm;
             if (routeResult && !routeResult.isFallback) {
@@ -1316,11 +1337,11 @@ const isNode = typeof module !== 'undefined' && module.exports;
                 const draft = parseFloat(draftSlider.value);
                 const margin = parseFloat(marginSlider.value);
 
-                if (typeof updateVesselSettings === 'function') {
-                    const result = updateVesselSettings(draft, margin);
+                if (typeof RoutingService !== 'undefined') {
+                    const result = RoutingService.setVessel(draft, margin);
                     showToast(`Vessel settings updated: ${result.minimumDepth.toFixed(1)}m minimum depth`, 'success');
                 } else {
-                    console.error('updateVesselSettings function not available');
+                    console.error('RoutingService not available');
                 }
             });
         }
@@ -1727,6 +1748,11 @@ ${JSON.stringify(poiData, null, 2)}
             await initializeData();
             console.log('POI data loaded successfully, count:', POINTS_OF_INTEREST.length);
 
+            // Start the routing worker; it loads routing data in the background
+            if (typeof RoutingService !== 'undefined') {
+                RoutingService.init(POINTS_OF_INTEREST);
+            }
+
             // Load saved preferences
             loadPreferences();
             console.log('Preferences loaded');
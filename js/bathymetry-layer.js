@@ -12,7 +12,7 @@ let lakeBoundaryLayer = null;
  * @returns {L.HeatLayer} Heatmap layer
  */
 function createBathymetryLayer(map) {
-    if (!DEPTH_GRID || DEPTH_GRID.size === 0) {
+    if (!DEPTH_GRID || DEPTH_GRID.length === 0) {
         console.warn('No depth data available for bathymetry layer');
         return null;
     }
@@ -24,20 +24,24 @@ function createBathymetryLayer(map) {
     let minDepth = Infinity;
     let maxDepth = -Infinity;
 
-    for (const [coordKey, depth] of DEPTH_GRID.entries()) {
-        // Parse coordinates from key (format: "lat,lng")
-        const [latStr, lngStr] = coordKey.split(',');
-        const lat = parseFloat(latStr);
-        const lng = parseFloat(lngStr);
+    for (const grid of DEPTH_GRID) {
+        for (let i = 0; i < grid.depths.length; i++) {
+            if (grid.depths[i] === grid.nodata) continue;
 
-        // Only include depths > 2 feet (0.6m)
-        if (depth >= 0.6) {
-            minDepth = Math.min(minDepth, depth);
-            maxDepth = Math.max(maxDepth, depth);
+            // Lattice cell center from row-major index
+            const depth = grid.depths[i] / DEPTH_GRID_SCALE;
+            const lat = grid.south + Math.floor(i / grid.cols) * grid.latStep;
+            const lng = grid.west + (i % grid.cols) * grid.lngStep;
 
-            // Normalize depth for heatmap intensity (0-1)
-            // We'll normalize after we know min/max
-            heatmapData.push([lat, lng, depth]);
+            // Only include depths > 2 feet (0.6m)
+            if (depth >= 0.6) {
+                minDepth = Math.min(minDepth, depth);
+                maxDepth = Math.max(maxDepth, depth);
+
+                // Normalize depth for heatmap intensity (0-1)
+                // We'll normalize after we know min/max
+                heatmapData.push([lat, lng, depth]);
+            }
         }
     }
 
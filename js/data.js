@@ -309,8 +309,10 @@ let POINTS_OF_INTEREST = [];
 
 /**
  * Transform a JSON POI object to the app's internal format
+ * @param {Object} jsonPoi - POI from lake_champlain_pois.json
+ * @param {Object} [waterSnap] - Water snap table metadata from the same file
  */
-function transformPoi(jsonPoi) {
+function transformPoi(jsonPoi, waterSnap = null) {
     // Determine the type based on category and subcategory
     let type = CATEGORY_MAP[jsonPoi.category] || 'historic';
 
@@ -352,6 +354,12 @@ function transformPoi(jsonPoi) {
         amenities: amenities
     };
 
+    // Routing graph node the POI snaps to for each minimum depth
+    // (see poiGridPoint() in navigation.js)
+    if (waterSnap && Array.isArray(jsonPoi.waterSnap)) {
+        poi.waterSnap = { ...waterSnap, entries: jsonPoi.waterSnap };
+    }
+
     // Add fuel details if present
     if (jsonPoi.details?.fuel) {
         poi.fuel = {
@@ -563,7 +571,7 @@ async function loadPoisFromJson() {
         }
 
         // Transform each POI
-        POINTS_OF_INTEREST = data.pois.map(transformPoi);
+        POINTS_OF_INTEREST = data.pois.map(jsonPoi => transformPoi(jsonPoi, data.waterSnap));
 
         console.log(`Loaded ${POINTS_OF_INTEREST.length} points of interest`);
 
@@ -586,15 +594,24 @@ async function loadPoisFromJson() {
  * Returns a promise that resolves when data is ready
  */
 async function initializeData() {
-    // Load POI data, water boundaries, and depth data in parallel
+    // With a routing worker (see js/routing-service.js) the routing data and
+    // water grid live in the worker; the page only needs boundaries and depths
+    const routesInWorker = typeof RoutingService !== 'undefined' && RoutingService.supported();
+
+    // Load POI data, water boundaries, depth data, navigability masks, shore distances and routing data in parallel
     await Promise.all([
         loadPoisFromJson(),
         typeof loadWaterBoundaries === 'function' ? loadWaterBoundaries() : Promise.resolve(),
-        typeof loadDepthData === 'function' ? loadDepthData() : Promise.resolve()
+        typeof loadDepthData === 'function' ? loadDepthData() : Promise.resolve(),
+        !routesInWorker && typeof loadNavigabilityMasks === 'function' ? loadNavigabilityMasks() : Promise.resolve(),
+        !routesInWorker && typeof loadShoreDistance === 'function' ? loadShoreDistance() : Promise.resolve(),
+        !routesInWorker && typeof loadRoutingGraph === 'function' ? loadRoutingGraph() : Promise.resolve(),
+        !routesInWorker && typeof loadLandmarkTable === 'function' ? loadLandmarkTable() : Promise.resolve(),
+        !routesInWorker && typeof loadRouteHierarchy === 'function' ? loadRouteHierarchy() : Promise.resolve()
     ]);
 
     // Generate water grid after boundaries are loaded
-    if (typeof generateWaterGrid === 'function') {
+    if (!routesInWorker && typeof generateWaterGrid === 'function') {
         // Small delay to ensure all data is ready
         setTimeout(() => {
             generateWaterGrid();
@@ -634,6 +651,7 @@ if (typeof module !== 'undefined' && module.exports) {
         POINTS_OF_INTEREST,
         TYPE_CONFIG,
         UNIT_CONVERSIONS,
+        transformPoi,
         loadPoisFromJson,
         initializeData
     };
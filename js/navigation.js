@@ -16,7 +16,7 @@ const isNodeNav = typeof module !== 'undefined' && module.exports;
 // with support for islands (polygon holes) and multiple water bodies
 
 let WATER_BOUNDARIES = null;
-let DEPTH_GRID = null;  // Bathymetric depth data
+let DEPTH_GRID = null;  // Bathymetric depth lattices (see loadDepthData)
 
 // User vessel settings for depth-based routing
 // Defaults optimized for Lake Champlain recreational boats
@@ -34,14 +34,18 @@ function updateVesselSettings(draftMeters, marginMeters) {
 
     console.log(`Updated vessel settings: draft=${VESSEL_DRAFT}m, safety=${SAFETY_MARGIN}m, minimum depth=${(VESSEL_DRAFT + SAFETY_MARGIN).toFixed(1)}m`);
 
-    // Clear grid to force regeneration
+    // Clear the filtered grid; waterCells are kept, so regeneration only
+    // swaps in the navigability mask for the new minimum depth
     waterGrid = null;
     gridIndex = null;
-    spatialIndex = null;
 
     // Regenerate grid with new settings
     generateWaterGrid();
 
+    // Fetch the route hierarchy for the new minimum depth in the background;
+    // findPath() routes flat until it arrives
+    loadRouteHierarchy();
+
     return {
         draft: VESSEL_DRAFT,
         safety: SAFETY_MARGIN,
@@ -49,22 +53,179 @@ function updateVesselSettings(draftMeters, marginMeters) {
     };
 }
 
+/**
+ * Binary depth grid layout (see scripts/depth_grid_binary.py)
+ * 48-byte little-endian header followed by rows * cols int16 depths
+ * in decimetres, row-major with row 0 at the southern edge
+ */
+const DEPTH_GRID_MAGIC = 'DGRD';
+const DEPTH_GRID_VERSION = 1;
+const DEPTH_GRID_HEADER_BYTES = 48;
+const DEPTH_GRID_NODATA = -32768;
+const DEPTH_GRID_SCALE = 10;  // stored units per meter (decimetres)
+
+/**
+ * Depth in whole decimetres, rounded toward shallower water so that
+ * comparing against minimumDepthDecimetres() never admits a cell
+ * shallower than draft plus margin (to_decimetres() in depth_grid_binary.py)
+ * @param {number} depthMeters - Depth in meters
+ * @returns {number}
+ */
+function depthDecimetres(depthMeters) {
+    return Math.floor(depthMeters * DEPTH_GRID_SCALE + 1e-6);
+}
+
+/**
+ * Parse a binary depth grid into a lattice backed by an Int16Array
+ * @param {ArrayBuffer} buffer - Contents of a .bin depth grid
+ * @returns {Object} Lattice {south, west, latStep, lngStep, rows, cols, depths, nodata, count}
+ */
+function parseDepthGridBinary(buffer) {
+    const view = new DataView(buffer);
+    const magic = String.fromCharCode(
+        view.getUint8(0), view.getUint8(1), view.getUint8(2), view.getUint8(3)
+    );
+
+    if (magic !== DEPTH_GRID_MAGIC) {
+        throw new Error(`Not a depth grid (magic "${magic}")`);
+    }
+
+    const version = view.getUint16(4, true);
+    if (version !== DEPTH_GRID_VERSION) {
+        throw new Error(`Unsupported depth grid version ${version}`);
+    }
+
+    const rows = view.getUint32(8, true);
+    const cols = view.getUint32(12, true);
+    const depths = new Int16Array(buffer, DEPTH_GRID_HEADER_BYTES, rows * cols);
+    const nodata = view.getInt16(6, true);
+
+    let count = 0;
+    for (let i = 0; i < depths.length; i++) {
+        if (depths[i] !== nodata) count++;
+    }
+
+    return {
+        south: view.getFloat64(16, true),
+        west: view.getFloat64(24, true),
+        latStep: view.getFloat64(32, true),
+        lngStep: view.getFloat64(40, true),
+        rows,
+        cols,
+        depths,
+        nodata,
+        count
+    };
+}
+
+/**
+ * Build a depth lattice from the legacy JSON depth grid format
+ * @param {Object} data - Parsed depth grid JSON
+ * @returns {Object} Lattice in the same shape as parseDepthGridBinary()
+ */
+function depthGridFromJson(data) {
+    // Newer grids record their lattice and each point's row/col; older
+    // ones only record bounds on the GRID_CONFIG steps
+    const lattice = data.metadata.lattice || createGridLattice({
+        latStep: GRID_CONFIG.latStep,
+        lngStep: GRID_CONFIG.lngStep,
+        bounds: data.metadata.bounds
+    });
+    const { south, west, latStep, lngStep, rows, cols } = lattice;
+
+    const depths = new Int16Array(rows * cols).fill(DEPTH_GRID_NODATA);
+    let count = 0;
+
+    for (const point of Object.values(data.depth_grid)) {
+        const row = point.row !== undefined ? point.row : Math.round((point.lat - south) / latStep);
+        const col = point.col !== undefined ? point.col : Math.round((point.lng - west) / lngStep);
+        if (row >= 0 && row < rows && col >= 0 && col < cols) {
+            depths[row * cols + col] = depthDecimetres(point.depth);
+            count++;
+        }
+    }
+
+    return { south, west, latStep, lngStep, rows, cols, depths, nodata: DEPTH_GRID_NODATA, count };
+}
+
+/**
+ * Row/column offset of a depth lattice relative to another lattice
+ * @param {Object} lattice - Lattice the (row, col) being looked up refer to
+ * @param {Object} grid - Depth lattice
+ * @returns {Object|null} {rowOffset, colOffset}, or null if the grid lines don't coincide
+ */
+function latticeOffset(lattice, grid) {
+    if (grid.latStep !== lattice.latStep || grid.lngStep !== lattice.lngStep) return null;
+
+    const rowOffset = Math.round((lattice.south - grid.south) / grid.latStep);
+    const colOffset = Math.round((lattice.west - grid.west) / grid.lngStep);
+    const latError = Math.abs(grid.south + rowOffset * grid.latStep - lattice.south);
+    const lngError = Math.abs(grid.west + colOffset * grid.lngStep - lattice.west);
+
+    if (latError > 1e-9 || lngError > 1e-9) return null;
+    return { rowOffset, colOffset };
+}
+
+/**
+ * Look up water depth at a coordinate
+ * @param {number} lat - Latitude
+ * @param {number} lng - Longitude
+ * @returns {number|null} Depth in meters, or null where no depth data exists
+ */
+function getDepthAt(lat, lng) {
+    if (!DEPTH_GRID) return null;
+
+    for (const grid of DEPTH_GRID) {
+        const row = Math.round((lat - grid.south) / grid.latStep);
+        const col = Math.round((lng - grid.west) / grid.lngStep);
+
+        if (row < 0 || row >= grid.rows || col < 0 || col >= grid.cols) continue;
+
+        const value = grid.depths[row * grid.cols + col];
+        if (value !== grid.nodata) {
+            return value / DEPTH_GRID_SCALE;
+        }
+    }
+
+    return null;
+}
+
 /**
  * Load bathymetric depth data
+ * Prefers the compact binary grid and falls back to the JSON grid
  * @returns {Promise<void>}
  */
 async function loadDepthData() {
     const depthFiles = [
-        'data/depth/lake-champlain-depth-grid.json'
+        {
+            binary: 'data/depth/lake-champlain-depth-grid.bin',
+            json: 'data/depth/lake-champlain-depth-grid.json'
+        }
     ];
 
-    DEPTH_GRID = new Map();
+    DEPTH_GRID = [];
 
     for (const file of depthFiles) {
+        const startTime = performance.now();
+
         try {
-            const response = await fetch(file);
+            const response = await fetch(file.binary);
+            if (response.ok) {
+                const grid = parseDepthGridBinary(await response.arrayBuffer());
+                DEPTH_GRID.push(grid);
+
+                console.log(`Loaded bathymetric data: ${grid.count} points (${grid.rows}x${grid.cols} binary grid) in ${(performance.now() - startTime).toFixed(0)}ms`);
+                continue;
+            }
+            console.warn(`Could not load ${file.binary}: ${response.status} - trying JSON`);
+        } catch (error) {
+            console.warn(`Failed to load ${file.binary} - trying JSON:`, error);
+        }
+
+        try {
+            const response = await fetch(file.json);
             if (!response.ok) {
-                console.warn(`Could not load ${file}: ${response.status}`);
+                console.warn(`Could not load ${file.json}: ${response.status}`);
                 continue;
             }
 
@@ -74,25 +235,208 @@ async function loadDepthData() {
             console.log(`  Depth range: ${data.depth_statistics.min}m - ${data.depth_statistics.max}m`);
             console.log(`  Average depth: ${data.depth_statistics.mean}m`);
 
-            // Store depth data in Map using coordinate key for lookup
-            for (const [id, point] of Object.entries(data.depth_grid)) {
-                // Create coordinate key rounded to grid precision
-                const coordKey = `${point.lat.toFixed(6)},${point.lng.toFixed(6)}`;
-                DEPTH_GRID.set(coordKey, point.depth);
-            }
-
-            console.log(`  Depth data indexed by coordinates for fast lookup`);
+            DEPTH_GRID.push(depthGridFromJson(data));
 
         } catch (error) {
-            console.warn(`Failed to load ${file}:`, error);
+            console.warn(`Failed to load ${file.json}:`, error);
         }
     }
 
-    if (DEPTH_GRID.size === 0) {
+    if (DEPTH_GRID.length === 0) {
         console.warn('No depth data loaded - routing will use water/land only');
     }
 }
 
+/**
+ * Navigability mask layout (see scripts/navigability_masks.py)
+ * 56-byte little-endian header followed by one bit-packed mask per
+ * minimum depth threshold over the routing lattice
+ */
+const NAV_MASK_MAGIC = 'NAVM';
+const NAV_MASK_VERSION = 1;
+const NAV_MASK_HEADER_BYTES = 56;
+
+let NAVIGABILITY_MASKS = null;  // Precomputed per-draft masks (see loadNavigabilityMasks)
+
+/**
+ * Parse a navigability mask file
+ * @param {ArrayBuffer} buffer - Contents of a navigability .bin file
+ * @returns {Object} {south, west, latStep, lngStep, rows, cols, firstThreshold, thresholdStep, masks}
+ *   with thresholds in decimetres and one Uint8Array (8 cells per byte, LSB first) per threshold
+ */
+function parseNavigabilityMasks(buffer) {
+    const view = new DataView(buffer);
+    const magic = String.fromCharCode(
+        view.getUint8(0), view.getUint8(1), view.getUint8(2), view.getUint8(3)
+    );
+
+    if (magic !== NAV_MASK_MAGIC) {
+        throw new Error(`Not a navigability mask file (magic "${magic}")`);
+    }
+
+    const version = view.getUint16(4, true);
+    if (version !== NAV_MASK_VERSION) {
+        throw new Error(`Unsupported navigability mask version ${version}`);
+    }
+
+    const count = view.getUint16(6, true);
+    const rows = view.getUint32(12, true);
+    const cols = view.getUint32(16, true);
+    const maskBytes = Math.ceil(rows * cols / 8);
+
+    const masks = [];
+    for (let i = 0; i < count; i++) {
+        masks.push(new Uint8Array(buffer, NAV_MASK_HEADER_BYTES + i * maskBytes, maskBytes));
+    }
+
+    return {
+        south: view.getFloat64(20, true),
+        west: view.getFloat64(28, true),
+        latStep: view.getFloat64(36, true),
+        lngStep: view.getFloat64(44, true),
+        rows,
+        cols,
+        firstThreshold: view.getUint16(8, true),
+        thresholdStep: view.getUint16(10, true),
+        masks
+    };
+}
+
+/**
+ * Load precomputed navigability masks for the routing lattice
+ * Without them the grid falls back to polygon tests and depth lookups
+ * @returns {Promise<void>}
+ */
+async function loadNavigabilityMasks() {
+    const maskFile = 'data/depth/lake-champlain-navigability.bin';
+
+    try {
+        const response = await fetch(maskFile);
+        if (!response.ok) {
+            console.warn(`Could not load ${maskFile}: ${response.status}`);
+            return;
+        }
+
+        const masks = parseNavigabilityMasks(await response.arrayBuffer());
+        const offset = latticeOffset(GRID_LATTICE, masks);
+
+        if (!offset || offset.rowOffset !== 0 || offset.colOffset !== 0 ||
+            masks.rows !== GRID_LATTICE.rows || masks.cols !== GRID_LATTICE.cols) {
+            console.warn(`Ignoring ${maskFile}: lattice does not match GRID_CONFIG`);
+            return;
+        }
+
+        NAVIGABILITY_MASKS = masks;
+        console.log(`Loaded ${masks.masks.length} navigability masks`);
+    } catch (error) {
+        console.warn(`Failed to load ${maskFile}:`, error);
+    }
+}
+
+/**
+ * Minimum safe depth for the current vessel settings in whole decimetres
+ * (depth grids store decimetres, so this decides the same cells as metres)
+ * @returns {number}
+ */
+function minimumDepthDecimetres() {
+    return Math.ceil((VESSEL_DRAFT + SAFETY_MARGIN) * DEPTH_GRID_SCALE - 1e-6);
+}
+
+/**
+ * Precomputed navigability mask for a minimum depth
+ * @param {number} thresholdDm - Minimum depth in decimetres
+ * @returns {Uint8Array|null} Bit-packed mask, or null if none was precomputed
+ */
+function navigabilityMaskFor(thresholdDm) {
+    if (!NAVIGABILITY_MASKS) return null;
+
+    const { firstThreshold, thresholdStep, masks } = NAVIGABILITY_MASKS;
+    const index = (thresholdDm - firstThreshold) / thresholdStep;
+
+    if (!Number.isInteger(index) || index < 0 || index >= masks.length) return null;
+    return masks[index];
+}
+
+// ============================================
+// Shore Clearance
+// ============================================
+// Signed distance to shore over GRID_LATTICE in the depth grid layout
+// (see scripts/shore_distance.py): decimetres, positive in water
+let SHORE_DISTANCE = null;
+let clearanceCache = null;  // Per-node clearance factors (see shoreClearanceFactors)
+
+/**
+ * Load the distance-to-shore field
+ * Without it routes are costed on plain edge lengths
+ * @returns {Promise<void>}
+ */
+async function loadShoreDistance() {
+    const fieldFile = 'data/depth/lake-champlain-shore-distance.bin';
+
+    try {
+        const response = await fetch(fieldFile);
+        if (!response.ok) {
+            console.warn(`Could not load ${fieldFile}: ${response.status}`);
+            return;
+        }
+
+        const field = parseDepthGridBinary(await response.arrayBuffer());
+        const offset = latticeOffset(GRID_LATTICE, field);
+
+        if (!offset || offset.rowOffset !== 0 || offset.colOffset !== 0 ||
+            field.rows !== GRID_LATTICE.rows || field.cols !== GRID_LATTICE.cols) {
+            console.warn(`Ignoring ${fieldFile}: lattice does not match GRID_CONFIG`);
+            return;
+        }
+
+        SHORE_DISTANCE = field;
+        console.log('Loaded distance-to-shore field');
+    } catch (error) {
+        console.warn(`Failed to load ${fieldFile}:`, error);
+    }
+}
+
+/**
+ * Edge cost multiplier for entering water at a distance from shore
+ * Falls linearly from 1 + weight at the shoreline to 1 at
+ * ROUTING_CONFIG.shoreClearance.distance
+ * @param {number} distanceMeters - Distance to shore in meters
+ * @returns {number} Factor applied to the edge length
+ */
+function calculateClearanceFactor(distanceMeters) {
+    const clearance = ROUTING_CONFIG.shoreClearance;
+    if (!clearance.enabled) return 1;
+
+    const shortfall = Math.min(Math.max(1 - distanceMeters / clearance.distance, 0), 1);
+    return 1 + clearance.weight * shortfall;
+}
+
+/**
+ * Clearance factor of every routing graph node, computed once per graph,
+ * field and clearance settings
+ * @returns {Float64Array|null} Factors by node, or null to cost plain lengths
+ */
+function shoreClearanceFactors() {
+    const { enabled, distance, weight } = ROUTING_CONFIG.shoreClearance;
+    if (!enabled || !SHORE_DISTANCE || !ROUTING_GRAPH) return null;
+
+    if (!clearanceCache || clearanceCache.graph !== ROUTING_GRAPH || clearanceCache.field !== SHORE_DISTANCE ||
+        clearanceCache.distance !== distance || clearanceCache.weight !== weight) {
+        const { cells, nodeCount } = ROUTING_GRAPH;
+        const { depths, nodata } = SHORE_DISTANCE;
+        const factors = new Float64Array(nodeCount);
+
+        for (let node = 0; node < nodeCount; node++) {
+            const value = depths[cells[node]];
+            factors[node] = value === nodata ? 1 : calculateClearanceFactor(value / DEPTH_GRID_SCALE);
+        }
+
+        clearanceCache = { graph: ROUTING_GRAPH, field: SHORE_DISTANCE, distance, weight, factors };
+    }
+
+    return clearanceCache.factors;
+}
+
 /**
  * Load water boundary data from GeoJSON file(s)
  * Supports multi-polygon features with holes (islands)
@@ -195,6 +539,31 @@ const GRID_CONFIG = {
     }
 };
 
+/**
+ * Integer lattice covering a GRID_CONFIG-style {latStep, lngStep, bounds}
+ * Cell (row, col) is at (south + row * latStep, west + col * lngStep),
+ * the same formula as scripts/grid_lattice.py, so both sides agree on
+ * every cell without accumulating float steps.
+ * @param {Object} config - {latStep, lngStep, bounds: {south, north, west, east}}
+ * @returns {Object} Lattice {south, west, latStep, lngStep, rows, cols}
+ */
+function createGridLattice(config) {
+    const { south, north, west, east } = config.bounds;
+    const { latStep, lngStep } = config;
+
+    return {
+        south,
+        west,
+        latStep,
+        lngStep,
+        rows: Math.floor((north - south) / latStep + 1e-9) + 1,
+        cols: Math.floor((east - west) / lngStep + 1e-9) + 1
+    };
+}
+
+// Routing lattice (867 x 188 cells for GRID_CONFIG)
+const GRID_LATTICE = createGridLattice(GRID_CONFIG);
+
 /**
  * Routing configuration for pathfinding behavior
  */
@@ -208,6 +577,14 @@ const ROUTING_CONFIG = {
         verySharp: 0.80    // > 90°
     },
 
+    // Shore clearance: edges into water closer than distance (meters) to
+    // land cost up to (1 + weight) times their length (see loadShoreDistance)
+    shoreClearance: {
+        enabled: true,
+        distance: 400,
+        weight: 0.5
+    },
+
     // Path smoothing
     smoothing: {
         enabled: false,         // Disabled - rely on dense waypoints for visual smoothness
@@ -561,109 +938,876 @@ function calculateTurnCost(turnAngle) {
 }
 
 // ============================================
-// Grid Generation with Spatial Indexing
+// Routing Graph (compressed sparse rows)
+// ============================================
+/**
+ * Routing graph layout (see scripts/routing_graph.py)
+ * 56-byte little-endian header followed by typed node and edge arrays.
+ * Nodes are water cells of the routing lattice; the neighbours of node n
+ * are neighbors[offsets[n] .. offsets[n + 1] - 1] with edge lengths in km.
+ */
+const ROUTING_GRAPH_MAGIC = 'RGPH';
+const ROUTING_GRAPH_VERSION = 1;
+const ROUTING_GRAPH_HEADER_BYTES = 56;
+
+// Neighbour order shared with scripts/routing_graph.py (N, NE, E, SE, S, SW, W, NW)
+const GRID_DIRECTIONS = [
+    [-1, 0], [-1, 1], [0, 1], [1, 1],
+    [1, 0], [1, -1], [0, -1], [-1, -1]
+];
+
+let ROUTING_GRAPH = null;  // CSR water graph (see loadRoutingGraph)
+
+/**
+ * Parse a binary routing graph into typed arrays
+ * @param {ArrayBuffer} buffer - Contents of a routing graph .bin file
+ * @returns {Object} Graph {south, west, latStep, lngStep, rows, cols, nodeCount, edgeCount,
+ *   lats, lngs, cells, offsets, neighbors, lengths, depths, nodata}
+ */
+function parseRoutingGraph(buffer) {
+    const view = new DataView(buffer);
+    const magic = String.fromCharCode(
+        view.getUint8(0), view.getUint8(1), view.getUint8(2), view.getUint8(3)
+    );
+
+    if (magic !== ROUTING_GRAPH_MAGIC) {
+        throw new Error(`Not a routing graph (magic "${magic}")`);
+    }
+
+    const version = view.getUint16(4, true);
+    if (version !== ROUTING_GRAPH_VERSION) {
+        throw new Error(`Unsupported routing graph version ${version}`);
+    }
+
+    const nodeCount = view.getUint32(16, true);
+    const edgeCount = view.getUint32(20, true);
+
+    let offset = ROUTING_GRAPH_HEADER_BYTES;
+    function take(ArrayType, count) {
+        const array = new ArrayType(buffer, offset, count);
+        offset += count * ArrayType.BYTES_PER_ELEMENT;
+        return array;
+    }
+
+    return {
+        south: view.getFloat64(24, true),
+        west: view.getFloat64(32, true),
+        latStep: view.getFloat64(40, true),
+        lngStep: view.getFloat64(48, true),
+        rows: view.getUint32(8, true),
+        cols: view.getUint32(12, true),
+        nodeCount,
+        edgeCount,
+        lats: take(Float64Array, nodeCount),
+        lngs: take(Float64Array, nodeCount),
+        cells: take(Uint32Array, nodeCount),
+        offsets: take(Uint32Array, nodeCount + 1),
+        neighbors: take(Uint32Array, edgeCount),
+        lengths: take(Float32Array, edgeCount),
+        depths: take(Int16Array, nodeCount),
+        nodata: view.getInt16(6, true)
+    };
+}
+
+/**
+ * Load the prebuilt routing graph for the routing lattice
+ * Without it the graph is built from the water cells on first use
+ * @returns {Promise<void>}
+ */
+async function loadRoutingGraph() {
+    const graphFile = 'data/routing/lake-champlain-graph.bin';
+    const startTime = performance.now();
+
+    try {
+        const response = await fetch(graphFile);
+        if (!response.ok) {
+            console.warn(`Could not load ${graphFile}: ${response.status}`);
+            return;
+        }
+
+        const graph = parseRoutingGraph(await response.arrayBuffer());
+        const offset = latticeOffset(GRID_LATTICE, graph);
+
+        if (!offset || offset.rowOffset !== 0 || offset.colOffset !== 0 ||
+            graph.rows !== GRID_LATTICE.rows || graph.cols !== GRID_LATTICE.cols) {
+            console.warn(`Ignoring ${graphFile}: lattice does not match GRID_CONFIG`);
+            return;
+        }
+
+        ROUTING_GRAPH = graph;
+        console.log(`Loaded routing graph: ${graph.nodeCount} nodes, ${graph.edgeCount} edges in ${(performance.now() - startTime).toFixed(0)}ms`);
+    } catch (error) {
+        console.warn(`Failed to load ${graphFile}:`, error);
+    }
+}
+
+/**
+ * 32-bit FNV-1a hash of a routing graph's node depths, computed once per
+ * graph (RoutingGraph.depths_hash() in scripts/routing_graph.py)
+ * @param {Object} graph - Routing graph
+ * @returns {number}
+ */
+function routingGraphDepthsHash(graph) {
+    if (graph.depthsHash === undefined) {
+        const { depths } = graph;
+        const bytes = new Uint8Array(depths.buffer, depths.byteOffset, depths.byteLength);
+        let hash = 0x811c9dc5;
+        for (let i = 0; i < bytes.length; i++) {
+            hash = Math.imul(hash ^ bytes[i], 0x01000193) >>> 0;
+        }
+        graph.depthsHash = hash;
+    }
+
+    return graph.depthsHash;
+}
+
+/**
+ * Build the routing graph in the browser from water cells
+ * Fallback for when the prebuilt graph could not be loaded; produces
+ * the same layout as scripts/routing_graph.py
+ * @param {Array} cells - Water cells in row-major order
+ * @returns {Object} Graph in the same shape as parseRoutingGraph()
+ */
+function buildRoutingGraph(cells) {
+    const { south, west, latStep, lngStep, rows, cols } = GRID_LATTICE;
+    const nodeCount = cells.length;
+
+    const nodeOfCell = new Int32Array(rows * cols).fill(-1);
+    cells.forEach((point, node) => {
+        nodeOfCell[point.row * cols + point.col] = node;
+    });
+
+    const offsets = new Uint32Array(nodeCount + 1);
+    const neighborList = [];
+    const lengthList = [];
+
+    cells.forEach((point, node) => {
+        for (const [dr, dc] of GRID_DIRECTIONS) {
+            const r = point.row + dr;
+            const c = point.col + dc;
+            if (r < 0 || r >= rows || c < 0 || c >= cols) continue;
+
+            const neighbor = nodeOfCell[r * cols + c];
+            if (neighbor < 0) continue;
+
+            neighborList.push(neighbor);
+            lengthList.push(haversineDistance(point.lat, point.lng, cells[neighbor].lat, cells[neighbor].lng));
+        }
+        offsets[node + 1] = neighborList.length;
+    });
+
+    const depths = new Int16Array(nodeCount);
+    cells.forEach((point, node) => {
+        depths[node] = point.depth === null ? DEPTH_GRID_NODATA : depthDecimetres(point.depth);
+    });
+
+    return {
+        south, west, latStep, lngStep, rows, cols,
+        nodeCount,
+        edgeCount: neighborList.length,
+        lats: Float64Array.from(cells, point => point.lat),
+        lngs: Float64Array.from(cells, point => point.lng),
+        cells: Uint32Array.from(cells, point => point.row * cols + point.col),
+        offsets,
+        neighbors: Uint32Array.from(neighborList),
+        lengths: Float32Array.from(lengthList),
+        depths,
+        nodata: DEPTH_GRID_NODATA
+    };
+}
+
+// ============================================
+// ALT Landmark Heuristic
+// ============================================
+/**
+ * Landmark table layout (see scripts/routing_landmarks.py)
+ * 56-byte little-endian header, the landmark node indexes, then the
+ * cost in distance units from each landmark to every routing graph node
+ * (landmark major). Costs include turn penalties, so a router may use
+ * the table only if its own penalties are at least as large.
+ */
+const LANDMARK_MAGIC = 'ALTL';
+const LANDMARK_VERSION = 1;
+const LANDMARK_HEADER_BYTES = 56;
+const LANDMARK_UNREACHABLE = 0xFFFF;
+
+let LANDMARK_TABLE = null;  // ALT lower-bound costs (see loadLandmarkTable)
+
+/**
+ * Parse a binary landmark table into typed arrays
+ * @param {ArrayBuffer} buffer - Contents of a landmark table .bin file
+ * @returns {Object} Table {landmarkCount, nodeCount, edgeCount, unitKm, penalties,
+ *   landmarks, costs}
+ */
+function parseLandmarkTable(buffer) {
+    const view = new DataView(buffer);
+    const magic = String.fromCharCode(
+        view.getUint8(0), view.getUint8(1), view.getUint8(2), view.getUint8(3)
+    );
+
+    if (magic !== LANDMARK_MAGIC) {
+        throw new Error(`Not a landmark table (magic "${magic}")`);
+    }
+
+    const version = view.getUint16(4, true);
+    if (version !== LANDMARK_VERSION) {
+        throw new Error(`Unsupported landmark table version ${version}`);
+    }
+
+    const landmarkCount = view.getUint16(6, true);
+    const nodeCount = view.getUint32(8, true);
+
+    return {
+        landmarkCount,
+        nodeCount,
+        edgeCount: view.getUint32(12, true),
+        unitKm: view.getFloat64(16, true),
+        penalties: {
+            gentle: view.getFloat64(24, true),
+            moderate: view.getFloat64(32, true),
+            sharp: view.getFloat64(40, true),
+            verySharp: view.getFloat64(48, true)
+        },
+        landmarks: new Uint32Array(buffer, LANDMARK_HEADER_BYTES, landmarkCount),
+        costs: new Uint16Array(buffer, LANDMARK_HEADER_BYTES + 4 * landmarkCount, landmarkCount * nodeCount)
+    };
+}
+
+/**
+ * Load the landmark table for the routing graph
+ * Without it findPath() falls back to the haversine heuristic
+ * @returns {Promise<void>}
+ */
+async function loadLandmarkTable() {
+    const landmarkFile = 'data/routing/lake-champlain-landmarks.bin';
+
+    try {
+        const response = await fetch(landmarkFile);
+        if (!response.ok) {
+            console.warn(`Could not load ${landmarkFile}: ${response.status}`);
+            return;
+        }
+
+        LANDMARK_TABLE = parseLandmarkTable(await response.arrayBuffer());
+        console.log(`Loaded ${LANDMARK_TABLE.landmarkCount} routing landmarks`);
+    } catch (error) {
+        console.warn(`Failed to load ${landmarkFile}:`, error);
+    }
+}
+
+/**
+ * Whether the landmark table gives admissible bounds for a graph
+ * It must have been built for this graph with turn penalties no larger
+ * than ROUTING_CONFIG.turnPenalty
+ * @param {Object} table - Parsed landmark table
+ * @param {Object} graph - Routing graph
+ * @returns {boolean}
+ */
+function landmarkTableUsable(table, graph) {
+    if (!table || !graph ||
+        table.nodeCount !== graph.nodeCount || table.edgeCount !== graph.edgeCount) {
+        return false;
+    }
+
+    const penalties = Object.entries(table.penalties);
+    if (penalties.every(([, penalty]) => penalty === 0)) return true;
+
+    const turnPenalty = ROUTING_CONFIG.turnPenalty;
+    return turnPenalty.enabled && penalties.every(([name, penalty]) => turnPenalty[name] >= penalty);
+}
+
+/**
+ * Create the A* heuristic for routes ending at a grid point
+ * The larger of the haversine distance and, when the landmark table is
+ * usable, the ALT bound |d(L, end) - d(L, node)| over all landmarks L
+ * (less one distance unit for rounding and the largest turn penalty,
+ * since joining two paths adds at most one turn).
+ * @param {Object} endPoint - Target grid point
+ * @returns {Function} point => lower bound on the remaining cost (km)
+ */
+function createRouteHeuristic(endPoint) {
+    const straightLine = point => haversineDistance(point.lat, point.lng, endPoint.lat, endPoint.lng);
+
+    if (!landmarkTableUsable(LANDMARK_TABLE, ROUTING_GRAPH)) {
+        return straightLine;
+    }
+
+    const { landmarkCount, nodeCount, costs, unitKm, penalties } = LANDMARK_TABLE;
+    const slack = Math.max(penalties.gentle, penalties.moderate, penalties.sharp, penalties.verySharp);
+
+    const toEnd = new Int32Array(landmarkCount);
+    for (let k = 0; k < landmarkCount; k++) {
+        toEnd[k] = costs[k * nodeCount + endPoint.node];
+    }
+
+    return point => {
+        let best = 0;
+        for (let k = 0; k < landmarkCount; k++) {
+            const fromLandmark = costs[k * nodeCount + point.node];
+            if (toEnd[k] === LANDMARK_UNREACHABLE || fromLandmark === LANDMARK_UNREACHABLE) continue;
+
+            const units = Math.abs(toEnd[k] - fromLandmark) - 1;
+            if (units > best) best = units;
+        }
+        return Math.max(straightLine(point), best * unitKm - slack);
+    };
+}
+
+// ============================================
+// Hierarchical Routing (HPA*)
+// ============================================
+/**
+ * Route hierarchy layout (see scripts/routing_hierarchy.py)
+ * 32-byte little-endian header, the graph nodes of the cluster entrances,
+ * the abstract edges between them in CSR form (targets and costs), then
+ * the cached node path of every abstract edge. One file per minimum depth.
+ */
+const HIERARCHY_MAGIC = 'HPAG';
+const HIERARCHY_VERSION = 1;
+const HIERARCHY_HEADER_BYTES = 32;
+const HIERARCHY_MIN_DISTANCE_KM = 80;  // Shorter routes are searched flat (see routing_hierarchy.py)
+
+let ROUTE_HIERARCHY = null;  // Cluster abstraction for the current minimum depth (see loadRouteHierarchy)
+let clusterSearchState = null;   // Reused by every searchCluster() call (see reuseSearchState)
+let abstractSearchState = null;  // Reused by every findHierarchicalPath() call
+
+/**
+ * Parse a binary route hierarchy into typed arrays
+ * @param {ArrayBuffer} buffer - Contents of a route hierarchy .bin file
+ * @returns {Object} Hierarchy {minimumDepthDm, clusterSize, nodeCount, edgeCount,
+ *   entrances, offsets, targets, costs, pathOffsets, pathNodes}
+ */
+function parseRouteHierarchy(buffer) {
+    const view = new DataView(buffer);
+    const magic = String.fromCharCode(
+        view.getUint8(0), view.getUint8(1), view.getUint8(2), view.getUint8(3)
+    );
+
+    if (magic !== HIERARCHY_MAGIC) {
+        throw new Error(`Not a route hierarchy (magic "${magic}")`);
+    }
+
+    const version = view.getUint16(4, true);
+    if (version !== HIERARCHY_VERSION) {
+        throw new Error(`Unsupported route hierarchy version ${version}`);
+    }
+
+    const entranceCount = view.getUint32(20, true);
+    const abstractEdgeCount = view.getUint32(24, true);
+    const pathNodeCount = view.getUint32(28, true);
+
+    let offset = HIERARCHY_HEADER_BYTES;
+    const take = (ArrayType, count) => {
+        const array = new ArrayType(buffer, offset, count);
+        offset += array.byteLength;
+        return array;
+    };
+
+    return {
+        minimumDepthDm: view.getUint16(6, true),
+        clusterSize: view.getUint16(8, true),
+        nodeCount: view.getUint32(12, true),
+        edgeCount: view.getUint32(16, true),
+        entrances: take(Uint32Array, entranceCount),
+        offsets: take(Uint32Array, entranceCount + 1),
+        targets: take(Uint32Array, abstractEdgeCount),
+        costs: take(Float32Array, abstractEdgeCount),
+        pathOffsets: take(Uint32Array, abstractEdgeCount + 1),
+        pathNodes: take(Uint32Array, pathNodeCount)
+    };
+}
+
+/**
+ * Load the route hierarchy for the current minimum depth
+ * Only the common drafts have one; other drafts route flat
+ * @returns {Promise<void>}
+ */
+async function loadRouteHierarchy() {
+    const thresholdDm = minimumDepthDecimetres();
+    if (ROUTE_HIERARCHY && ROUTE_HIERARCHY.minimumDepthDm === thresholdDm) return;
+
+    const hierarchyFile = `data/routing/lake-champlain-hierarchy-${String(thresholdDm).padStart(2, '0')}dm.bin`;
+
+    try {
+        const response = await fetch(hierarchyFile);
+        if (!response.ok) {
+            console.log(`No route hierarchy for ${(thresholdDm / DEPTH_GRID_SCALE).toFixed(1)}m minimum depth - long routes use flat A*`);
+            return;
+        }
+
+        const hierarchy = parseRouteHierarchy(await response.arrayBuffer());
+
+        // Vessel settings may have changed while the file was loading
+        if (hierarchy.minimumDepthDm === minimumDepthDecimetres()) {
+            ROUTE_HIERARCHY = hierarchy;
+            console.log(`Loaded route hierarchy with ${hierarchy.entrances.length} cluster entrances`);
+        }
+    } catch (error) {
+        console.warn(`Failed to load ${hierarchyFile}:`, error);
+    }
+}
+
+/**
+ * Whether a route hierarchy fits the routing graph and current vessel
+ * @param {Object} hierarchy - Parsed route hierarchy
+ * @param {Object} graph - Routing graph
+ * @returns {boolean}
+ */
+function routeHierarchyUsable(hierarchy, graph) {
+    return Boolean(hierarchy && graph &&
+        hierarchy.nodeCount === graph.nodeCount && hierarchy.edgeCount === graph.edgeCount &&
+        hierarchy.minimumDepthDm === minimumDepthDecimetres());
+}
+
+/**
+ * Cluster of every graph node and entrance index of every entrance node,
+ * computed once per hierarchy
+ * @param {Object} hierarchy - Parsed route hierarchy
+ * @returns {Object} {clusters: Int32Array over nodes, clusterCount, entranceIndex: Map}
+ */
+function hierarchyIndex(hierarchy) {
+    if (!hierarchy.index) {
+        const { cells, nodeCount } = ROUTING_GRAPH;
+        const { rows, cols } = GRID_LATTICE;
+        const size = hierarchy.clusterSize;
+        const clusterCols = Math.ceil(cols / size);
+
+        const clusters = new Int32Array(nodeCount);
+        for (let node = 0; node < nodeCount; node++) {
+            const row = Math.floor(cells[node] / cols);
+            const col = cells[node] % cols;
+            clusters[node] = Math.floor(row / size) * clusterCols + Math.floor(col / size);
+        }
+
+        const entranceIndex = new Map();
+        hierarchy.entrances.forEach((node, k) => entranceIndex.set(node, k));
+
+        hierarchy.index = {
+            clusters,
+            clusterCount: Math.ceil(rows / size) * clusterCols,
+            entranceIndex
+        };
+    }
+
+    return hierarchy.index;
+}
+
+/**
+ * Grid point of a graph node, or undefined if it is not navigable
+ * @param {number} node - Routing graph node
+ * @returns {Object|undefined}
+ */
+function graphNodePoint(node) {
+    return waterGrid[gridIndex[ROUTING_GRAPH.cells[node]]];
+}
+
+/**
+ * Cheapest paths from a node that stay within its cluster
+ * Turn-aware Dijkstra with the same costs, open set and tie-breaking as
+ * findPath() (see searchWaterGrid)
+ * @param {number} source - Routing graph node
+ * @param {Int32Array} clusters - Cluster of every graph node
+ * @returns {Object} {settled, costs, cameFrom}: the settled nodes in settling
+ *   order, and per-node costs and predecessors (valid until the next call)
+ */
+function searchCluster(source, clusters) {
+    const { nodeCount, offsets, neighbors: targets, lengths } = ROUTING_GRAPH;
+    const clearance = shoreClearanceFactors();
+    const cluster = clusters[source];
+
+    clusterSearchState = reuseSearchState(clusterSearchState, nodeCount);
+    const state = clusterSearchState;
+    const { generation, visited, closed, gScore, fScore, cameFrom, order, heapPosition } = state;
+
+    visited[source] = generation;
+    gScore[source] = 0;
+    fScore[source] = 0;
+    cameFrom[source] = -1;
+    order[source] = state.inserted++;
+    openSetPush(state, source);
+
+    const settled = [];
+
+    while (state.heapSize > 0) {
+        const current = openSetPop(state);
+        closed[current] = generation;
+        settled.push(current);
+
+        const previous = cameFrom[current];
+        for (let edge = offsets[current]; edge < offsets[current + 1]; edge++) {
+            const neighbor = targets[edge];
+            if (closed[neighbor] === generation || clusters[neighbor] !== cluster || !graphNodePoint(neighbor)) continue;
+
+            let tentativeG = gScore[current] + (clearance ? lengths[edge] * clearance[neighbor] : lengths[edge]);
+            if (previous >= 0) {
+                tentativeG += calculateTurnCost(calculateTurnAngle(
+                    graphNodePoint(previous), graphNodePoint(current), graphNodePoint(neighbor)
+                ));
+            }
+
+            const reached = visited[neighbor] === generation;
+            if (!reached || tentativeG < gScore[neighbor]) {
+                gScore[neighbor] = tentativeG;
+                fScore[neighbor] = tentativeG;
+                cameFrom[neighbor] = current;
+
+                if (!reached) {
+                    visited[neighbor] = generation;
+                    order[neighbor] = state.inserted++;
+                    openSetPush(state, neighbor);
+                } else {
+                    openSetSiftUp(state, heapPosition[neighbor]);
+                }
+            }
+        }
+    }
+
+    return { settled, costs: gScore, cameFrom };
+}
+
+/**
+ * Node path from a searchCluster() source to a settled node
+ * @param {Int32Array} cameFrom - Predecessors from searchCluster()
+ * @param {number} node - Settled node
+ * @returns {Array<number>}
+ */
+function traceClusterPath(cameFrom, node) {
+    const path = [node];
+    while (cameFrom[path[path.length - 1]] >= 0) {
+        path.push(cameFrom[path[path.length - 1]]);
+    }
+    return path.reverse();
+}
+
+/**
+ * Turn penalty where node path outgoing continues node path incoming
+ * @param {Array<number>} incoming - Path ending where outgoing starts
+ * @param {Array<number>} outgoing - Path starting where incoming ends
+ * @returns {number} Cost penalty in km-equivalent
+ */
+function junctionTurnCost(incoming, outgoing) {
+    if (incoming.length < 2 || outgoing.length < 2) return 0;
+
+    return calculateTurnCost(calculateTurnAngle(
+        graphNodePoint(incoming[incoming.length - 2]),
+        graphNodePoint(outgoing[0]),
+        graphNodePoint(outgoing[1])
+    ));
+}
+
+/**
+ * Plan a route on the cluster hierarchy
+ * The start and end are linked to the entrances of their clusters by
+ * searchCluster(), A* over the abstract graph picks the entrances, and
+ * the cached intra-cluster paths are stitched into a node path. Turns
+ * where one cached path joins the next are charged as the search goes.
+ * @param {Object} startPoint - Start grid point
+ * @param {Object} endPoint - Target grid point
+ * @param {Function} heuristic - Lower bound on the remaining cost (see createRouteHeuristic)
+ * @returns {Array<number>|null} Graph nodes from start to end, or null
+ */
+function findHierarchicalPath(startPoint, endPoint, heuristic) {
+    const hierarchy = ROUTE_HIERARCHY;
+    const { clusters, entranceIndex } = hierarchyIndex(hierarchy);
+    const { entrances, offsets, targets, costs, pathOffsets, pathNodes } = hierarchy;
+
+    if (clusters[startPoint.node] === clusters[endPoint.node]) return null;
+
+    // Both cluster searches share one search state: read each before the next
+    const fromStart = searchCluster(startPoint.node, clusters);
+    const exits = [];
+    for (const node of fromStart.settled) {
+        if (entranceIndex.has(node)) {
+            exits.push([entranceIndex.get(node), fromStart.costs[node], traceClusterPath(fromStart.cameFrom, node)]);
+        }
+    }
+
+    const toEnd = searchCluster(endPoint.node, clusters);
+    const arrivals = new Map();
+    for (const node of toEnd.settled) {
+        if (entranceIndex.has(node)) {
+            arrivals.set(entranceIndex.get(node), [toEnd.costs[node], traceClusterPath(toEnd.cameFrom, node).reverse()]);
+        }
+    }
+
+    if (exits.length === 0 || arrivals.size === 0) return null;
+
+    // Abstract nodes: entrances 0..e-1, then the start (e) and end (e + 1)
+    const source = entrances.length;
+    const target = source + 1;
+    const bound = k => {
+        if (k === target) return 0;
+        return heuristic(k === source ? startPoint : graphNodePoint(entrances[k]));
+    };
+
+    // Same indexed binary heap and tie-breaking as searchWaterGrid()
+    abstractSearchState = reuseSearchState(abstractSearchState, entrances.length + 2);
+    const state = abstractSearchState;
+    const { generation, visited, closed, gScore, fScore, cameFrom, order, heapPosition } = state;
+    const segmentTo = new Map();  // abstract node -> node path of the link it was reached by
+
+    visited[source] = generation;
+    gScore[source] = 0;
+    fScore[source] = bound(source);
+    cameFrom[source] = -1;
+    order[source] = state.inserted++;
+    openSetPush(state, source);
+
+    while (state.heapSize > 0) {
+        const current = openSetPop(state);
+
+        if (current === target) {
+            const segments = [];
+            for (let k = current; k !== source; k = cameFrom[k]) {
+                segments.push(segmentTo.get(k));
+            }
+            segments.reverse();
+
+            const nodes = [...segments[0]];
+            for (const segment of segments.slice(1)) {
+                nodes.push(...segment.slice(1));
+            }
+            return nodes;
+        }
+
+        closed[current] = generation;
+
+        let links = exits;
+        if (current !== source) {
+            links = [];
+            for (let edge = offsets[current]; edge < offsets[current + 1]; edge++) {
+                links.push([targets[edge], costs[edge],
+                    Array.from(pathNodes.subarray(pathOffsets[edge], pathOffsets[edge + 1]))]);
+            }
+            if (arrivals.has(current)) {
+                links.push([target, ...arrivals.get(current)]);
+            }
+        }
+
+        const incoming = current === source ? [] : segmentTo.get(current);
+        for (const [neighbor, cost, path] of links) {
+            if (closed[neighbor] === generation) continue;
+
+            const tentativeG = gScore[current] + cost + junctionTurnCost(incoming, path);
+            const reached = visited[neighbor] === generation;
+            if (!reached || tentativeG < gScore[neighbor]) {
+                gScore[neighbor] = tentativeG;
+                fScore[neighbor] = tentativeG + bound(neighbor);
+                cameFrom[neighbor] = current;
+                segmentTo.set(neighbor, path);
+
+                if (!reached) {
+                    visited[neighbor] = generation;
+                    order[neighbor] = state.inserted++;
+                    openSetPush(state, neighbor);
+                } else {
+                    openSetSiftUp(state, heapPosition[neighbor]);
+                }
+            }
+        }
+    }
+
+    return null;
+}
+
+/**
+ * Per-node flags for the clusters a node path passes through, the
+ * corridor findPath() refines a hierarchical plan in
+ * @param {Array<number>} nodes - Graph node path
+ * @returns {Uint8Array} 1 for every graph node inside the corridor
+ */
+function hierarchyCorridor(nodes) {
+    const { clusters, clusterCount } = hierarchyIndex(ROUTE_HIERARCHY);
+
+    const touched = new Uint8Array(clusterCount);
+    for (const node of nodes) {
+        touched[clusters[node]] = 1;
+    }
+
+    const allowed = new Uint8Array(clusters.length);
+    for (let node = 0; node < clusters.length; node++) {
+        allowed[node] = touched[clusters[node]];
+    }
+    return allowed;
+}
+
+// ============================================
+// Grid Generation
 // ============================================
 let waterGrid = null;
-let gridIndex = null;
-let spatialIndex = null;  // RBush spatial index for fast nearest-neighbor queries
+let gridIndex = null;  // Int32Array over GRID_LATTICE cells: waterGrid position, or -1
+let waterCells = null;  // Every water cell of GRID_LATTICE with its depth, for any draft
+
+/**
+ * Grid points for the nodes of the routing graph
+ * @param {Object} graph - Routing graph
+ * @returns {Array} One point per node, in node order
+ */
+function graphWaterCells(graph) {
+    const { lats, lngs, cells, depths, nodata } = graph;
+    const { cols } = GRID_LATTICE;
+    const points = new Array(graph.nodeCount);
+
+    for (let node = 0; node < graph.nodeCount; node++) {
+        const lat = lats[node];
+        const lng = lngs[node];
+
+        points[node] = {
+            id: `g${node}`,
+            node,
+            lat,
+            lng,
+            depth: depths[node] === nodata ? null : depths[node] / DEPTH_GRID_SCALE,
+            row: Math.floor(cells[node] / cols),
+            col: cells[node] % cols
+        };
+    }
+
+    return points;
+}
+
+/**
+ * Find every water cell of the routing lattice and its depth
+ * Comes straight from the prebuilt routing graph when it is loaded.
+ * Otherwise uses the precomputed water mask (or polygon tests) and
+ * builds the graph from the result.
+ * @returns {Array|null} Grid points, or null if water boundaries are not loaded
+ */
+function buildWaterCells() {
+    if (ROUTING_GRAPH) {
+        const startTime = performance.now();
+        const cells = graphWaterCells(ROUTING_GRAPH);
+        console.log(`Found ${cells.length} water cells in routing graph in ${(performance.now() - startTime).toFixed(0)}ms`);
+        return cells;
+    }
+
+    const waterMask = navigabilityMaskFor(0);
+
+    if (!waterMask && (!WATER_BOUNDARIES || WATER_BOUNDARIES.length === 0)) {
+        console.error('Cannot generate water grid: water boundaries not loaded');
+        return null;
+    }
+
+    const startTime = performance.now();
+    if (waterMask) {
+        console.log('Generating water grid from precomputed water mask...');
+    } else {
+        const totalVertices = WATER_BOUNDARIES.reduce((sum, wb) =>
+            sum + wb.outer.length + wb.holes.reduce((h_sum, h) => h_sum + h.length, 0), 0
+        );
+        console.log(`Generating water grid from ${totalVertices} boundary vertices (${WATER_BOUNDARIES.reduce((sum, wb) => sum + wb.holes.length, 0)} islands)...`);
+    }
+
+    const { south, west, latStep, lngStep, rows, cols } = GRID_LATTICE;
+
+    // Depth lattices on the routing lattice's grid lines are read by
+    // row/col; any others fall back to a coordinate lookup
+    const depthLattices = (DEPTH_GRID || []).map(grid => ({
+        grid,
+        offset: latticeOffset(GRID_LATTICE, grid)
+    }));
+
+    function depthAtCell(row, col, lat, lng) {
+        for (const { grid, offset } of depthLattices) {
+            const r = offset ? row + offset.rowOffset : Math.round((lat - grid.south) / grid.latStep);
+            const c = offset ? col + offset.colOffset : Math.round((lng - grid.west) / grid.lngStep);
+            if (r < 0 || r >= grid.rows || c < 0 || c >= grid.cols) continue;
+
+            const value = grid.depths[r * grid.cols + c];
+            if (value !== grid.nodata) return value / DEPTH_GRID_SCALE;
+        }
+        return null;
+    }
+
+    const cells = [];
+
+    for (let row = 0; row < rows; row++) {
+        const lat = south + row * latStep;
+
+        for (let col = 0; col < cols; col++) {
+            const lng = west + col * lngStep;
+            const cell = row * cols + col;
+
+            const inWater = waterMask
+                ? (waterMask[cell >> 3] >> (cell & 7)) & 1
+                : isInWater(lat, lng);
+            if (!inWater) continue;
+
+            const roundedLat = Math.round(lat * 1000000) / 1000000;
+            const roundedLng = Math.round(lng * 1000000) / 1000000;
+
+            cells.push({
+                id: `g${cells.length}`,
+                node: cells.length,
+                lat: roundedLat,
+                lng: roundedLng,
+                depth: depthAtCell(row, col, roundedLat, roundedLng),  // null where no depth data
+                row,
+                col
+            });
+        }
+    }
+
+    ROUTING_GRAPH = buildRoutingGraph(cells);
+
+    console.log(`Found ${cells.length} water cells and built routing graph in ${(performance.now() - startTime).toFixed(0)}ms`);
+    return cells;
+}
 
 function generateWaterGrid() {
     if (waterGrid !== null) {
         return waterGrid;
     }
 
-    if (!WATER_BOUNDARIES || WATER_BOUNDARIES.length === 0) {
-        console.error('Cannot generate water grid: water boundaries not loaded');
-        return null;
+    if (waterCells === null) {
+        waterCells = buildWaterCells();
+        if (waterCells === null) {
+            return null;
+        }
     }
 
-    const totalVertices = WATER_BOUNDARIES.reduce((sum, wb) =>
-        sum + wb.outer.length + wb.holes.reduce((h_sum, h) => h_sum + h.length, 0), 0
-    );
-    console.log(`Generating water grid from ${totalVertices} boundary vertices (${WATER_BOUNDARIES.reduce((sum, wb) => sum + wb.holes.length, 0)} islands)...`);
     const startTime = performance.now();
+    const { rows, cols } = GRID_LATTICE;
+    const hasDepthData = DEPTH_GRID !== null && DEPTH_GRID.length > 0;
 
-    waterGrid = [];
-    gridIndex = {};
+    // Keep cells that are deep enough (or have no depth data), using the
+    // precomputed mask for this minimum depth when there is one
+    const thresholdDm = minimumDepthDecimetres();
+    const mask = hasDepthData ? navigabilityMaskFor(thresholdDm) : null;
 
-    const { south, north, west, east } = GRID_CONFIG.bounds;
-    const { latStep, lngStep } = GRID_CONFIG;
+    waterGrid = [];
+    gridIndex = new Int32Array(rows * cols).fill(-1);
 
-    let id = 0;
     let depthFiltered = 0;
     let noDepthData = 0;
 
-    for (let lat = south; lat <= north; lat += latStep) {
-        for (let lng = west; lng <= east; lng += lngStep) {
-            if (isInWater(lat, lng)) {
-                const roundedLat = Math.round(lat * 1000000) / 1000000;
-                const roundedLng = Math.round(lng * 1000000) / 1000000;
-
-                // Check depth constraints if depth data available
-                let depthOk = true;
-                let depth = null;
-
-                if (DEPTH_GRID && DEPTH_GRID.size > 0) {
-                    // Look up depth by coordinates
-                    const coordKey = `${roundedLat.toFixed(6)},${roundedLng.toFixed(6)}`;
-
-                    if (DEPTH_GRID.has(coordKey)) {
-                        depth = DEPTH_GRID.get(coordKey);
-
-                        const minSafeDepth = VESSEL_DRAFT + SAFETY_MARGIN;
-
-                        if (depth < minSafeDepth) {
-                            depthOk = false;
-                            depthFiltered++;
-                        }
-                    } else {
-                        // No depth data for this point - include it anyway for now
-                        noDepthData++;
-                    }
-                }
+    for (const point of waterCells) {
+        const cell = point.row * cols + point.col;
+        const depthOk = mask
+            ? (mask[cell >> 3] >> (cell & 7)) & 1
+            : point.depth === null || depthDecimetres(point.depth) >= thresholdDm;
 
-                // Only add point if both in water AND has safe depth (or no depth data)
-                if (depthOk) {
-                    const point = {
-                        id: `g${id}`,
-                        lat: roundedLat,
-                        lng: roundedLng,
-                        depth: depth,  // Include depth if available, null otherwise
-                        row: Math.round((lat - south) / latStep),
-                        col: Math.round((lng - west) / lngStep),
-                        // RBush requires bounding box format
-                        minX: lng,
-                        minY: lat,
-                        maxX: lng,
-                        maxY: lat
-                    };
-                    waterGrid.push(point);
-
-                    const key = `${point.row},${point.col}`;
-                    gridIndex[key] = point;
-
-                    id++;
-                }
-            }
+        if (!depthOk) {
+            depthFiltered++;
+            continue;
         }
+
+        if (hasDepthData && point.depth === null) {
+            // No depth data for this point - include it anyway for now
+            noDepthData++;
+        }
+
+        gridIndex[cell] = waterGrid.length;
+        waterGrid.push(point);
     }
 
     if (depthFiltered > 0) {
-        console.log(`Filtered out ${depthFiltered} shallow water points (< ${(VESSEL_DRAFT + SAFETY_MARGIN).toFixed(1)}m depth)`);
+        console.log(`Filtered out ${depthFiltered} shallow water points (< ${(thresholdDm / DEPTH_GRID_SCALE).toFixed(1)}m depth)${mask ? ' using precomputed mask' : ''}`);
     }
     if (noDepthData > 0) {
         console.log(`${noDepthData} water points have no depth data (included in grid)`);
     }
 
-    // Build RBush spatial index for fast nearest-neighbor queries
-    if (typeof RBush !== 'undefined') {
-        spatialIndex = new RBush();
-        spatialIndex.load(waterGrid);
-        console.log(`Built spatial index with ${spatialIndex.all().length} water grid points`);
-    } else {
-        console.warn('RBush not available - nearest point queries will use slower linear search');
-    }
-
     const endTime = performance.now();
     console.log(`Generated ${waterGrid.length} water grid points in ${(endTime - startTime).toFixed(0)}ms`);
 
@@ -675,17 +1819,13 @@ function generateWaterGrid() {
 // ============================================
 function getNeighbors(point) {
     const neighbors = [];
-    const { row, col } = point;
-
-    const directions = [
-        [-1, 0], [-1, 1], [0, 1], [1, 1],
-        [1, 0], [1, -1], [0, -1], [-1, -1]
-    ];
+    const { offsets, neighbors: targets, cells } = ROUTING_GRAPH;
 
-    for (const [dr, dc] of directions) {
-        const key = `${row + dr},${col + dc}`;
-        if (gridIndex[key]) {
-            neighbors.push(gridIndex[key]);
+    // Graph edges join water cells; keep the ones navigable at this draft
+    for (let edge = offsets[point.node]; edge < offsets[point.node + 1]; edge++) {
+        const index = gridIndex[cells[targets[edge]]];
+        if (index >= 0) {
+            neighbors.push(waterGrid[index]);
         }
     }
 
@@ -701,9 +1841,11 @@ function getNeighbors(point) {
  * @param {number} startLng - Starting longitude
  * @param {number} endLat - Ending latitude
  * @param {number} endLng - Ending longitude
+ * @param {Object} [options] - {startPoint, endPoint}: grid points already
+ *     snapped for the ends (see poiGridPoint()), skipping the nearest-point search
  * @returns {Object|null} Object with path array and distance, or null if no path found
  */
-function findPath(startLat, startLng, endLat, endLng) {
+function findPath(startLat, startLng, endLat, endLng, options = {}) {
     // Validate inputs
     if (!Number.isFinite(startLat) || !Number.isFinite(startLng) ||
         !Number.isFinite(endLat) || !Number.isFinite(endLng)) {
@@ -729,8 +1871,8 @@ function findPath(startLat, startLng, endLat, endLng) {
         return null;
     }
 
-    const startPoint = findNearestGridPoint(startLat, startLng);
-    const endPoint = findNearestGridPoint(endLat, endLng);
+    const startPoint = options.startPoint || findNearestGridPoint(startLat, startLng);
+    const endPoint = options.endPoint || findNearestGridPoint(endLat, endLng);
 
     if (!startPoint || !endPoint) {
         console.warn('Could not find grid points for route');
@@ -751,103 +1893,258 @@ function findPath(startLat, startLng, endLat, endLng) {
         return null;
     }
 
-    const openSet = new Map();
-    openSet.set(startPoint.id, startPoint);
+    const heuristic = createRouteHeuristic(endPoint);
+    let route = null;
+
+    // Long routes are planned on the cluster hierarchy, then refined by A*
+    // kept to the clusters the plan passes through
+    if (routeHierarchyUsable(ROUTE_HIERARCHY, ROUTING_GRAPH) &&
+        haversineDistance(startPoint.lat, startPoint.lng, endPoint.lat, endPoint.lng) >= HIERARCHY_MIN_DISTANCE_KM) {
+        const plan = findHierarchicalPath(startPoint, endPoint, heuristic);
+        if (plan) {
+            route = searchWaterGrid(startPoint, endPoint, heuristic, hierarchyCorridor(plan));
+            if (!route.path) {
+                route.path = plan.map(graphNodePoint);
+            }
+        }
+    }
+
+    if (!route) {
+        route = searchWaterGrid(startPoint, endPoint, heuristic);
+    }
 
-    const cameFrom = {};
-    const gScore = {};
-    const fScore = {};
+    if (route.path) {
+        const { path } = route;
+        let totalDistance = 0;
+        for (let i = 0; i < path.length - 1; i++) {
+            totalDistance += haversineDistance(
+                path[i].lat, path[i].lng,
+                path[i + 1].lat, path[i + 1].lng
+            );
+        }
 
-    for (const p of waterGrid) {
-        gScore[p.id] = Infinity;
-        fScore[p.id] = Infinity;
+        return { path, distance: totalDistance };
     }
 
-    gScore[startPoint.id] = 0;
-    fScore[startPoint.id] = haversineDistance(startPoint.lat, startPoint.lng, endPoint.lat, endPoint.lng);
+    // No path found - all possible routes have been exhausted
+    console.warn('No water path found between points:', {
+        start: { lat: startLat, lng: startLng },
+        end: { lat: endLat, lng: endLng },
+        startPoint: { lat: startPoint.lat, lng: startPoint.lng },
+        endPoint: { lat: endPoint.lat, lng: endPoint.lng },
+        nodesExplored: route.explored
+    });
+    return null;
+}
 
-    const pointById = {};
-    for (const p of waterGrid) {
-        pointById[p.id] = p;
+// ============================================
+// A* Search State and Open Set
+// ============================================
+let searchState = null;  // Per-node arrays reused by every searchWaterGrid() call
+
+/**
+ * Search state for a graph of nodeCount nodes, reset for a new search
+ * Arrays are indexed by node and kept between searches; an entry is only
+ * meaningful when visited[node] equals the current generation, so a
+ * reset just advances the generation instead of clearing every array.
+ * @param {Object|null} state - State of an earlier search, reused if it fits
+ * @param {number} nodeCount - Node count of the graph searched
+ * @returns {Object} Search state
+ */
+function reuseSearchState(state, nodeCount) {
+    if (!state || state.gScore.length !== nodeCount) {
+        state = {
+            generation: 0,
+            visited: new Uint32Array(nodeCount),      // Generation that reached the node
+            closed: new Uint32Array(nodeCount),       // Generation that expanded the node
+            gScore: new Float64Array(nodeCount),
+            fScore: new Float64Array(nodeCount),
+            cameFrom: new Int32Array(nodeCount),
+            order: new Uint32Array(nodeCount),        // Open set insertion order, the tie-breaker
+            heap: new Int32Array(nodeCount),          // Open nodes as a binary min-heap
+            heapPosition: new Int32Array(nodeCount),  // Each open node's heap slot
+            heapSize: 0,
+            inserted: 0
+        };
     }
 
-    const closedSet = new Set();
+    if (state.generation === 0xffffffff) {
+        state.visited.fill(0);
+        state.closed.fill(0);
+        state.generation = 0;
+    }
+    state.generation++;
+    state.heapSize = 0;
+    state.inserted = 0;
 
-    while (openSet.size > 0) {
-        let current = null;
-        let lowestF = Infinity;
+    return state;
+}
 
-        for (const [id, point] of openSet) {
-            if (fScore[id] < lowestF) {
-                lowestF = fScore[id];
-                current = point;
-            }
-        }
+/**
+ * Search state for the routing graph, reset for a new searchWaterGrid()
+ * @param {number} nodeCount - Routing graph node count
+ * @returns {Object} Search state (see reuseSearchState)
+ */
+function resetSearchState(nodeCount) {
+    searchState = reuseSearchState(searchState, nodeCount);
+    return searchState;
+}
 
-        if (!current) break;
+/**
+ * Whether open node a comes out of the heap before open node b: lower f
+ * score first, then earlier insertion (the order a Map-based open set
+ * scanned for its minimum would pick)
+ */
+function openSetBefore(state, a, b) {
+    const { fScore, order } = state;
+    return fScore[a] < fScore[b] || (fScore[a] === fScore[b] && order[a] < order[b]);
+}
 
-        if (current.id === endPoint.id) {
-            const path = [current];
-            let curr = current.id;
-            while (cameFrom[curr]) {
-                curr = cameFrom[curr];
-                path.unshift(pointById[curr]);
-            }
+/**
+ * Move the node in heap slot position up until its parent comes first
+ * (after an insert, or after its f score decreased)
+ */
+function openSetSiftUp(state, position) {
+    const { heap, heapPosition } = state;
+    const node = heap[position];
 
-            let totalDistance = 0;
-            for (let i = 0; i < path.length - 1; i++) {
-                totalDistance += haversineDistance(
-                    path[i].lat, path[i].lng,
-                    path[i + 1].lat, path[i + 1].lng
-                );
-            }
+    while (position > 0) {
+        const parent = (position - 1) >> 1;
+        if (!openSetBefore(state, node, heap[parent])) break;
 
-            return { path, distance: totalDistance };
-        }
+        heap[position] = heap[parent];
+        heapPosition[heap[position]] = position;
+        position = parent;
+    }
 
-        openSet.delete(current.id);
-        closedSet.add(current.id);
+    heap[position] = node;
+    heapPosition[node] = position;
+}
 
-        for (const neighbor of getNeighbors(current)) {
-            if (closedSet.has(neighbor.id)) continue;
+/**
+ * Add a node to the open set; its f score and order must be set
+ */
+function openSetPush(state, node) {
+    state.heap[state.heapSize] = node;
+    openSetSiftUp(state, state.heapSize++);
+}
 
-            // Base distance cost
-            const distanceCost = haversineDistance(current.lat, current.lng, neighbor.lat, neighbor.lng);
+/**
+ * Remove and return the open node that comes first
+ */
+function openSetPop(state) {
+    const { heap, heapPosition } = state;
+    const first = heap[0];
+    const last = heap[--state.heapSize];
+    const size = state.heapSize;
+
+    let position = 0;
+    while (true) {
+        let child = 2 * position + 1;
+        if (child >= size) break;
+        if (child + 1 < size && openSetBefore(state, heap[child + 1], heap[child])) child++;
+        if (!openSetBefore(state, heap[child], last)) break;
+
+        heap[position] = heap[child];
+        heapPosition[heap[position]] = position;
+        position = child;
+    }
 
-            // Calculate turn cost penalty for smoother routes
-            let turnCost = 0;
-            if (ROUTING_CONFIG.turnPenalty.enabled && cameFrom[current.id]) {
-                const previousPoint = pointById[cameFrom[current.id]];
-                if (previousPoint) {
-                    const turnAngle = calculateTurnAngle(previousPoint, current, neighbor);
-                    turnCost = calculateTurnCost(turnAngle);
-                }
+    if (size > 0) {
+        heap[position] = last;
+        heapPosition[last] = position;
+    }
+    heapPosition[first] = -1;
+
+    return first;
+}
+
+/**
+ * A* over the navigable grid from startPoint to endPoint
+ * The open set is an indexed binary heap over graph nodes with per-node
+ * scores in typed arrays (see resetSearchState), so each step costs
+ * O(log n) in the frontier size.
+ * @param {Object} startPoint - Start grid point
+ * @param {Object} endPoint - Target grid point
+ * @param {Function} heuristic - Lower bound on the remaining cost (see createRouteHeuristic)
+ * @param {Uint8Array|null} allowed - Optional per-node flags the search must stay within
+ * @returns {Object} {path, explored}: grid points (null if unreachable) and nodes expanded
+ */
+function searchWaterGrid(startPoint, endPoint, heuristic, allowed = null) {
+    const { nodeCount, offsets, neighbors: targets, lengths, cells: graphCells } = ROUTING_GRAPH;
+    const clearance = shoreClearanceFactors();
+    const turnsEnabled = ROUTING_CONFIG.turnPenalty.enabled;
+
+    const state = resetSearchState(nodeCount);
+    const { generation, visited, closed, gScore, fScore, cameFrom, order, heapPosition } = state;
+
+    const start = startPoint.node;
+    const end = endPoint.node;
+    visited[start] = generation;
+    gScore[start] = 0;
+    fScore[start] = heuristic(startPoint);
+    cameFrom[start] = -1;
+    order[start] = state.inserted++;
+    openSetPush(state, start);
+
+    let explored = 0;
+
+    while (state.heapSize > 0) {
+        const current = openSetPop(state);
+
+        if (current === end) {
+            const path = [];
+            for (let node = current; node >= 0; node = cameFrom[node]) {
+                path.push(graphNodePoint(node));
             }
 
-            const tentativeG = gScore[current.id] + distanceCost + turnCost;
+            return { path: path.reverse(), explored };
+        }
+
+        closed[current] = generation;
+        explored++;
+
+        const currentPoint = graphNodePoint(current);
+        const previousPoint = turnsEnabled && cameFrom[current] >= 0 ? graphNodePoint(cameFrom[current]) : null;
+
+        // Walk the current node's graph edges directly
+        for (let edge = offsets[current]; edge < offsets[current + 1]; edge++) {
+            const node = targets[edge];
+            const index = gridIndex[graphCells[node]];
+            if (index < 0) continue;  // Too shallow for this draft
+            if (closed[node] === generation) continue;
+            if (allowed && !allowed[node]) continue;
+
+            const neighbor = waterGrid[index];
 
-            if (tentativeG < gScore[neighbor.id]) {
-                cameFrom[neighbor.id] = current.id;
-                gScore[neighbor.id] = tentativeG;
-                fScore[neighbor.id] = tentativeG +
-                    haversineDistance(neighbor.lat, neighbor.lng, endPoint.lat, endPoint.lng);
+            // Base distance cost (precomputed edge length), weighted by shore clearance
+            const distanceCost = clearance ? lengths[edge] * clearance[node] : lengths[edge];
 
-                if (!openSet.has(neighbor.id)) {
-                    openSet.set(neighbor.id, neighbor);
+            // Calculate turn cost penalty for smoother routes
+            const turnCost = previousPoint
+                ? calculateTurnCost(calculateTurnAngle(previousPoint, currentPoint, neighbor))
+                : 0;
+
+            const tentativeG = gScore[current] + distanceCost + turnCost;
+            const reached = visited[node] === generation;
+
+            if (!reached || tentativeG < gScore[node]) {
+                cameFrom[node] = current;
+                gScore[node] = tentativeG;
+                fScore[node] = tentativeG + heuristic(neighbor);
+
+                if (!reached) {
+                    visited[node] = generation;
+                    order[node] = state.inserted++;
+                    openSetPush(state, node);
+                } else {
+                    openSetSiftUp(state, heapPosition[node]);
                 }
             }
         }
     }
 
-    // No path found - all possible routes have been exhausted
-    console.warn('No water path found between points:', {
-        start: { lat: startLat, lng: startLng },
-        end: { lat: endLat, lng: endLng },
-        startPoint: { lat: startPoint.lat, lng: startPoint.lng },
-        endPoint: { lat: endPoint.lat, lng: endPoint.lng },
-        nodesExplored: closedSet.size
-    });
-    return null;
+    return { path: null, explored };
 }
 
 // ============================================
@@ -1123,11 +2420,14 @@ function analyzeTurns(path) {
 }
 
 // ============================================
-// Find Nearest Grid Point with Spatial Index
+// Find Nearest Grid Point
 // ============================================
 /**
  * Find the nearest water grid point to given coordinates
- * Uses RBush spatial index for O(log n) performance instead of O(n) linear search
+ * Probes gridIndex in square rings of lattice cells around the coordinates,
+ * widening until no unvisited cell can be closer than the best point found,
+ * so a snap looks at a few dozen cells instead of the whole grid. Ties go to
+ * the earliest waterGrid point, as with a linear scan.
  * @param {number} lat - Latitude
  * @param {number} lng - Longitude
  * @returns {Object|null} Nearest grid point or null if grid not generated
@@ -1140,49 +2440,108 @@ function findNearestGridPoint(lat, lng) {
         return null;
     }
 
-    // Use RBush spatial index if available (much faster)
-    if (spatialIndex && typeof spatialIndex.all === 'function') {
-        // Create search bounding box (point)
-        const searchPoint = {
-            minX: lng,
-            minY: lat,
-            maxX: lng,
-            maxY: lat
-        };
-
-        // Get all points and find nearest using Haversine
-        // RBush doesn't have built-in nearest-neighbor, so we search
-        // a small bounding box and expand if needed
-        const candidates = spatialIndex.all();
+    const { south, west, latStep, lngStep, rows, cols } = GRID_LATTICE;
+    const rowPos = (lat - south) / latStep;
+    const colPos = (lng - west) / lngStep;
+    const centerRow = Math.min(Math.max(Math.round(rowPos), 0), rows - 1);
+    const centerCol = Math.min(Math.max(Math.round(colPos), 0), cols - 1);
+    const lastRing = Math.max(centerRow, rows - 1 - centerRow, centerCol, cols - 1 - centerCol);
+
+    // Lower bound on the distance to any cell in a block of rows and cols:
+    // its row and col gaps to the coordinates, in km, less half a cell for
+    // rounding. Cells are narrowest east-west at the latitude farthest from
+    // the equator.
+    const kmPerDegree = EARTH_RADIUS_KM * Math.PI / 180;
+    const farthestLat = Math.max(Math.abs(lat), Math.abs(south), Math.abs(south + (rows - 1) * latStep));
+    const rowKm = latStep * kmPerDegree;
+    const colKm = lngStep * kmPerDegree * Math.cos(farthestLat * Math.PI / 180);
+    const blockKm = (firstRow, lastRow, firstCol, lastCol) => Math.max(
+        rowKm * (Math.max(firstRow - rowPos, rowPos - lastRow, 0) - 0.5),
+        colKm * (Math.max(firstCol - colPos, colPos - lastCol, 0) - 0.5));
 
-        let nearest = null;
-        let nearestDist = Infinity;
+    let nearest = null;
+    let nearestIndex = -1;
+    let nearestDist = Infinity;
 
-        for (const point of candidates) {
-            const dist = haversineDistance(lat, lng, point.lat, point.lng);
-            if (dist < nearestDist) {
-                nearestDist = dist;
-                nearest = point;
+    for (let ring = 0; ring <= lastRing; ring++) {
+        const top = centerRow - ring;
+        const bottom = centerRow + ring;
+        const left = centerCol - ring;
+        const right = centerCol + ring;
+        const firstRow = Math.max(top, 0);
+        const lastRow = Math.min(bottom, rows - 1);
+        const firstCol = Math.max(left, 0);
+        const lastCol = Math.min(right, cols - 1);
+
+        // Rings only get farther away, so stop at the first that cannot
+        // hold anything closer than the best point so far
+        const ringKm = Math.min(
+            top >= 0 ? blockKm(top, top, firstCol, lastCol) : Infinity,
+            bottom < rows ? blockKm(bottom, bottom, firstCol, lastCol) : Infinity,
+            left >= 0 ? blockKm(firstRow, lastRow, left, left) : Infinity,
+            right < cols ? blockKm(firstRow, lastRow, right, right) : Infinity);
+        if (ringKm > nearestDist) break;
+
+        for (let row = firstRow; row <= lastRow; row++) {
+            // The ring's top and bottom rows are whole; rows between add their end cells
+            const whole = row === top || row === bottom;
+            const rowFirstCol = whole ? firstCol : left;
+            const rowLastCol = whole ? lastCol : right;
+
+            for (let col = rowFirstCol; col <= rowLastCol; col += whole ? 1 : 2 * ring) {
+                if (col < 0 || col >= cols) continue;
+
+                const index = gridIndex[row * cols + col];
+                if (index < 0) continue;
+
+                const point = waterGrid[index];
+                const dist = haversineDistance(lat, lng, point.lat, point.lng);
+                if (dist < nearestDist || (dist === nearestDist && index < nearestIndex)) {
+                    nearest = point;
+                    nearestIndex = index;
+                    nearestDist = dist;
+                }
             }
         }
-
-        return nearest;
     }
 
-    // Fallback to linear search if RBush not available
-    console.warn('Using linear search for nearest point (RBush not available)');
-    let nearest = null;
-    let nearestDist = Infinity;
+    return nearest;
+}
 
-    for (const point of waterGrid) {
-        const dist = haversineDistance(lat, lng, point.lat, point.lng);
-        if (dist < nearestDist) {
-            nearestDist = dist;
-            nearest = point;
+/**
+ * Grid point a POI snaps to, read from its precomputed water snap table
+ * (see pois/convert_csv_to_json.py) when the table was built for the loaded
+ * routing graph (same shape and node depths) and covers the current
+ * minimum depth; otherwise searched
+ * with findNearestGridPoint(), which gives the same point
+ * @param {Object} poi - POI from POINTS_OF_INTEREST
+ * @returns {Object|null} Grid point or null if grid not generated
+ */
+function poiGridPoint(poi) {
+    const snap = poi.waterSnap;
+    const thresholdDm = minimumDepthDecimetres();
+    const hasDepthData = DEPTH_GRID !== null && DEPTH_GRID.length > 0;
+
+    if (snap && hasDepthData && ROUTING_GRAPH &&
+        snap.graphNodes === ROUTING_GRAPH.nodeCount && snap.graphEdges === ROUTING_GRAPH.edgeCount &&
+        snap.graphDepthsHash === routingGraphDepthsHash(ROUTING_GRAPH) &&
+        thresholdDm >= snap.firstDepthDm && thresholdDm <= snap.lastDepthDm) {
+        // Entries hold from their minimum depth until the next entry's
+        let node = -1;
+        for (const [fromDm, entryNode] of snap.entries) {
+            if (fromDm > thresholdDm) break;
+            node = entryNode;
+        }
+
+        if (node >= 0 && generateWaterGrid()) {
+            const point = graphNodePoint(node);
+            if (point) {
+                return point;
+            }
         }
     }
 
-    return nearest;
+    return findNearestGridPoint(poi.lat, poi.lng);
 }
 
 // ============================================
@@ -1205,7 +2564,10 @@ function calculateWaterRoute(startPoiId, endPoiId) {
         };
     }
 
-    const pathResult = findPath(startPoi.lat, startPoi.lng, endPoi.lat, endPoi.lng);
+    const pathResult = findPath(startPoi.lat, startPoi.lng, endPoi.lat, endPoi.lng, {
+        startPoint: poiGridPoint(startPoi),
+        endPoint: poiGridPoint(endPoi)
+    });
 
     if (!pathResult) {
         const directDistance = haversineDistance(
@@ -1311,11 +2673,18 @@ function calculateWaterRoute(startPoiId, endPoiId) {
 // ============================================
 if (typeof window !== 'undefined') {
     window.loadWaterBoundaries = loadWaterBoundaries;
+    window.loadNavigabilityMasks = loadNavigabilityMasks;
+    window.loadShoreDistance = loadShoreDistance;
+    window.loadRoutingGraph = loadRoutingGraph;
+    window.loadLandmarkTable = loadLandmarkTable;
+    window.loadRouteHierarchy = loadRouteHierarchy;
+    window.getDepthAt = getDepthAt;
     window.calculateWaterRoute = calculateWaterRoute;
     window.haversineDistance = haversineDistance;
     window.isInWater = isInWater;
     window.getWaterBodyName = getWaterBodyName;
     window.findNearestGridPoint = findNearestGridPoint;
+    window.poiGridPoint = poiGridPoint;
     window.generateWaterGrid = generateWaterGrid;
     window.pointInPolygonWithHoles = pointInPolygonWithHoles;
 
@@ -1327,6 +2696,7 @@ if (typeof window !== 'undefined') {
 
     // Configuration
     window.GRID_CONFIG = GRID_CONFIG;
+    window.GRID_LATTICE = GRID_LATTICE;
     window.ROUTING_CONFIG = ROUTING_CONFIG;
     window.MARKER_TYPES = MARKER_TYPES;
 
@@ -1341,6 +2711,24 @@ if (typeof window !== 'undefined') {
 if (typeof module !== 'undefined' && module.exports) {
     module.exports = {
         loadWaterBoundaries,
+        loadDepthData,
+        parseDepthGridBinary,
+        depthGridFromJson,
+        getDepthAt,
+        loadNavigabilityMasks,
+        parseNavigabilityMasks,
+        loadShoreDistance,
+        calculateClearanceFactor,
+        loadRoutingGraph,
+        parseRoutingGraph,
+        routingGraphDepthsHash,
+        loadLandmarkTable,
+        parseLandmarkTable,
+        createRouteHeuristic,
+        loadRouteHierarchy,
+        parseRouteHierarchy,
+        findHierarchicalPath,
+        updateVesselSettings,
         pointInPolygon,
         pointInPolygonWithHoles,
         geoJsonToLatLng,
@@ -1350,16 +2738,25 @@ if (typeof module !== 'undefined' && module.exports) {
         generateWaterGrid,
         getNeighbors,
         findNearestGridPoint,
+        poiGridPoint,
         findPath,
         calculateWaterRoute,
+        createGridLattice,
         LAKE_CHAMPLAIN_POLYGON,
         GRID_CONFIG,
+        GRID_LATTICE,
+        ROUTING_CONFIG,
         EARTH_RADIUS_KM,
         MAX_GRID_SEARCH_DISTANCE_KM,
         // Expose internal variables for testing
         get waterGrid() { return waterGrid; },
         get gridIndex() { return gridIndex; },
-        get spatialIndex() { return spatialIndex; },
-        get WATER_BOUNDARIES() { return WATER_BOUNDARIES; }
+        get WATER_BOUNDARIES() { return WATER_BOUNDARIES; },
+        get DEPTH_GRID() { return DEPTH_GRID; },
+        get NAVIGABILITY_MASKS() { return NAVIGABILITY_MASKS; },
+        get SHORE_DISTANCE() { return SHORE_DISTANCE; },
+        get ROUTING_GRAPH() { return ROUTING_GRAPH; },
+        get LANDMARK_TABLE() { return LANDMARK_TABLE; },
+        get ROUTE_HIERARCHY() { return ROUTE_HIERARCHY; }
     };
 }
@@ -0,0 +1,258 @@
+/**
+ * Routing Service for Lake Champlain & Hudson River Guide
+ * Runs water routing in a Web Worker (js/routing-worker.js) so the map
+ * stays responsive while the grid is generated and routes are searched
+ *
+ * Features:
+ * - Routing data, water grid and A* live in the worker
+ * - Multi-stop routes stream back one leg at a time
+ * - A new route request cancels the one still running
+ * - Falls back to routing on the main thread where workers are unavailable
+ */
+
+const RoutingService = (function() {
+    'use strict';
+
+    const WORKER_URL = 'js/routing-worker.js';
+
+    let worker = null;
+    let workerReady = null;       // Resolves with vessel settings once the worker has loaded its data
+    let mainThreadReady = null;   // Resolves once routing data is loaded in the page
+    let vessel = null;            // Last {draft, margin} applied
+    let activeRequest = null;     // {id, stops, legs, routes, onProgress, resolve}
+    let nextRequestId = 1;
+
+    /**
+     * Whether routing runs in a worker (page data loading skips routing data then)
+     */
+    function supported() {
+        return typeof Worker !== 'undefined' &&
+            typeof location !== 'undefined' && location.protocol !== 'file:';
+    }
+
+    /**
+     * Start the routing worker with the app's POIs
+     * Data already loaded in the page (see initializeData) is used when
+     * workers are not supported.
+     * @param {Array} pois - POINTS_OF_INTEREST
+     * @returns {Promise} Resolves when routes can be requested
+     */
+    function init(pois) {
+        if (!supported()) {
+            mainThreadReady = mainThreadReady || Promise.resolve();
+            return mainThreadReady;
+        }
+
+        worker = new Worker(WORKER_URL);
+        workerReady = new Promise((resolve, reject) => {
+            worker.onmessage = event => handleMessage(event.data, resolve, reject);
+            worker.onerror = event => reject(new Error(event.message || 'Routing worker failed to start'));
+        }).catch(error => {
+            console.warn('Routing in the page instead of a worker:', error);
+            return useMainThread();
+        });
+
+        worker.postMessage({
+            type: 'init',
+            baseUrl: document.baseURI,
+            pois: pois.map(({ id, name, lat, lng, waterSnap }) => ({ id, name, lat, lng, waterSnap }))
+        });
+
+        return workerReady;
+    }
+
+    /**
+     * Route on the main thread from now on, loading the routing data the
+     * page skipped while a worker was expected
+     * @returns {Promise} Resolves once routing data is loaded in the page
+     */
+    function useMainThread() {
+        if (!worker) return mainThreadReady;  // Already switched
+
+        worker.terminate();
+        worker = null;
+
+        if (!mainThreadReady) {
+            mainThreadReady = Promise.all([
+                loadNavigabilityMasks(),
+                loadShoreDistance(),
+                loadRoutingGraph(),
+                loadLandmarkTable()
+            ]).then(() => {
+                if (vessel) {
+                    updateVesselSettings(vessel.draft, vessel.margin);
+                } else {
+                    generateWaterGrid();
+                }
+                // Long routes fall back to flat A* until this arrives
+                return loadRouteHierarchy();
+            });
+        }
+
+        // Finish a request the worker was answering
+        if (activeRequest) {
+            routeOnMainThread(activeRequest);
+        }
+
+        return mainThreadReady;
+    }
+
+    function handleMessage(message, resolveReady, rejectReady) {
+        switch (message.type) {
+            case 'ready':
+                resolveReady(message.settings);
+                break;
+
+            case 'progress': {
+                if (!activeRequest || message.id !== activeRequest.id) return;  // Stale request
+
+                const route = message.route && unpackRoute(message.route);
+                finishLeg(activeRequest, message.leg, route);
+                break;
+            }
+
+            case 'done':
+                if (activeRequest && message.id === activeRequest.id) {
+                    finishRequest(activeRequest);
+                }
+                break;
+
+            case 'error':
+                console.error('Routing worker error:', message.message);
+                if (activeRequest && message.id === activeRequest.id) {
+                    finishRequest(activeRequest);
+                } else if (message.id === undefined) {
+                    // Settles workerReady if the worker failed while starting
+                    rejectReady(new Error(message.message));
+                    useMainThread();
+                }
+                break;
+
+            default:
+                console.warn('Unknown routing worker message:', message.type);
+        }
+    }
+
+    /**
+     * Route with its transferred Float64Array back in [lat, lng] pairs
+     */
+    function unpackRoute(route) {
+        const coordinates = [];
+        for (let i = 0; i < route.coordinates.length; i += 2) {
+            coordinates.push([route.coordinates[i], route.coordinates[i + 1]]);
+        }
+        return { ...route, coordinates };
+    }
+
+    function finishLeg(request, leg, route) {
+        request.routes[leg] = route;
+        if (request.onProgress) {
+            request.onProgress(leg + 1, request.legs, route);
+        }
+    }
+
+    function finishRequest(request) {
+        if (activeRequest === request) {
+            activeRequest = null;
+        }
+        request.resolve(request.routes);
+    }
+
+    async function routeOnMainThread(request) {
+        await mainThreadReady;
+
+        for (let leg = request.routes.length; leg < request.legs; leg++) {
+            if (activeRequest !== request) return;
+
+            finishLeg(request, leg, calculateWaterRoute(request.stops[leg], request.stops[leg + 1]));
+
+            // Let the UI repaint and newer requests arrive between legs
+            await new Promise(resolve => setTimeout(resolve, 0));
+        }
+
+        if (activeRequest === request) {
+            finishRequest(request);
+        }
+    }
+
+    /**
+     * Water route through a list of POI ids, one calculateWaterRoute()
+     * result per leg (null where a leg failed). Cancels any route still
+     * being calculated.
+     * @param {Array<string>} stops - POI ids, at least two
+     * @param {Function} [onProgress] - Called with (legsDone, legs, route) as each leg finishes
+     * @returns {Promise<Array|null>} Leg routes, or null if a newer request replaced this one
+     */
+    function route(stops, onProgress = null) {
+        cancel();
+
+        return new Promise(resolve => {
+            const request = {
+                id: nextRequestId++,
+                stops,
+                legs: stops.length - 1,
+                routes: [],
+                onProgress,
+                resolve
+            };
+            activeRequest = request;
+
+            if (worker) {
+                workerReady.then(() => {
+                    if (worker && activeRequest === request) {
+                        worker.postMessage({ type: 'route', id: request.id, stops });
+                    }
+                });
+            } else {
+                routeOnMainThread(request);
+            }
+        });
+    }
+
+    /**
+     * Drop the route being calculated; its promise resolves with null
+     */
+    function cancel() {
+        if (!activeRequest) return;
+
+        const request = activeRequest;
+        activeRequest = null;
+        if (worker) {
+            worker.postMessage({ type: 'cancel', id: request.id });
+        }
+        request.resolve(null);
+    }
+
+    /**
+     * Apply vessel draft and safety margin wherever routing runs
+     * @returns {Object} {draft, safety, minimumDepth} in meters
+     */
+    function setVessel(draft, margin) {
+        vessel = { draft, margin };
+
+        if (worker) {
+            worker.postMessage({ type: 'vessel', draft, margin });
+            return { draft, safety: margin, minimumDepth: draft + margin };
+        }
+
+        return updateVesselSettings(draft, margin);
+    }
+
+    return {
+        supported,
+        init,
+        route,
+        cancel,
+        setVessel
+    };
+})();
+
+// Export for use in app.js and data.js
+if (typeof window !== 'undefined') {
+    window.RoutingService = RoutingService;
+}
+
+// Export for testing (Node.js environment)
+if (typeof module !== 'undefined' && module.exports) {
+    module.exports = RoutingService;
+}
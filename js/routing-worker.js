@@ -0,0 +1,142 @@
+/**
+ * Routing Web Worker
+ *
+ * Runs js/navigation.js off the main thread for RoutingService
+ * (js/routing-service.js). The worker loads the routing data, owns the
+ * water grid and routing graph typed arrays, and answers route requests
+ * by message, so grid generation and A* never block the map.
+ *
+ * Messages in:
+ *   {type: 'init', baseUrl, pois}    Load routing data; pois are {id, name, lat, lng, waterSnap}
+ *   {type: 'vessel', draft, margin}  Regenerate the grid for new vessel settings
+ *   {type: 'route', id, stops}       Route through POI ids, one leg at a time
+ *   {type: 'cancel', id}             Stop a route request after its current leg
+ *
+ * Messages out:
+ *   {type: 'ready', settings}                 After init and after each vessel change
+ *   {type: 'progress', id, leg, legs, route}  One per finished leg; route.coordinates is a
+ *                                             transferred Float64Array of lat, lng pairs
+ *   {type: 'done', id}
+ *   {type: 'error', id, message}
+ */
+
+importScripts('navigation.js');
+
+// navigation.js fetches data paths relative to the page, not this script
+let appBaseUrl = self.location.href;
+const workerFetch = self.fetch.bind(self);
+self.fetch = (resource, options) => workerFetch(new URL(resource, appBaseUrl).href, options);
+
+// calculateWaterRoute() looks POIs up here, as it does in the page
+self.POINTS_OF_INTEREST = [];
+
+// Route requests not yet cancelled
+const activeRoutes = new Set();
+
+// Messages are handled one at a time, in order; cancel acts immediately
+let queue = Promise.resolve();
+
+/**
+ * Load every routing data file and build the water grid
+ */
+async function initialize({ baseUrl, pois }) {
+    appBaseUrl = baseUrl;
+    self.POINTS_OF_INTEREST = pois;
+
+    await Promise.all([
+        loadWaterBoundaries(),
+        loadDepthData(),
+        loadNavigabilityMasks(),
+        loadShoreDistance(),
+        loadRoutingGraph(),
+        loadLandmarkTable()
+    ]);
+    generateWaterGrid();
+    await loadRouteHierarchy();
+
+    self.postMessage({ type: 'ready', settings: currentVesselSettings() });
+}
+
+/**
+ * Switch vessel settings; updateVesselSettings() regenerates the grid
+ * and starts loading the matching route hierarchy
+ */
+function changeVessel({ draft, margin }) {
+    const settings = updateVesselSettings(draft, margin);
+    self.postMessage({ type: 'ready', settings });
+}
+
+function currentVesselSettings() {
+    return {
+        draft: VESSEL_DRAFT,
+        safety: SAFETY_MARGIN,
+        minimumDepth: VESSEL_DRAFT + SAFETY_MARGIN
+    };
+}
+
+/**
+ * Route through stops leg by leg, posting each leg as it finishes
+ * Between legs the worker yields so a cancel message can stop the request.
+ */
+async function route({ id, stops }) {
+    const legs = stops.length - 1;
+
+    for (let leg = 0; leg < legs; leg++) {
+        if (!activeRoutes.has(id)) return;
+
+        const result = calculateWaterRoute(stops[leg], stops[leg + 1]);
+        const packed = result && packRoute(result);
+        self.postMessage(
+            { type: 'progress', id, leg, legs, route: packed },
+            packed ? [packed.coordinates.buffer] : []
+        );
+
+        await new Promise(resolve => setTimeout(resolve, 0));
+    }
+
+    if (activeRoutes.delete(id)) {
+        self.postMessage({ type: 'done', id });
+    }
+}
+
+/**
+ * Route with its [lat, lng] coordinates flattened into a Float64Array,
+ * so they transfer instead of being copied point by point
+ */
+function packRoute(result) {
+    const coordinates = new Float64Array(result.coordinates.length * 2);
+    result.coordinates.forEach(([lat, lng], i) => {
+        coordinates[2 * i] = lat;
+        coordinates[2 * i + 1] = lng;
+    });
+
+    return { ...result, coordinates };
+}
+
+const handlers = {
+    init: initialize,
+    vessel: changeVessel,
+    route
+};
+
+self.onmessage = ({ data }) => {
+    if (data.type === 'cancel') {
+        activeRoutes.delete(data.id);
+        return;
+    }
+    if (data.type === 'route') {
+        activeRoutes.add(data.id);
+    }
+
+    const handler = handlers[data.type];
+    if (!handler) {
+        console.warn('Unknown routing worker message:', data.type);
+        return;
+    }
+
+    queue = queue.then(() => handler(data)).catch(error => {
+        console.error(`Routing worker failed on ${data.type}:`, error);
+        activeRoutes.delete(data.id);
+        self.postMessage({ type: 'error', id: data.id, message: String(error && error.message || error) });
+    });
+};
@@ -5,6 +5,14 @@ CSV to JSON POI Converter
 Converts the POI CSV file into the JSON format expected by the
 Lake Champlain & Hudson River Boater's Guide application.
 
+Each POI also gets a water snap table: the routing graph node it snaps
+to (the nearest navigable node, as findNearestGridPoint() picks it) and
+the snap distance, for every minimum depth the navigability masks cover.
+Only the depths where the snap changes are listed, as
+[minimum depth in decimetres, node, distance in km] entries that hold
+until the next one. Building it needs numpy, scipy and the routing
+graph; without them the POIs are written without snap tables.
+
 Usage:
     python convert_csv_to_json.py POIs_augmented.csv lake_champlain_pois.json
 
@@ -18,6 +26,12 @@ import re
 from datetime import datetime
 from pathlib import Path
 
+REPO_ROOT = Path(__file__).resolve().parent.parent
+SCRIPTS_DIR = REPO_ROOT / 'scripts'
+DEFAULT_GRAPH_FILE = REPO_ROOT / 'data' / 'routing' / 'lake-champlain-graph.bin'
+
+# Nearest candidates (by chord distance) re-ranked by haversine when snapping
+SNAP_CANDIDATES = 8
 
 def parse_coordinates(coord_string):
     """Parse coordinates from 'lat, lng' format."""
@@ -516,6 +530,78 @@ def convert_row_to_poi(row, row_num):
     return poi
 
 
+def attach_water_snaps(pois, graph_file=DEFAULT_GRAPH_FILE):
+    """
+    Add a water snap table to every POI
+
+    Returns the table metadata for the output file ({graphNodes,
+    graphEdges, graphDepthsHash, firstDepthDm, lastDepthDm}), or None when
+    the routing graph or the numpy/scipy dependencies are missing. The
+    depths hash lets the app reject tables left over from an earlier
+    depth grid, which keeps the graph's node and edge counts.
+    """
+    try:
+        import numpy as np
+        from scipy.spatial import cKDTree
+    except ImportError as e:
+        print(f"Skipping water snap tables (missing dependency: {e})")
+        return None
+
+    if not Path(graph_file).exists():
+        print(f"Skipping water snap tables (no routing graph at {graph_file})")
+        return None
+
+    sys.path.insert(0, str(SCRIPTS_DIR))
+    from depth_grid_binary import NODATA
+    from navigability_masks import FIRST_THRESHOLD_DM, MASK_COUNT, THRESHOLD_STEP_DM
+    from routing_graph import RoutingGraph, haversine_km
+
+    def unit_vectors(lats, lngs):
+        lats, lngs = np.radians(lats), np.radians(lngs)
+        return np.column_stack([np.cos(lats) * np.cos(lngs), np.cos(lats) * np.sin(lngs), np.sin(lats)])
+
+    graph = RoutingGraph.load(graph_file)
+    poi_lats = np.array([poi['location']['coordinates']['latitude'] for poi in pois])
+    poi_lngs = np.array([poi['location']['coordinates']['longitude'] for poi in pois])
+    poi_points = unit_vectors(poi_lats, poi_lngs)
+    node_points = unit_vectors(graph.lats, graph.lngs)
+    depths = graph.depths_dm.astype(np.int32)
+
+    thresholds = [FIRST_THRESHOLD_DM + k * THRESHOLD_STEP_DM for k in range(MASK_COUNT)]
+    tables = [[] for _ in pois]
+    for threshold in thresholds:
+        nodes = np.flatnonzero((depths == NODATA) | (depths >= threshold))
+        if len(nodes) == 0:
+            continue
+        k = min(SNAP_CANDIDATES, len(nodes))
+        _, candidates = cKDTree(node_points[nodes]).query(poi_points, k=k)
+        candidates = nodes[np.asarray(candidates).reshape(len(pois), k)]
+
+        # Chord order matches great-circle order; re-rank with the app's
+        # haversine so near-ties resolve to the lowest node, like findNearestGridPoint()
+        distances = haversine_km(poi_lats[:, None], poi_lngs[:, None],
+                                 graph.lats[candidates], graph.lngs[candidates])
+        for i, table in enumerate(tables):
+            best = min(range(k), key=lambda j: (distances[i, j], candidates[i, j]))
+            node = int(candidates[i, best])
+            if not table or table[-1][1] != node:
+                table.append([threshold, node, round(float(distances[i, best]), 4)])
+
+    for poi, table in zip(pois, tables):
+        poi["waterSnap"] = table
+
+    print(f"Snapped {len(pois)} POIs to {graph_file.name if isinstance(graph_file, Path) else graph_file} "
+          f"({sum(len(table) for table in tables)} snap entries over {len(thresholds)} depths)")
+
+    return {
+        "graphNodes": graph.node_count,
+        "graphEdges": graph.edge_count,
+        "graphDepthsHash": graph.depths_hash(),
+        "firstDepthDm": thresholds[0],
+        "lastDepthDm": thresholds[-1]
+    }
+
+
 def convert_csv_to_json(input_file, output_file):
     """Main conversion function."""
     print(f"Reading {input_file}...")
@@ -535,6 +621,8 @@ def convert_csv_to_json(input_file, output_file):
 
     print(f"Converted {len(pois)} POIs ({skipped} skipped)")
 
+    water_snap = attach_water_snaps(pois)
+
     # Build output structure
     output = {
         "version": "1.0",
@@ -542,6 +630,8 @@ def convert_csv_to_json(input_file, output_file):
         "source": "Lake Champlain & Hudson River Boater's Guide",
         "pois": pois
     }
+    if water_snap:
+        output["waterSnap"] = water_snap
 
     # Write JSON
     with open(output_file, 'w', encoding='utf-8') as f:
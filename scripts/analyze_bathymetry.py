@@ -3,9 +3,13 @@
 Analyze bathymetric GeoJSON files to understand their structure
 """
 
-import json
 import sys
 
+from geojson_stream import iter_features
+
+# Number of leading features used for structure/geometry-type sampling
+SAMPLE_SIZE = 1000
+
 def analyze_geojson(filepath):
     """Analyze a GeoJSON file and print statistics"""
     print(f"\n{'='*60}")
@@ -17,94 +21,96 @@ def analyze_geojson(filepath):
     file_size_mb = os.path.getsize(filepath) / (1024 * 1024)
     print(f"File size: {file_size_mb:.1f} MB")
 
-    # Load first 1000 features to analyze structure
-    print("Loading data (sampling first 1000 features)...")
+    # Stream features so files larger than memory can be analyzed;
+    # structure details come from the first SAMPLE_SIZE features
+    print(f"Streaming features (sampling first {SAMPLE_SIZE} for structure)...")
 
-    with open(filepath, 'r') as f:
-        # Read file line by line to avoid loading entire file
-        content = f.read()
+    total_features = 0
+    sample_feature = None
+    geometry_types = {}
+    depth_field = None
+    depth_min = None
+    depth_max = None
+    depth_samples = []
+    bounds = None
 
-    # Parse JSON
     try:
-        data = json.loads(content)
-    except json.JSONDecodeError as e:
+        for feature in iter_features(filepath):
+            total_features += 1
+            geom = feature.get('geometry') or {}
+            props = feature.get('properties') or {}
+
+            if sample_feature is None:
+                sample_feature = feature
+                # Look for depth field
+                depth_fields = [k for k in props.keys() if 'depth' in k.lower() or 'contour' in k.lower() or 'elev' in k.lower()]
+                if depth_fields:
+                    print(f"\nPotential depth fields: {depth_fields}")
+                    depth_field = depth_fields[0]
+
+            if total_features <= SAMPLE_SIZE:
+                geom_type = geom.get('type', 'Unknown')
+                geometry_types[geom_type] = geometry_types.get(geom_type, 0) + 1
+
+            # Depth statistics over every feature
+            if depth_field is not None:
+                depth_val = props.get(depth_field)
+                if depth_val is not None:
+                    depth_min = depth_val if depth_min is None else min(depth_min, depth_val)
+                    depth_max = depth_val if depth_max is None else max(depth_max, depth_val)
+                    if len(depth_samples) < 10:
+                        depth_samples.append(depth_val)
+
+            # Coordinate bounds over every feature
+            coords = geom.get('coordinates', [])
+            if geom.get('type') == 'Point':
+                points = [coords] if len(coords) >= 2 else []
+            elif geom.get('type') == 'LineString':
+                points = coords
+            elif geom.get('type') == 'MultiLineString':
+                points = [coord for line in coords for coord in line]
+            else:
+                points = []
+
+            for coord in points:
+                if len(coord) >= 2:
+                    lng, lat = coord[0], coord[1]
+                    if bounds is None:
+                        bounds = [lat, lat, lng, lng]
+                    else:
+                        bounds[0] = min(bounds[0], lat)
+                        bounds[1] = max(bounds[1], lat)
+                        bounds[2] = min(bounds[2], lng)
+                        bounds[3] = max(bounds[3], lng)
+    except ValueError as e:
         print(f"Error parsing JSON: {e}")
         return
 
-    # Basic structure
-    print(f"\nType: {data.get('type', 'Unknown')}")
-
-    features = data.get('features', [])
-    print(f"Total features: {len(features):,}")
+    print(f"Total features: {total_features:,}")
 
-    if not features:
+    if sample_feature is None:
         print("No features found!")
         return
 
     # Sample first feature to understand structure
-    sample_feature = features[0]
     print(f"\nSample feature structure:")
-    print(f"  Geometry type: {sample_feature.get('geometry', {}).get('type', 'Unknown')}")
-    print(f"  Properties: {list(sample_feature.get('properties', {}).keys())}")
+    print(f"  Geometry type: {(sample_feature.get('geometry') or {}).get('type', 'Unknown')}")
+    print(f"  Properties: {list((sample_feature.get('properties') or {}).keys())}")
 
-    # Analyze geometry types
-    geometry_types = {}
-    for feature in features[:1000]:  # Sample first 1000
-        geom_type = feature.get('geometry', {}).get('type', 'Unknown')
-        geometry_types[geom_type] = geometry_types.get(geom_type, 0) + 1
-
-    print(f"\nGeometry types (sample of {min(1000, len(features))}):")
+    print(f"\nGeometry types (sample of {min(SAMPLE_SIZE, total_features)}):")
     for geom_type, count in geometry_types.items():
         print(f"  {geom_type}: {count}")
 
-    # Analyze depth properties
-    if sample_feature.get('properties'):
-        props = sample_feature['properties']
-
-        # Look for depth field
-        depth_fields = [k for k in props.keys() if 'depth' in k.lower() or 'contour' in k.lower() or 'elev' in k.lower()]
+    if depth_samples:
+        print(f"\nDepth statistics (field: {depth_field}):")
+        print(f"  Min: {depth_min}")
+        print(f"  Max: {depth_max}")
+        print(f"  Sample values: {depth_samples}")
 
-        if depth_fields:
-            print(f"\nPotential depth fields: {depth_fields}")
-
-            # Sample depth values
-            depth_field = depth_fields[0]
-            depth_values = []
-            for feature in features[:1000]:
-                depth_val = feature.get('properties', {}).get(depth_field)
-                if depth_val is not None:
-                    depth_values.append(depth_val)
-
-            if depth_values:
-                print(f"\nDepth statistics (field: {depth_field}):")
-                print(f"  Min: {min(depth_values)}")
-                print(f"  Max: {max(depth_values)}")
-                print(f"  Sample values: {depth_values[:10]}")
-
-    # Coordinate bounds
-    lats = []
-    lngs = []
-
-    for feature in features[:1000]:
-        geom = feature.get('geometry', {})
-        coords = geom.get('coordinates', [])
-
-        if geom.get('type') == 'Point':
-            if len(coords) >= 2:
-                lngs.append(coords[0])
-                lats.append(coords[1])
-        elif geom.get('type') in ['LineString', 'MultiLineString']:
-            # Flatten line coords
-            if geom.get('type') == 'LineString':
-                for coord in coords:
-                    if len(coord) >= 2:
-                        lngs.append(coord[0])
-                        lats.append(coord[1])
-
-    if lats and lngs:
-        print(f"\nCoordinate bounds (sample):")
-        print(f"  Latitude: {min(lats):.4f} to {max(lats):.4f}")
-        print(f"  Longitude: {min(lngs):.4f} to {max(lngs):.4f}")
+    if bounds is not None:
+        print(f"\nCoordinate bounds:")
+        print(f"  Latitude: {bounds[0]:.4f} to {bounds[1]:.4f}")
+        print(f"  Longitude: {bounds[2]:.4f} to {bounds[3]:.4f}")
 
     print(f"\n{'='*60}\n")
 
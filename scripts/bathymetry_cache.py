@@ -0,0 +1,206 @@
+#!/usr/bin/env python3
+"""
+Columnar cache for bathymetric point clouds
+
+Parsing a multi-gigabyte GeoJSON export dominates every gridding run.
+This module converts it once into a compact .npz file holding the
+(lng, lat, depth_m) columns, keyed by the SHA-256 of the source file,
+and persists KD-tree spatial indexes built over those columns. Later
+runs - for example with a different minimum depth - load the cache
+instead of re-reading the source.
+
+Usage:
+    python bathymetry_cache.py build <geojson_file> [--cache-dir DIR]
+    python bathymetry_cache.py info <geojson_file> [--cache-dir DIR]
+
+Cache layout:
+    {cache_dir}/sources.json                 - size/mtime -> hash fingerprints
+    {cache_dir}/{hash}.npz                   - point columns
+    {cache_dir}/{hash}-{index_name}.kdtree   - pickled cKDTree
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import pickle
+import sys
+import time
+from pathlib import Path
+
+try:
+    import numpy as np
+    from scipy.spatial import cKDTree
+    from geojson_stream import iter_point_chunks
+except ImportError as e:
+    print(f"Missing dependency: {e}")
+    print("\nInstall required packages:")
+    print("pip install numpy scipy")
+    sys.exit(1)
+
+# Bump when the cached column layout changes
+CACHE_VERSION = 1
+
+DEFAULT_CACHE_DIR = Path("./bathymetry_cache")
+
+HASH_READ_SIZE = 1 << 24
+
+
+def _write_atomic(path, write):
+    """Write via a temporary file so readers never see a partial cache"""
+    tmp_path = path.with_name(path.name + '.tmp')
+    with open(tmp_path, 'wb') as f:
+        write(f)
+    os.replace(tmp_path, path)
+
+
+def source_hash(source_file, cache_dir=DEFAULT_CACHE_DIR, remember=True):
+    """
+    SHA-256 of a source file's contents
+
+    The digest is remembered in sources.json together with the file's
+    size and modification time, and only recomputed when either changes.
+    With remember=False a recomputed digest is not written back.
+    """
+    cache_dir = Path(cache_dir)
+    source = Path(source_file).resolve()
+    stat = source.stat()
+
+    fingerprints_file = cache_dir / 'sources.json'
+    fingerprints = {}
+    if fingerprints_file.exists():
+        with open(fingerprints_file, 'r') as f:
+            fingerprints = json.load(f)
+
+    known = fingerprints.get(str(source))
+    if known and known['size'] == stat.st_size and known['mtime_ns'] == stat.st_mtime_ns:
+        return known['sha256']
+
+    digest = hashlib.sha256()
+    with open(source, 'rb') as f:
+        for block in iter(lambda: f.read(HASH_READ_SIZE), b''):
+            digest.update(block)
+
+    if not remember:
+        return digest.hexdigest()
+
+    fingerprints[str(source)] = {
+        'size': stat.st_size,
+        'mtime_ns': stat.st_mtime_ns,
+        'sha256': digest.hexdigest()
+    }
+    cache_dir.mkdir(parents=True, exist_ok=True)
+    _write_atomic(fingerprints_file,
+                  lambda f: f.write(json.dumps(fingerprints, indent=2).encode('utf-8')))
+
+    return digest.hexdigest()
+
+
+def read_point_columns(cache_file):
+    """(lngs, lats, depths_m) from a cache file, or None if absent or outdated"""
+    if not Path(cache_file).exists():
+        return None
+    with np.load(cache_file, allow_pickle=False) as cached:
+        if int(cached['version']) != CACHE_VERSION:
+            return None
+        return cached['lng'], cached['lat'], cached['depth_m']
+
+
+def load_point_columns(bathymetry_file, cache_dir=DEFAULT_CACHE_DIR):
+    """
+    (lngs, lats, depths_m, digest) for every point feature with a depth
+
+    Columns are read from the cache when it matches the source file's
+    hash, and otherwise extracted from the GeoJSON and cached. No depth
+    filtering is applied, so one cache serves any minimum depth.
+    """
+    cache_dir = Path(cache_dir)
+    digest = source_hash(bathymetry_file, cache_dir)
+    cache_file = cache_dir / f"{digest}.npz"
+
+    columns = read_point_columns(cache_file)
+    if columns is not None:
+        return (*columns, digest)
+
+    print(f"Building bathymetry cache for {bathymetry_file}...")
+    lngs = []
+    lats = []
+    depths = []
+    for chunk_lngs, chunk_lats, chunk_depths in iter_point_chunks(bathymetry_file):
+        lngs.append(chunk_lngs.copy())
+        lats.append(chunk_lats.copy())
+        depths.append(chunk_depths.copy())
+
+    lngs = np.concatenate(lngs) if lngs else np.empty(0)
+    lats = np.concatenate(lats) if lats else np.empty(0)
+    depths = np.concatenate(depths) if depths else np.empty(0)
+
+    cache_dir.mkdir(parents=True, exist_ok=True)
+    _write_atomic(cache_file, lambda f: np.savez(
+        f, version=CACHE_VERSION, lng=lngs, lat=lats, depth_m=depths
+    ))
+    print(f"  Cached {len(depths):,} points to {cache_file}")
+
+    return lngs, lats, depths, digest
+
+
+def load_kdtree(digest, index_name, build_points, cache_dir=DEFAULT_CACHE_DIR):
+    """
+    Persisted cKDTree for a cached source, built on first use
+
+    index_name must identify everything the indexed points depend on
+    besides the source file (filters, projection). build_points is
+    called only when the index has to be built.
+    """
+    index_file = Path(cache_dir) / f"{digest}-{index_name}.kdtree"
+
+    if index_file.exists():
+        with open(index_file, 'rb') as f:
+            return pickle.load(f)
+
+    tree = cKDTree(build_points())
+    Path(cache_dir).mkdir(parents=True, exist_ok=True)
+    _write_atomic(index_file, lambda f: pickle.dump(tree, f, protocol=pickle.HIGHEST_PROTOCOL))
+    return tree
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Manage the bathymetry columnar cache')
+    parser.add_argument('command', choices=['build', 'info'])
+    parser.add_argument('bathymetry_file', help='Point cloud bathymetry GeoJSON file')
+    parser.add_argument('--cache-dir', default=str(DEFAULT_CACHE_DIR),
+                        help=f'Cache directory (default: {DEFAULT_CACHE_DIR})')
+    args = parser.parse_args()
+
+    started = time.perf_counter()
+    if args.command == 'build':
+        lngs, lats, depths, digest = load_point_columns(args.bathymetry_file, args.cache_dir)
+        cache_file = Path(args.cache_dir) / f"{digest}.npz"
+    else:
+        # Read-only: never builds the cache or records the fingerprint
+        digest = source_hash(args.bathymetry_file, args.cache_dir, remember=False)
+        cache_file = Path(args.cache_dir) / f"{digest}.npz"
+        columns = read_point_columns(cache_file)
+    elapsed = time.perf_counter() - started
+
+    print(f"Source: {args.bathymetry_file}")
+    print(f"  SHA-256: {digest}")
+
+    if args.command == 'info':
+        if columns is None:
+            print(f"  No cache for this source in {args.cache_dir}")
+            return
+        lngs, lats, depths = columns
+    print(f"  Points with depth: {len(depths):,}")
+    print(f"  Cache file: {cache_file} ({cache_file.stat().st_size / 1024:.1f} KB)")
+    print(f"  Loaded in {elapsed:.2f}s")
+
+    indexes = sorted(Path(args.cache_dir).glob(f"{digest}-*.kdtree"))
+    if indexes:
+        print(f"  Spatial indexes:")
+        for index_file in indexes:
+            print(f"    {index_file.name}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,83 @@
+/**
+ * Routing Latency Benchmark
+ *
+ * Usage: node benchmark_routing.js pairs.json
+ *
+ * Loads js/navigation.js with its data files read from disk, then times
+ * findPath() for each [startLat, startLng, endLat, endLng] pair in
+ * pairs.json ({pairs, draft, margin, hierarchy}). Long routes use the
+ * route hierarchy only if hierarchy is true. Prints one JSON result per
+ * pair ({ms, distance, nodes}) for the Python benchmarks to compare against.
+ */
+
+const fs = require('fs');
+const path = require('path');
+
+const REPO_ROOT = path.resolve(__dirname, '..');
+
+// Serve the app's data requests from the repository
+global.fetch = async (file) => {
+    const filePath = path.join(REPO_ROOT, file);
+    if (!fs.existsSync(filePath)) {
+        return { ok: false, status: 404 };
+    }
+
+    const buffer = fs.readFileSync(filePath);
+    return {
+        ok: true,
+        status: 200,
+        json: async () => JSON.parse(buffer),
+        arrayBuffer: async () => buffer.buffer.slice(buffer.byteOffset, buffer.byteOffset + buffer.length)
+    };
+};
+
+async function main() {
+    const pairsFile = process.argv[2];
+    if (!pairsFile) {
+        console.error('Usage: node benchmark_routing.js pairs.json');
+        process.exit(1);
+    }
+
+    const { pairs, draft, margin, hierarchy = false } = JSON.parse(fs.readFileSync(pairsFile, 'utf8'));
+
+    // navigation.js logs progress; keep stdout for results
+    const log = console.log;
+    console.log = () => {};
+    console.warn = () => {};
+
+    const nav = require(path.join(REPO_ROOT, 'js', 'navigation.js'));
+    await Promise.all([
+        nav.loadWaterBoundaries(),
+        nav.loadDepthData(),
+        nav.loadNavigabilityMasks(),
+        nav.loadShoreDistance(),
+        nav.loadRoutingGraph(),
+        nav.loadLandmarkTable()
+    ]);
+    nav.updateVesselSettings(draft, margin);
+
+    // updateVesselSettings() only starts loading the route hierarchy, so
+    // unless it is awaited here every route below is searched flat
+    if (hierarchy) {
+        await nav.loadRouteHierarchy();
+    }
+
+    const results = pairs.map(([startLat, startLng, endLat, endLng]) => {
+        const started = process.hrtime.bigint();
+        const route = nav.findPath(startLat, startLng, endLat, endLng);
+        const ms = Number(process.hrtime.bigint() - started) / 1e6;
+
+        return {
+            ms,
+            distance: route ? route.distance : null,
+            nodes: route ? route.path.map(point => point.node) : null
+        };
+    });
+
+    log(JSON.stringify(results));
+}
+
+main().catch(error => {
+    console.error(error);
+    process.exit(1);
+});
@@ -0,0 +1,196 @@
+#!/usr/bin/env python3
+"""
+Land colour classification for NOAA chart tiles
+
+The land colour rules are compiled once into a lookup table covering
+every 24-bit RGB colour, holding the mask value for each (0 = land,
+255 = water). Classifying a tile is then a single gather: each RGBA
+pixel is read as one little-endian 32-bit word, alpha is dropped and
+the remaining 24 bits index the table. Callers classifying many tiles
+pass reusable index and mask buffers, so a tile allocates nothing.
+Tiles stacked into one array classify in the same call, but this is no
+faster than a tile at a time: the 16 MiB table already overflows the
+CPU cache, and a larger index buffer only adds to that.
+
+The table is built by evaluating the rules themselves over all 2^24
+colours with the same uint8 arithmetic, so it matches them exactly;
+quantized (e.g. 32x32x32) tables would not, since the thresholds do not
+fall on bin edges.
+
+Usage:
+    python chart_colors.py bench [--tiles N] [--batch B]
+"""
+
+import argparse
+import sys
+import time
+
+try:
+    import numpy as np
+except ImportError as e:
+    print(f"Missing dependency: {e}")
+    print("\nInstall required packages:")
+    print("pip install numpy")
+    sys.exit(1)
+
+# Built on first use: 16 MiB, indexed by R | G << 8 | B << 16
+_land_color_lut = None
+
+
+def land_color_mask(r, g, b):
+    """
+    Mask for colour channel arrays (255 = keep/water, 0 = make transparent/land)
+
+    NOAA chart colors:
+    - Land: Tan/beige (RGB ~220, 200, 170) - sandy/earthy colors
+    - Water: Blue tints, white, light cyan
+    - Urban areas: Yellow/gray tints
+    - Depth contours: Blue lines on lighter background
+
+    This is the reference the lookup table is compiled from; edit the
+    rules here.
+    """
+    # Detect land colors in NOAA charts
+    # Land is typically tan/beige: high R, medium-high G, lower B
+    is_land_tan = (
+        (r > 180) & (r < 250) &
+        (g > 160) & (g < 230) &
+        (b > 120) & (b < 200) &
+        (r > b + 15) &  # R higher than B (tan/beige characteristic)
+        (g > b)  # G also higher than B
+    )
+
+    # Urban/developed areas often have yellow-gray tint
+    is_land_urban = (
+        (r > 190) & (g > 190) & (b > 150) & (b < 200) &
+        (abs(r.astype(int) - g.astype(int)) < 30)  # R and G similar
+    )
+
+    # Very light beige/cream for some land areas
+    is_land_light = (
+        (r > 230) & (g > 220) & (b > 200) & (b < 230) &
+        (r > b)
+    )
+
+    # Combine land detection
+    is_land = is_land_tan | is_land_urban | is_land_light
+
+    # Create mask (255 = keep/water, 0 = make transparent/land)
+    return np.where(is_land, 0, 255).astype(np.uint8)
+
+
+def land_color_lut():
+    """Mask value for every 24-bit colour, built from land_color_mask() once per process"""
+    global _land_color_lut
+    if _land_color_lut is None:
+        lut = np.empty(1 << 24, dtype=np.uint8)
+        # One blue value per block of 65,536 colours keeps the build small
+        g, r = np.divmod(np.arange(1 << 16, dtype=np.uint32), 256)
+        r = r.astype(np.uint8)
+        g = g.astype(np.uint8)
+        for b in range(256):
+            lut[b << 16:(b + 1) << 16] = land_color_mask(r, g, np.full_like(r, b))
+        _land_color_lut = lut
+    return _land_color_lut
+
+
+def detect_land_by_color(img_array, out=None, index=None):
+    """
+    Land mask for an RGBA uint8 image, or a stack of them
+
+    img_array has shape (..., 4), e.g. (256, 256, 4) for one tile or
+    (N, 256, 256, 4) for a batch; the mask has the leading shape (255 =
+    keep/water, 0 = make transparent/land). Pass out (uint8) and index
+    (uint32) of that shape to reuse the mask and table index buffers
+    across calls.
+    """
+    pixels = np.ascontiguousarray(img_array, dtype=np.uint8).view('<u4')[..., 0]
+    index = np.bitwise_and(pixels, 0xFFFFFF, out=index)
+    return np.take(land_color_lut(), index, out=out)
+
+
+# =============================================================================
+# Benchmark
+# =============================================================================
+
+def synthetic_tiles(count, seed=0):
+    """Chart-like RGBA tiles: blocks of land, water and urban colours with noise and contours"""
+    rng = np.random.default_rng(seed)
+    palette = np.array([
+        (220, 200, 170), (235, 225, 215), (205, 200, 180),  # tan, cream, urban
+        (180, 215, 240), (255, 255, 255), (200, 235, 245),  # water blues, white, cyan
+        (90, 120, 200), (40, 40, 40)                         # contours, text
+    ], dtype=np.int16)
+
+    blocks = rng.integers(0, len(palette), (count, 16, 16))
+    tiles = palette[blocks].repeat(16, axis=1).repeat(16, axis=2)
+    tiles = tiles + rng.integers(-20, 21, tiles.shape)
+    rgba = np.empty((count, 256, 256, 4), dtype=np.uint8)
+    rgba[..., :3] = np.clip(tiles, 0, 255)
+    rgba[..., 3] = 255
+    return rgba
+
+
+def run_bench(args):
+    tiles = synthetic_tiles(args.tiles)
+
+    started = time.perf_counter()
+    land_color_lut()
+    build_s = time.perf_counter() - started
+
+    started = time.perf_counter()
+    expected = [land_color_mask(tile[:, :, 0], tile[:, :, 1], tile[:, :, 2]) for tile in tiles]
+    rules_s = time.perf_counter() - started
+
+    started = time.perf_counter()
+    single = np.empty(tiles.shape[:3], dtype=np.uint8)
+    index = np.empty(tiles.shape[1:3], dtype=np.uint32)
+    for tile, mask in zip(tiles, single):
+        detect_land_by_color(tile, out=mask, index=index)
+    lut_s = time.perf_counter() - started
+
+    started = time.perf_counter()
+    batched = np.empty(tiles.shape[:3], dtype=np.uint8)
+    index = np.empty((args.batch,) + tiles.shape[1:3], dtype=np.uint32)
+    for start in range(0, len(tiles), args.batch):
+        count = len(tiles[start:start + args.batch])
+        detect_land_by_color(tiles[start:start + args.batch], out=batched[start:start + count],
+                             index=index[:count])
+    batch_s = time.perf_counter() - started
+
+    mismatches = sum(int((e != s).sum()) for e, s in zip(expected, single))
+    mismatches += int((np.stack(expected) != batched).sum())
+
+    # Every colour, against the rules evaluated directly
+    g, r = np.divmod(np.arange(1 << 16, dtype=np.uint32), 256)
+    for b in range(256):
+        rgba = np.empty((1 << 16, 4), dtype=np.uint8)
+        rgba[:, 0], rgba[:, 1], rgba[:, 2], rgba[:, 3] = r, g, b, 255
+        reference = land_color_mask(rgba[:, 0], rgba[:, 1], rgba[:, 2])
+        mismatches += int((detect_land_by_color(rgba) != reference).sum())
+
+    if mismatches:
+        print(f"✗ {mismatches:,} pixels differ from the colour rules")
+    else:
+        print(f"✓ Lookup table matches the colour rules for all {1 << 24:,} colours "
+              f"and {len(tiles)} tiles")
+    print(f"  Table built in {build_s:.2f} s ({land_color_lut().nbytes / 2**20:.0f} MiB)")
+    print(f"  Rules:          {len(tiles) / rules_s:8.1f} tiles/s")
+    print(f"  Lookup:         {len(tiles) / lut_s:8.1f} tiles/s")
+    print(f"  Lookup x{args.batch:<4}     {len(tiles) / batch_s:8.1f} tiles/s")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Chart tile land colour classifier')
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    bench = subparsers.add_parser('bench', help='Compare the lookup table with the colour rules')
+    bench.add_argument('--tiles', type=int, default=200, help='Synthetic 256 px tiles')
+    bench.add_argument('--batch', type=int, default=8, help='Tiles per batched lookup')
+
+    args = parser.parse_args()
+    run_bench(args)
+
+
+if __name__ == '__main__':
+    main()
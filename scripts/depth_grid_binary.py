@@ -0,0 +1,251 @@
+#!/usr/bin/env python3
+"""
+Dense binary depth grid format
+
+The JSON depth grid stores one {"lat", "lng", "depth"} object per cell.
+This format stores the same lattice as a row-major array instead:
+
+    Header (48 bytes, little-endian)
+        0   4s   magic "DGRD"
+        4   H    format version (1)
+        6   h    nodata sentinel (-32768)
+        8   I    rows
+        12  I    cols
+        16  d    south (latitude of row 0)
+        24  d    west (longitude of column 0)
+        32  d    latStep (degrees)
+        40  d    lngStep (degrees)
+    Body
+        48  <i2  rows * cols depths in decimetres, row 0 first
+
+The header is the grid's lattice (see grid_lattice.py): cell (row, col)
+is centered on (south + row * latStep, west + col * lngStep).
+js/navigation.js reads the same layout into an Int16Array.
+
+Usage:
+    python depth_grid_binary.py convert <depth-grid.json> [<output.bin>]
+    python depth_grid_binary.py info <depth-grid.bin>
+    python depth_grid_binary.py lookup <depth-grid.bin> <lat> <lng>
+"""
+
+import argparse
+import json
+import struct
+import sys
+from pathlib import Path
+
+try:
+    import numpy as np
+    from grid_lattice import GRID_CONFIG, GridLattice
+except ImportError as e:
+    print(f"Missing dependency: {e}")
+    print("\nInstall required packages:")
+    print("pip install numpy")
+    sys.exit(1)
+
+MAGIC = b'DGRD'
+VERSION = 1
+NODATA = -32768
+HEADER = struct.Struct('<4sHhIIdddd')
+HEADER_SIZE = HEADER.size  # 48
+
+# Depths are stored as integer decimetres
+DEPTH_SCALE = 10
+
+# Slack for float noise when quantizing (e.g. 4.0 m * 10 = 39.999...)
+QUANTIZE_EPSILON_DM = 1e-6
+
+
+def to_decimetres(depths_m):
+    """
+    Quantize depths in meters to int16 decimetres, rounding down
+
+    Rounding toward shallower water keeps the decimetre draft check
+    (minimumDepthDecimetres() in navigation.js) from admitting a cell
+    shallower than draft plus margin, as rounding to nearest would
+    (3.96 m -> 40 dm passes a 4.0 m minimum).
+    """
+    quantized = np.floor(np.asarray(depths_m, dtype=np.float64) * DEPTH_SCALE + QUANTIZE_EPSILON_DM)
+    return np.clip(quantized, NODATA + 1, np.iinfo(np.int16).max).astype('<i2')
+
+
+def write_depth_grid(path, lattice, depths_m):
+    """
+    Write a (rows, cols) array of depths in meters (NaN = no data)
+
+    lattice is the GridLattice the array is laid out on. Returns the
+    number of bytes written.
+    """
+    depths_m = np.asarray(depths_m, dtype=np.float64)
+    rows, cols = depths_m.shape
+    if (rows, cols) != (lattice.rows, lattice.cols):
+        raise ValueError(f"Depth array is {rows} x {cols} but lattice is {lattice.rows} x {lattice.cols}")
+
+    quantized = np.full(depths_m.shape, NODATA, dtype='<i2')
+    valid = np.isfinite(depths_m)
+    quantized[valid] = to_decimetres(depths_m[valid])
+
+    header = HEADER.pack(MAGIC, VERSION, NODATA, rows, cols,
+                         lattice.south, lattice.west, lattice.lat_step, lattice.lng_step)
+
+    with open(path, 'wb') as f:
+        f.write(header)
+        f.write(quantized.tobytes(order='C'))
+
+    return HEADER_SIZE + quantized.nbytes
+
+
+class DepthGrid:
+    """
+    Memory-mapped reader for a binary depth grid
+
+    Only the 48-byte header is read eagerly; depth lookups index
+    straight into the mapped file.
+    """
+
+    def __init__(self, path):
+        self.path = Path(path)
+
+        with open(self.path, 'rb') as f:
+            header = f.read(HEADER_SIZE)
+
+        if len(header) < HEADER_SIZE:
+            raise ValueError(f"{self.path} is too short to be a depth grid")
+
+        (magic, version, self.nodata, self.rows, self.cols,
+         self.south, self.west, self.lat_step, self.lng_step) = HEADER.unpack(header)
+
+        if magic != MAGIC:
+            raise ValueError(f"{self.path} is not a depth grid (bad magic {magic!r})")
+        if version != VERSION:
+            raise ValueError(f"{self.path} has unsupported depth grid version {version}")
+
+        self.decimetres = np.memmap(self.path, dtype='<i2', mode='r', offset=HEADER_SIZE,
+                                    shape=(self.rows, self.cols))
+        self.lattice = GridLattice(self.south, self.west, self.lat_step, self.lng_step,
+                                   self.rows, self.cols)
+
+    @property
+    def north(self):
+        return self.lattice.north
+
+    @property
+    def east(self):
+        return self.lattice.east
+
+    def cell_of(self, lat, lng):
+        """(row, col) of the cell nearest to lat/lng, or None outside the grid"""
+        return self.lattice.cell_of(lat, lng)
+
+    def depth_at_cell(self, row, col):
+        """Depth in meters of a lattice cell, or None where there is no data"""
+        value = int(self.decimetres[row, col])
+        if value == self.nodata:
+            return None
+        return value / DEPTH_SCALE
+
+    def depth_at(self, lat, lng):
+        """Depth in meters at lat/lng, or None where there is no data"""
+        cell = self.cell_of(lat, lng)
+        if cell is None:
+            return None
+        return self.depth_at_cell(*cell)
+
+    def depths_at(self, lats, lngs):
+        """Vectorized depth_at: depths in meters, NaN where there is no data"""
+        rows, cols = self.lattice.cells_of(lats, lngs)
+        inside = rows >= 0
+
+        result = np.full(rows.shape, np.nan)
+        values = self.decimetres[rows[inside], cols[inside]]
+        result[inside] = np.where(values == self.nodata, np.nan, values / DEPTH_SCALE)
+        return result
+
+    def to_array(self):
+        """Full (rows, cols) array of depths in meters with NaN for no data"""
+        values = np.asarray(self.decimetres)
+        return np.where(values == self.nodata, np.nan, values / DEPTH_SCALE)
+
+
+def convert_json_grid(json_file, output_file):
+    """
+    Convert a JSON depth grid (process_bathymetry_geojson.py output)
+
+    Grids that record their lattice in metadata are placed by row/col.
+    Older grids only record bounds, so the lattice is rebuilt from
+    those bounds and the GRID_CONFIG steps.
+    """
+    with open(json_file, 'r') as f:
+        data = json.load(f)
+
+    metadata = data['metadata']
+    if 'lattice' in metadata:
+        lattice = GridLattice.from_dict(metadata['lattice'])
+    else:
+        lattice = GridLattice.from_config({
+            'latStep': GRID_CONFIG['latStep'],
+            'lngStep': GRID_CONFIG['lngStep'],
+            'bounds': metadata['bounds']
+        })
+
+    points = list(data['depth_grid'].values())
+    if points and 'row' in points[0]:
+        rows = np.array([p['row'] for p in points])
+        cols = np.array([p['col'] for p in points])
+    else:
+        rows, cols = lattice.cells_of([p['lat'] for p in points], [p['lng'] for p in points])
+
+    depths = np.full((lattice.rows, lattice.cols), np.nan)
+    depths[rows, cols] = [p['depth'] for p in points]
+
+    size = write_depth_grid(output_file, lattice, depths)
+    return len(points), lattice, size
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Binary depth grid tools')
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    convert = subparsers.add_parser('convert', help='Convert a JSON depth grid to binary')
+    convert.add_argument('json_file', help='Input depth grid JSON file')
+    convert.add_argument('output_file', nargs='?', help='Output .bin file (default: alongside input)')
+
+    info = subparsers.add_parser('info', help='Show a binary depth grid header')
+    info.add_argument('grid_file')
+
+    lookup = subparsers.add_parser('lookup', help='Look up the depth at a coordinate')
+    lookup.add_argument('grid_file')
+    lookup.add_argument('lat', type=float)
+    lookup.add_argument('lng', type=float)
+
+    args = parser.parse_args()
+
+    if args.command == 'convert':
+        output_file = args.output_file or str(Path(args.json_file).with_suffix('.bin'))
+        points, lattice, size = convert_json_grid(args.json_file, output_file)
+        json_size = Path(args.json_file).stat().st_size
+        print(f"✓ Converted {points:,} grid points into a {lattice.rows} x {lattice.cols} lattice")
+        print(f"  {args.json_file}: {json_size / 1024:.1f} KB")
+        print(f"  {output_file}: {size / 1024:.1f} KB")
+
+    elif args.command == 'info':
+        grid = DepthGrid(args.grid_file)
+        valid = grid.decimetres != grid.nodata
+        print(f"Depth grid: {args.grid_file}")
+        print(f"  Lattice: {grid.rows} rows x {grid.cols} cols")
+        print(f"  Origin: {grid.south}, {grid.west}")
+        print(f"  Steps: {grid.lat_step}° lat, {grid.lng_step}° lng")
+        print(f"  Bounds: {grid.south:.6f} to {grid.north:.6f}, {grid.west:.6f} to {grid.east:.6f}")
+        print(f"  Cells with depth: {int(valid.sum()):,}")
+
+    else:
+        grid = DepthGrid(args.grid_file)
+        depth = grid.depth_at(args.lat, args.lng)
+        if depth is None:
+            print(f"No depth data at {args.lat}, {args.lng}")
+        else:
+            print(f"{depth:.1f} m at {args.lat}, {args.lng}")
+
+
+if __name__ == '__main__':
+    main()
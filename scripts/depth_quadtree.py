@@ -0,0 +1,384 @@
+#!/usr/bin/env python3
+"""
+Adaptive quadtree depth grid
+
+Each cell of the 200 m routing lattice is the root of a quadtree that
+subdivides (down to 50 m with the default two levels) where the
+shoreline or an island cuts through the cell, or where depth within
+the cell varies by more than DEPTH_SPLIT_RANGE_M. Open water stays at
+200 m, so the tree is a small fraction of a uniform fine grid.
+
+The tree is stored as a linear quadtree: one record per water leaf,
+sorted by the Morton (Z-order) code of the leaf's first cell on the
+finest lattice. A lookup is a binary search for the last leaf starting
+at or before the query cell. Land is not stored.
+
+    Header (56 bytes, little-endian)
+        0   4s   magic "DQTR"
+        4   H    format version (1)
+        6   h    nodata sentinel (-32768)
+        8   B    levels below the root lattice
+        9   x    padding
+        10  H    reserved (0)
+        12  I    root rows
+        16  I    root cols
+        20  I    leaves
+        24  d    south (latitude of root row 0)
+        32  d    west (longitude of root column 0)
+        40  d    root latStep (degrees)
+        48  d    root lngStep (degrees)
+    Body
+        56          <u4  leaves Morton codes (ascending)
+        56 + 4n     <i2  leaves depths in decimetres (shallowest sounding in the leaf)
+        56 + 6n     u1   leaves levels (0 = root cell)
+
+Usage:
+    python depth_quadtree.py build <bathymetry.geojson> <boundary.geojson> <output.qtree>
+    python depth_quadtree.py info <depth-quadtree.qtree>
+    python depth_quadtree.py lookup <depth-quadtree.qtree> <lat> <lng>
+"""
+
+import argparse
+import math
+import os
+import struct
+import sys
+import time
+from pathlib import Path
+
+try:
+    import numpy as np
+    from bathymetry_cache import DEFAULT_CACHE_DIR
+    from depth_grid_binary import DEPTH_SCALE, NODATA, to_decimetres
+    from grid_lattice import GRID_LATTICE, GridLattice
+    from process_bathymetry_geojson import (
+        EARTH_RADIUS_M, MIN_POINT_DEPTH_M, build_point_index, load_point_cloud,
+        query_nearest_points, rasterize_water_mask
+    )
+except ImportError as e:
+    print(f"Missing dependency: {e}")
+    print("\nInstall required packages:")
+    print("pip install numpy scipy")
+    sys.exit(1)
+
+MAGIC = b'DQTR'
+VERSION = 1
+HEADER = struct.Struct('<4sHhBxHIIIdddd')
+HEADER_SIZE = HEADER.size  # 56
+
+# Subdivision levels below the 200 m routing lattice (2 -> 50 m leaves)
+QUADTREE_LEVELS = 2
+
+# Cells whose soundings span more than this are subdivided
+DEPTH_SPLIT_RANGE_M = 1.5
+
+# Morton codes interleave 16-bit row/col indexes into a uint32
+MAX_FINE_CELLS_PER_AXIS = 1 << 16
+
+
+def _spread_bits(values):
+    """Insert a zero bit above each of the low 16 bits"""
+    v = np.asarray(values, dtype=np.uint64) & 0xFFFF
+    v = (v | (v << 8)) & 0x00FF00FF
+    v = (v | (v << 4)) & 0x0F0F0F0F
+    v = (v | (v << 2)) & 0x33333333
+    v = (v | (v << 1)) & 0x55555555
+    return v
+
+
+def morton_codes(rows, cols):
+    """Z-order codes of (row, col) cells on the finest lattice"""
+    return (_spread_bits(rows) << 1) | _spread_bits(cols)
+
+
+def build_quadtree(water, depths_m, levels=QUADTREE_LEVELS, depth_range_m=DEPTH_SPLIT_RANGE_M):
+    """
+    Subdivide root cells into water leaves
+
+    water and depths_m are (rows, cols) arrays on the finest lattice,
+    whose shape is the root lattice's times 2 ** levels. A cell splits
+    while it is partly land (shoreline or island) or its soundings span
+    more than depth_range_m. Each leaf takes the shallowest sounding
+    inside it, NaN if it has none.
+
+    Returns (codes, leaf_levels, leaf_depths_m) sorted by code.
+    """
+    water = np.asarray(water, dtype=bool)
+    sounded = water & np.isfinite(depths_m)
+    shallowest = np.where(sounded, depths_m, np.inf)
+    deepest = np.where(sounded, depths_m, -np.inf)
+
+    factor = 1 << levels
+    fine_rows, fine_cols = water.shape
+    if fine_rows % factor or fine_cols % factor:
+        raise ValueError(f"Fine lattice {fine_rows} x {fine_cols} is not a multiple of {factor}")
+    if max(fine_rows, fine_cols) > MAX_FINE_CELLS_PER_AXIS:
+        raise ValueError(f"Fine lattice {fine_rows} x {fine_cols} is too large for 32-bit Morton codes")
+
+    codes = []
+    leaf_levels = []
+    leaf_depths = []
+
+    active = np.ones((fine_rows // factor, fine_cols // factor), dtype=bool)
+    for level in range(levels + 1):
+        block = 1 << (levels - level)
+        shape = (fine_rows // block, block, fine_cols // block, block)
+
+        any_water = water.reshape(shape).any(axis=(1, 3))
+        all_water = water.reshape(shape).all(axis=(1, 3))
+        low = shallowest.reshape(shape).min(axis=(1, 3))
+        high = deepest.reshape(shape).max(axis=(1, 3))
+
+        if level < levels:
+            split = active & ((any_water & ~all_water) | (high - low > depth_range_m))
+        else:
+            split = np.zeros_like(active)
+
+        rows, cols = np.nonzero(active & ~split & any_water)
+        codes.append(morton_codes(rows * block, cols * block))
+        leaf_levels.append(np.full(len(rows), level, dtype=np.uint8))
+        leaf_depths.append(np.where(np.isfinite(low[rows, cols]), low[rows, cols], np.nan))
+
+        active = split.repeat(2, axis=0).repeat(2, axis=1)
+
+    codes = np.concatenate(codes)
+    order = np.argsort(codes, kind='stable')
+    return codes[order], np.concatenate(leaf_levels)[order], np.concatenate(leaf_depths)[order]
+
+
+def write_quadtree(path, lattice, levels, codes, leaf_levels, depths_m):
+    """
+    Write a linear quadtree over a root lattice
+
+    Returns the number of bytes written.
+    """
+    depths_m = np.asarray(depths_m, dtype=np.float64)
+    quantized = np.full(len(depths_m), NODATA, dtype='<i2')
+    valid = np.isfinite(depths_m)
+    quantized[valid] = to_decimetres(depths_m[valid])
+
+    header = HEADER.pack(MAGIC, VERSION, NODATA, levels, 0, lattice.rows, lattice.cols,
+                         len(codes), lattice.south, lattice.west,
+                         lattice.lat_step, lattice.lng_step)
+
+    with open(path, 'wb') as f:
+        f.write(header)
+        f.write(np.asarray(codes, dtype='<u4').tobytes())
+        f.write(quantized.tobytes())
+        f.write(np.asarray(leaf_levels, dtype='u1').tobytes())
+
+    return HEADER_SIZE + len(codes) * 7
+
+
+class DepthQuadtree:
+    """
+    Memory-mapped reader for a quadtree depth grid
+
+    Lookups return the leaf's depth together with its cell size, so
+    callers can tell 200 m open-water answers from 50 m shoreline ones.
+    """
+
+    def __init__(self, path):
+        self.path = Path(path)
+
+        with open(self.path, 'rb') as f:
+            header = f.read(HEADER_SIZE)
+
+        if len(header) < HEADER_SIZE:
+            raise ValueError(f"{self.path} is too short to be a depth quadtree")
+
+        (magic, version, self.nodata, self.levels, _, rows, cols, leaves,
+         south, west, lat_step, lng_step) = HEADER.unpack(header)
+
+        if magic != MAGIC:
+            raise ValueError(f"{self.path} is not a depth quadtree (bad magic {magic!r})")
+        if version != VERSION:
+            raise ValueError(f"{self.path} has unsupported depth quadtree version {version}")
+
+        self.lattice = GridLattice(south, west, lat_step, lng_step, rows, cols)
+        self.fine_lattice = self.lattice.subdivided(1 << self.levels)
+
+        self.codes = np.memmap(self.path, dtype='<u4', mode='r',
+                               offset=HEADER_SIZE, shape=(leaves,))
+        self.decimetres = np.memmap(self.path, dtype='<i2', mode='r',
+                                    offset=HEADER_SIZE + 4 * leaves, shape=(leaves,))
+        self.leaf_levels = np.memmap(self.path, dtype='u1', mode='r',
+                                     offset=HEADER_SIZE + 6 * leaves, shape=(leaves,))
+
+    @property
+    def leaves(self):
+        return len(self.codes)
+
+    def cell_size_m(self, level):
+        """Nominal north-south size in meters of a cell at a tree level"""
+        return math.radians(self.lattice.lat_step) * EARTH_RADIUS_M / (1 << int(level))
+
+    def depths_at(self, lats, lngs):
+        """
+        Vectorized lookup: (depths_m, cell_sizes_m) arrays
+
+        Depth is NaN for water leaves without soundings; both are NaN
+        on land and outside the tree.
+        """
+        rows, cols = self.fine_lattice.cells_of(lats, lngs)
+        codes = morton_codes(np.maximum(rows, 0), np.maximum(cols, 0))
+
+        leaf = np.searchsorted(self.codes, codes, side='right') - 1
+        found = (rows >= 0) & (leaf >= 0)
+        leaf = np.maximum(leaf, 0)
+
+        levels = np.asarray(self.leaf_levels[leaf], dtype=np.uint64)
+        span = np.left_shift(np.uint64(1), 2 * (np.uint64(self.levels) - levels))
+        found &= codes < np.asarray(self.codes[leaf], dtype=np.uint64) + span
+
+        values = np.asarray(self.decimetres[leaf])
+        depths = np.where(found & (values != self.nodata), values / DEPTH_SCALE, np.nan)
+        sizes = np.where(found, math.radians(self.lattice.lat_step) * EARTH_RADIUS_M
+                         / np.left_shift(1, levels.astype(np.int64)), np.nan)
+        return depths, sizes
+
+    def depth_at(self, lat, lng):
+        """
+        (depth_m, cell_size_m) at lat/lng, or None on land
+
+        depth_m is None for water without soundings.
+        """
+        depths, sizes = self.depths_at([lat], [lng])
+        if np.isnan(sizes[0]):
+            return None
+        return (None if np.isnan(depths[0]) else float(depths[0])), float(sizes[0])
+
+
+def build_from_point_cloud(bathymetry_file, water_boundary_file, output_file,
+                           levels=QUADTREE_LEVELS, depth_range_m=DEPTH_SPLIT_RANGE_M,
+                           min_depth_m=MIN_POINT_DEPTH_M, cache_dir=None, workers=1):
+    """
+    Build a quadtree from point cloud bathymetry on the routing lattice
+
+    Soundings are sampled at every water cell of the finest lattice with
+    the same nearest-point query as process_bathymetry_geojson.py.
+    """
+    print(f"Building depth quadtree: {bathymetry_file}")
+    timings = {}
+
+    started = time.perf_counter()
+    point_lats, point_lngs, point_depths, digest = load_point_cloud(
+        bathymetry_file, min_depth_m, cache_dir
+    )
+    if len(point_depths) == 0:
+        print("ERROR: No valid depth points found!")
+        return
+    tree = build_point_index(point_lats, point_lngs, digest, min_depth_m, cache_dir)
+    timings['load'] = time.perf_counter() - started
+
+    lattice = GRID_LATTICE
+    fine = lattice.subdivided(1 << levels)
+    lats, lngs = fine.axes()
+    cell_lats, cell_lngs = fine.cell_coordinates()
+
+    started = time.perf_counter()
+    water = rasterize_water_mask(water_boundary_file, lats, lngs)
+    timings['mask'] = time.perf_counter() - started
+
+    print(f"  Finest lattice: {fine.rows:,} x {fine.cols:,} "
+          f"({int(water.sum()):,} water cells)")
+
+    started = time.perf_counter()
+    water_cells = np.flatnonzero(water)
+    dists, nearest = query_nearest_points(tree, cell_lats, cell_lngs, water_cells,
+                                          fine.cols, workers)
+    found = np.isfinite(dists)
+    fine_depths = np.full(fine.size, np.nan)
+    fine_depths[water_cells[found]] = point_depths[nearest[found]]
+    timings['query'] = time.perf_counter() - started
+
+    started = time.perf_counter()
+    codes, leaf_levels, leaf_depths = build_quadtree(
+        water, fine_depths.reshape(fine.rows, fine.cols), levels, depth_range_m
+    )
+    timings['subdivide'] = time.perf_counter() - started
+
+    started = time.perf_counter()
+    size = write_quadtree(output_file, lattice, levels, codes, leaf_levels, leaf_depths)
+    timings['write'] = time.perf_counter() - started
+
+    print(f"\n✓ Created depth quadtree: {output_file} ({size / 1024:.1f} KB)")
+    print_level_summary(leaf_levels, levels, math.radians(lattice.lat_step) * EARTH_RADIUS_M)
+    print(f"  Uniform {fine_size_label(lattice, levels)} grid would need {int(water.sum()):,} water cells")
+    print(f"  Timings: " + ", ".join(f"{stage} {secs:.2f}s" for stage, secs in timings.items()))
+
+
+def fine_size_label(lattice, levels):
+    return f"{math.radians(lattice.lat_step) * EARTH_RADIUS_M / (1 << levels):.0f} m"
+
+
+def print_level_summary(leaf_levels, levels, root_size_m):
+    counts = np.bincount(np.asarray(leaf_levels), minlength=levels + 1)
+    print(f"  Leaves: {int(counts.sum()):,}")
+    for level, count in enumerate(counts):
+        print(f"    Level {level} ({root_size_m / (1 << level):.0f} m): {int(count):,}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Adaptive quadtree depth grid tools')
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    build = subparsers.add_parser('build', help='Build a quadtree from point cloud bathymetry')
+    build.add_argument('bathymetry_file', help='Point cloud bathymetry GeoJSON file')
+    build.add_argument('boundary_file', help='Water boundary GeoJSON file')
+    build.add_argument('output_file', help='Output .qtree file')
+    build.add_argument('--levels', type=int, default=QUADTREE_LEVELS,
+                       help=f'Subdivision levels below the routing lattice (default: {QUADTREE_LEVELS})')
+    build.add_argument('--depth-range', type=float, default=DEPTH_SPLIT_RANGE_M,
+                       help=f'Split cells whose depths span more than this many meters '
+                            f'(default: {DEPTH_SPLIT_RANGE_M})')
+    build.add_argument('--min-depth', type=float, default=MIN_POINT_DEPTH_M,
+                       help=f'Minimum point cloud depth in meters (default: {MIN_POINT_DEPTH_M})')
+    build.add_argument('--cache-dir', default=str(DEFAULT_CACHE_DIR),
+                       help=f'Point cloud cache directory (default: {DEFAULT_CACHE_DIR})')
+    build.add_argument('--no-cache', action='store_true',
+                       help='Stream the point cloud GeoJSON without using the cache')
+    build.add_argument('--workers', type=int, default=os.cpu_count() or 1,
+                       help='Worker processes for band-parallel sampling (default: CPU count)')
+
+    info = subparsers.add_parser('info', help='Show a depth quadtree summary')
+    info.add_argument('tree_file')
+
+    lookup = subparsers.add_parser('lookup', help='Look up the depth and cell size at a coordinate')
+    lookup.add_argument('tree_file')
+    lookup.add_argument('lat', type=float)
+    lookup.add_argument('lng', type=float)
+
+    args = parser.parse_args()
+
+    if args.command == 'build':
+        build_from_point_cloud(args.bathymetry_file, args.boundary_file, args.output_file,
+                               levels=args.levels, depth_range_m=args.depth_range,
+                               min_depth_m=args.min_depth,
+                               cache_dir=None if args.no_cache else args.cache_dir,
+                               workers=args.workers)
+
+    elif args.command == 'info':
+        tree = DepthQuadtree(args.tree_file)
+        lattice = tree.lattice
+        print(f"Depth quadtree: {args.tree_file}")
+        print(f"  Root lattice: {lattice.rows} rows x {lattice.cols} cols")
+        print(f"  Origin: {lattice.south}, {lattice.west}")
+        print(f"  Root steps: {lattice.lat_step}° lat, {lattice.lng_step}° lng")
+        print(f"  Levels: {tree.levels} (finest {fine_size_label(lattice, tree.levels)})")
+        print_level_summary(tree.leaf_levels, tree.levels, tree.cell_size_m(0))
+        print(f"  Leaves with depth: {int((tree.decimetres != tree.nodata).sum()):,}")
+
+    else:
+        tree = DepthQuadtree(args.tree_file)
+        result = tree.depth_at(args.lat, args.lng)
+        if result is None:
+            print(f"No water cell at {args.lat}, {args.lng}")
+        elif result[0] is None:
+            print(f"No depth data at {args.lat}, {args.lng} ({result[1]:.0f} m cell)")
+        else:
+            print(f"{result[0]:.1f} m at {args.lat}, {args.lng} ({result[1]:.0f} m cell)")
+
+
+if __name__ == '__main__':
+    main()
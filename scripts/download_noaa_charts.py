@@ -14,7 +14,7 @@ System Requirements:
     - gdal2tiles.py (included with GDAL)
 
 Usage:
-    python download_noaa_charts.py
+    python download_noaa_charts.py [--mbtiles FILE]
 
 Charts Downloaded:
     Lake Champlain: 14781, 14782, 14783
@@ -23,10 +23,15 @@ Charts Downloaded:
 Output:
     ./noaa_charts/     - Downloaded RNC files
     ./noaa_tiles/      - Generated map tiles (ready for hosting)
+
+With --mbtiles, the merged tiles go into one MBTiles file instead of
+./noaa_tiles/, storing each distinct image once (see mbtiles_store.py,
+which also exports it back to the directory layout).
 """
 
 import os
 import sys
+import argparse
 import subprocess
 import zipfile
 from pathlib import Path
@@ -34,6 +39,7 @@ from pathlib import Path
 try:
     import requests
     from tqdm import tqdm
+    from mbtiles_store import MBTilesStore, import_directory, print_stats
 except ImportError:
     print("Missing dependencies. Install with:")
     print("  pip install requests tqdm")
@@ -245,6 +251,11 @@ def merge_tilesets(source_dirs, output_dir):
 # =============================================================================
 
 def main():
+    parser = argparse.ArgumentParser(description='Download NOAA RNC charts and generate map tiles')
+    parser.add_argument('--mbtiles', metavar='FILE',
+                        help=f'Merge tiles into a deduplicating MBTiles file instead of {TILES_DIR}')
+    args = parser.parse_args()
+
     print("=" * 60)
     print("NOAA Chart Downloader and Tile Generator")
     print("=" * 60)
@@ -257,7 +268,8 @@ def main():
 
     # Create directories
     CHARTS_DIR.mkdir(parents=True, exist_ok=True)
-    TILES_DIR.mkdir(parents=True, exist_ok=True)
+    if not args.mbtiles:
+        TILES_DIR.mkdir(parents=True, exist_ok=True)
     TEMP_DIR.mkdir(parents=True, exist_ok=True)
 
     print(f"\nCharts to download: {len(CHARTS)}")
@@ -336,10 +348,24 @@ def main():
     print("Step 4: Merging tile sets...")
     print("-" * 60)
 
-    merge_tilesets(tile_dirs, TILES_DIR)
-
-    # Count output tiles
-    tile_count = sum(1 for _ in TILES_DIR.rglob("*.png"))
+    if args.mbtiles:
+        # Later tile sets replace earlier ones, as with merge_tilesets();
+        # gdal2tiles numbers rows TMS-style
+        with MBTilesStore(args.mbtiles, {
+            'name': 'NOAA charts',
+            'format': TILE_FORMAT,
+            'type': 'baselayer',
+            'attribution': 'NOAA Nautical Charts'
+        }) as store:
+            for tile_dir in tile_dirs:
+                import_directory(tile_dir, store, suffix=f".{TILE_FORMAT}", tms=True)
+            tile_count = store.stats()['tiles']
+            print_stats(store)
+    else:
+        merge_tilesets(tile_dirs, TILES_DIR)
+
+        # Count output tiles
+        tile_count = sum(1 for _ in TILES_DIR.rglob("*.png"))
 
     # Summary
     print("\n" + "=" * 60)
@@ -348,7 +374,12 @@ def main():
     print(f"  Charts downloaded: {len(downloaded)}")
     print(f"  GeoTIFFs created: {len(geotiffs)}")
     print(f"  Tiles generated: {tile_count}")
-    print(f"  Output directory: {TILES_DIR.absolute()}")
+    if args.mbtiles:
+        print(f"  MBTiles file: {Path(args.mbtiles).absolute()}")
+        print(f"\nExport to {{z}}/{{x}}/{{y}}.png for hosting with: "
+              f"python mbtiles_store.py export {args.mbtiles} {TILES_DIR} --tms")
+    else:
+        print(f"  Output directory: {TILES_DIR.absolute()}")
 
     print("\n" + "-" * 60)
     print("Next Steps:")
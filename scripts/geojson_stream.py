@@ -0,0 +1,193 @@
+#!/usr/bin/env python3
+"""
+Streaming reader for large GeoJSON FeatureCollections
+
+Decodes one feature at a time from a rolling text buffer, so memory
+stays bounded no matter how large the file is. Point features can be
+collected into preallocated columnar arrays in fixed-size chunks.
+
+Usage:
+    from geojson_stream import iter_features, iter_point_chunks
+
+    for lngs, lats, depths_m in iter_point_chunks('dem.geojson'):
+        ...
+"""
+
+import json
+import sys
+
+try:
+    import numpy as np
+except ImportError as e:
+    print(f"Missing dependency: {e}")
+    print("\nInstall required packages:")
+    print("pip install numpy")
+    sys.exit(1)
+
+READ_SIZE = 1 << 20         # characters read from disk per refill
+POINT_CHUNK_SIZE = 1 << 16  # points per yielded chunk
+
+# Property names probed for point depth, in priority order (feet)
+POINT_DEPTH_FIELDS = ('DEPTH_FT', 'depth_ft', 'DEPTH')
+
+_WHITESPACE = ' \t\n\r'
+
+
+class _StreamDecoder:
+    """Incremental JSON value decoder over a text file"""
+
+    def __init__(self, f, read_size=READ_SIZE):
+        self.f = f
+        self.read_size = read_size
+        self.buf = ''
+        self.pos = 0
+        self.eof = False
+        self.decoder = json.JSONDecoder()
+
+    def _refill(self, size=None):
+        if self.eof:
+            return False
+        data = self.f.read(size or self.read_size)
+        if not data:
+            self.eof = True
+            return False
+        # Drop consumed text before appending
+        self.buf = self.buf[self.pos:] + data
+        self.pos = 0
+        return True
+
+    def peek(self):
+        """Next non-whitespace character (without consuming it), or ''"""
+        while True:
+            while self.pos < len(self.buf) and self.buf[self.pos] in _WHITESPACE:
+                self.pos += 1
+            if self.pos < len(self.buf):
+                return self.buf[self.pos]
+            if not self._refill():
+                return ''
+
+    def expect(self, char):
+        found = self.peek()
+        if found != char:
+            raise ValueError(f"Expected {char!r} in GeoJSON stream, found {found!r}")
+        self.pos += 1
+
+    def _grow(self):
+        """
+        Read at least as much again as is buffered past pos
+
+        Doubling keeps a value many times read_size from being re-decoded
+        from its start after every read_size refill, which is quadratic.
+        """
+        return self._refill(max(self.read_size, len(self.buf) - self.pos))
+
+    def value(self):
+        """Decode the next complete JSON value"""
+        self.peek()
+        while True:
+            try:
+                value, end = self.decoder.raw_decode(self.buf, self.pos)
+            except json.JSONDecodeError:
+                # Most likely the value runs past the buffer - read more
+                if not self._grow():
+                    raise
+                continue
+
+            # A number at the very end of the buffer may be cut short
+            if end == len(self.buf) and not self.eof and isinstance(value, (int, float)):
+                self._grow()
+                continue
+
+            self.pos = end
+            return value
+
+
+def iter_features(filepath, read_size=READ_SIZE):
+    """
+    Yield features from a GeoJSON FeatureCollection one at a time
+
+    Top-level members other than "features" are decoded and skipped,
+    so their order in the file does not matter.
+    """
+    with open(filepath, 'r') as f:
+        stream = _StreamDecoder(f, read_size)
+        stream.expect('{')
+
+        if stream.peek() == '}':
+            return
+
+        while True:
+            key = stream.value()
+            stream.expect(':')
+
+            if key == 'features':
+                stream.expect('[')
+                if stream.peek() == ']':
+                    stream.pos += 1
+                else:
+                    while True:
+                        yield stream.value()
+                        if stream.peek() == ',':
+                            stream.pos += 1
+                            continue
+                        stream.expect(']')
+                        break
+            else:
+                stream.value()
+
+            if stream.peek() == ',':
+                stream.pos += 1
+                continue
+            stream.expect('}')
+            return
+
+
+def point_depth_ft(properties):
+    """Raw depth value of a point feature in feet, or None"""
+    for field in POINT_DEPTH_FIELDS:
+        value = properties.get(field)
+        if value:
+            return value
+    return properties.get(POINT_DEPTH_FIELDS[-1])
+
+
+def iter_point_chunks(filepath, chunk_size=POINT_CHUNK_SIZE, stats=None):
+    """
+    Yield (lngs, lats, depths_m) arrays for point features with a depth
+
+    Arrays are views into buffers allocated once and reused for every
+    chunk - copy them if they must outlive the next iteration. Depths
+    are converted from (negative) feet to positive meters. If stats is
+    a dict, it receives the total number of features read.
+    """
+    lngs = np.empty(chunk_size, dtype=np.float64)
+    lats = np.empty(chunk_size, dtype=np.float64)
+    depths = np.empty(chunk_size, dtype=np.float64)
+
+    count = 0
+    features = 0
+    for feature in iter_features(filepath):
+        features += 1
+        geometry = feature.get('geometry') or {}
+        if geometry.get('type') != 'Point':
+            continue
+
+        depth_ft = point_depth_ft(feature.get('properties') or {})
+        if depth_ft is None:
+            continue
+
+        coords = geometry['coordinates']
+        lngs[count] = coords[0]
+        lats[count] = coords[1]
+        depths[count] = abs(float(depth_ft)) * 0.3048
+        count += 1
+
+        if count == chunk_size:
+            yield lngs, lats, depths
+            count = 0
+
+    if count:
+        yield lngs[:count], lats[:count], depths[:count]
+
+    if stats is not None:
+        stats['features'] = features
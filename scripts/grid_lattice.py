@@ -0,0 +1,165 @@
+#!/usr/bin/env python3
+"""
+Integer-indexed grid lattice shared by the depth and routing builders
+
+Every grid artifact is addressed by (row, col) on a lattice defined by
+an origin, steps and a size. Cell coordinates are always computed as
+
+    lat = south + row * latStep
+    lng = west + col * lngStep
+
+never by accumulating steps, and js/navigation.js uses the same formula,
+so Python and JavaScript agree on every cell.
+"""
+
+import math
+import sys
+
+try:
+    import numpy as np
+except ImportError as e:
+    print(f"Missing dependency: {e}")
+    print("\nInstall required packages:")
+    print("pip install numpy")
+    sys.exit(1)
+
+# Grid configuration (must match navigation.js)
+GRID_CONFIG = {
+    'latStep': 0.00180,  # 200m
+    'lngStep': 0.00240,  # 200m
+    'bounds': {
+        'south': 43.5300,
+        'north': 45.0900,
+        'west': -73.5200,
+        'east': -73.0700
+    }
+}
+
+# Tolerance when deciding whether a bound falls on a lattice line
+_EPSILON = 1e-9
+
+
+class GridLattice:
+    """Origin, steps and size of a row-major grid lattice"""
+
+    def __init__(self, south, west, lat_step, lng_step, rows, cols):
+        self.south = float(south)
+        self.west = float(west)
+        self.lat_step = float(lat_step)
+        self.lng_step = float(lng_step)
+        self.rows = int(rows)
+        self.cols = int(cols)
+
+    @classmethod
+    def from_config(cls, config=GRID_CONFIG):
+        """Lattice covering a GRID_CONFIG-style {latStep, lngStep, bounds} dict"""
+        bounds = config['bounds']
+        rows = math.floor((bounds['north'] - bounds['south']) / config['latStep'] + _EPSILON) + 1
+        cols = math.floor((bounds['east'] - bounds['west']) / config['lngStep'] + _EPSILON) + 1
+        return cls(bounds['south'], bounds['west'], config['latStep'], config['lngStep'], rows, cols)
+
+    @classmethod
+    def from_dict(cls, data):
+        """Lattice from its to_dict() form (as stored in grid artifacts)"""
+        return cls(data['south'], data['west'], data['latStep'], data['lngStep'],
+                   data['rows'], data['cols'])
+
+    def to_dict(self):
+        return {
+            'south': self.south,
+            'west': self.west,
+            'latStep': self.lat_step,
+            'lngStep': self.lng_step,
+            'rows': self.rows,
+            'cols': self.cols
+        }
+
+    def covering(self, south, north, west, east):
+        """
+        Lattice aligned with this one spanning the given bounds
+
+        The result shares this lattice's steps and grid lines but may
+        extend past its edges (e.g. Hudson River data on the Lake
+        Champlain lattice).
+        """
+        first_row = math.ceil((south - self.south) / self.lat_step - _EPSILON)
+        last_row = math.floor((north - self.south) / self.lat_step + _EPSILON)
+        first_col = math.ceil((west - self.west) / self.lng_step - _EPSILON)
+        last_col = math.floor((east - self.west) / self.lng_step + _EPSILON)
+
+        return GridLattice(self.south + first_row * self.lat_step,
+                           self.west + first_col * self.lng_step,
+                           self.lat_step, self.lng_step,
+                           max(0, last_row - first_row + 1),
+                           max(0, last_col - first_col + 1))
+
+    def subdivided(self, factor):
+        """
+        Lattice splitting every cell into factor x factor sub-cells
+
+        Cell (row, col) of this lattice is covered by sub-cells
+        (row * factor + i, col * factor + j) for 0 <= i, j < factor.
+        """
+        lat_step = self.lat_step / factor
+        lng_step = self.lng_step / factor
+        return GridLattice(self.south - (self.lat_step - lat_step) / 2,
+                           self.west - (self.lng_step - lng_step) / 2,
+                           lat_step, lng_step,
+                           self.rows * factor, self.cols * factor)
+
+    @property
+    def size(self):
+        return self.rows * self.cols
+
+    @property
+    def north(self):
+        return self.south + (self.rows - 1) * self.lat_step
+
+    @property
+    def east(self):
+        return self.west + (self.cols - 1) * self.lng_step
+
+    def bounds(self):
+        return {'south': self.south, 'north': self.north, 'west': self.west, 'east': self.east}
+
+    def axes(self):
+        """(row latitudes, column longitudes) arrays"""
+        return (self.south + np.arange(self.rows) * self.lat_step,
+                self.west + np.arange(self.cols) * self.lng_step)
+
+    def cell_coordinates(self):
+        """(lats, lngs) of every cell in row-major order"""
+        lats, lngs = self.axes()
+        return np.repeat(lats, self.cols), np.tile(lngs, self.rows)
+
+    def cells_of(self, lats, lngs):
+        """
+        Nearest (rows, cols) for coordinate arrays
+
+        Returns integer arrays; cells outside the lattice are -1 in both.
+        """
+        rows = np.rint((np.asarray(lats, dtype=np.float64) - self.south) / self.lat_step).astype(np.int64)
+        cols = np.rint((np.asarray(lngs, dtype=np.float64) - self.west) / self.lng_step).astype(np.int64)
+        outside = (rows < 0) | (rows >= self.rows) | (cols < 0) | (cols >= self.cols)
+        rows[outside] = -1
+        cols[outside] = -1
+        return rows, cols
+
+    def cell_of(self, lat, lng):
+        """(row, col) of the cell nearest to lat/lng, or None outside the lattice"""
+        row = round((lat - self.south) / self.lat_step)
+        col = round((lng - self.west) / self.lng_step)
+        if 0 <= row < self.rows and 0 <= col < self.cols:
+            return row, col
+        return None
+
+    def __eq__(self, other):
+        return isinstance(other, GridLattice) and self.to_dict() == other.to_dict()
+
+    def __repr__(self):
+        return (f"GridLattice(south={self.south}, west={self.west}, lat_step={self.lat_step}, "
+                f"lng_step={self.lng_step}, rows={self.rows}, cols={self.cols})")
+
+
+# The routing lattice used by navigation.js
+GRID_LATTICE = GridLattice.from_config(GRID_CONFIG)
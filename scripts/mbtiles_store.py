@@ -0,0 +1,258 @@
+#!/usr/bin/env python3
+"""
+MBTiles tile store with content-hash deduplication
+
+Chart tilesets at zoom 14-16 run to hundreds of thousands of small
+files, many of them byte-identical (fully transparent land tiles,
+uniform open water). This store keeps a tileset in one SQLite file in
+the MBTiles 1.3 layout, storing each distinct image once:
+
+    images(tile_id, tile_data)                          - one row per distinct blob,
+                                                          tile_id = SHA-256 of the bytes
+    map(zoom_level, tile_column, tile_row, tile_id)     - one row per tile
+    tiles                                               - view joining the two, as MBTiles
+                                                          readers expect
+    metadata(name, value)
+
+MBTiles numbers rows bottom-up (TMS); the store converts, so callers
+use XYZ rows as in the {z}/{x}/{y}.png layout Leaflet reads. Directories
+written by gdal2tiles without --xyz already number rows TMS-style;
+import those with --tms (tms=True) so their rows are stored unflipped.
+
+Usage:
+    python mbtiles_store.py import <tiles_dir> <mbtiles_file> [--name NAME] [--tms]
+    python mbtiles_store.py export <mbtiles_file> <output_dir> [--tms]
+    python mbtiles_store.py info <mbtiles_file>
+"""
+
+import argparse
+import hashlib
+import sqlite3
+import sys
+from pathlib import Path
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS metadata (name TEXT PRIMARY KEY, value TEXT);
+CREATE TABLE IF NOT EXISTS images (tile_id TEXT PRIMARY KEY, tile_data BLOB);
+CREATE TABLE IF NOT EXISTS map (
+    zoom_level INTEGER, tile_column INTEGER, tile_row INTEGER, tile_id TEXT,
+    PRIMARY KEY (zoom_level, tile_column, tile_row)
+);
+CREATE VIEW IF NOT EXISTS tiles AS
+    SELECT map.zoom_level AS zoom_level, map.tile_column AS tile_column,
+           map.tile_row AS tile_row, images.tile_data AS tile_data
+    FROM map JOIN images ON images.tile_id = map.tile_id;
+"""
+
+# Tiles written per transaction
+COMMIT_EVERY = 500
+
+
+def _tms_row(z, y):
+    """MBTiles tile_row for an XYZ row (the same flip in both directions)"""
+    return (1 << z) - 1 - y
+
+
+class MBTilesStore:
+    """
+    Deduplicating MBTiles file, used as a context manager
+
+    Writes are batched into transactions of COMMIT_EVERY tiles and
+    committed on close, when zoom range metadata is refreshed, images
+    no longer referenced by any tile are dropped and the file leaves WAL
+    mode, so it can be shipped on its own. A store may be handed to one
+    other thread at a time (e.g. a single writer thread).
+
+    With read_only=True an existing file is opened without being changed
+    in any way: no schema, journal mode or close-time cleanup.
+    """
+
+    def __init__(self, path, metadata=None, read_only=False):
+        self.path = Path(path)
+        self.read_only = read_only
+        self._pending = 0
+
+        if read_only:
+            self.db = sqlite3.connect(f"{self.path.resolve().as_uri()}?mode=ro", uri=True,
+                                      check_same_thread=False)
+            return
+
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.db = sqlite3.connect(self.path, check_same_thread=False)
+        self.db.execute("PRAGMA journal_mode = WAL")
+        self.db.execute("PRAGMA synchronous = NORMAL")
+        self.db.executescript(SCHEMA)
+        if metadata:
+            self.set_metadata(**metadata)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def set_metadata(self, **items):
+        """Set MBTiles metadata such as name, format, bounds and attribution"""
+        self.db.executemany("INSERT OR REPLACE INTO metadata (name, value) VALUES (?, ?)",
+                            [(name, str(value)) for name, value in items.items()])
+        self.db.commit()
+
+    def metadata(self):
+        return dict(self.db.execute("SELECT name, value FROM metadata"))
+
+    def put(self, z, x, y, data):
+        """Store a tile's bytes, replacing any tile already at z/x/y"""
+        tile_id = hashlib.sha256(data).hexdigest()
+        self.db.execute("INSERT OR IGNORE INTO images (tile_id, tile_data) VALUES (?, ?)",
+                        (tile_id, sqlite3.Binary(data)))
+        self.db.execute("INSERT OR REPLACE INTO map (zoom_level, tile_column, tile_row, tile_id) "
+                        "VALUES (?, ?, ?, ?)", (z, x, _tms_row(z, y), tile_id))
+        self._pending += 1
+        if self._pending >= COMMIT_EVERY:
+            self.commit()
+
+    def get(self, z, x, y):
+        """Tile bytes, or None"""
+        row = self.db.execute(
+            "SELECT tile_data FROM tiles WHERE zoom_level = ? AND tile_column = ? AND tile_row = ?",
+            (z, x, _tms_row(z, y))).fetchone()
+        return row[0] if row else None
+
+    def tile_keys(self):
+        """Set of (z, x, y) for every stored tile"""
+        return {(z, x, _tms_row(z, row))
+                for z, x, row in self.db.execute("SELECT zoom_level, tile_column, tile_row FROM map")}
+
+    def tiles(self):
+        """(z, x, y, data) for every stored tile"""
+        cursor = self.db.execute("SELECT zoom_level, tile_column, tile_row, tile_data FROM tiles")
+        for z, x, row, data in cursor:
+            yield z, x, _tms_row(z, row), data
+
+    def stats(self):
+        """{tiles, images, image_bytes}"""
+        tiles, = self.db.execute("SELECT COUNT(*) FROM map").fetchone()
+        images, image_bytes = self.db.execute(
+            "SELECT COUNT(*), COALESCE(SUM(LENGTH(tile_data)), 0) FROM images").fetchone()
+        return {'tiles': tiles, 'images': images, 'image_bytes': image_bytes}
+
+    def commit(self):
+        self.db.commit()
+        self._pending = 0
+
+    def close(self):
+        """Commit, drop orphaned images, record the zoom range and leave WAL mode"""
+        if self.read_only:
+            self.db.close()
+            return
+
+        self.db.execute("DELETE FROM images WHERE tile_id NOT IN (SELECT tile_id FROM map)")
+        zooms = self.db.execute("SELECT MIN(zoom_level), MAX(zoom_level) FROM map").fetchone()
+        self.commit()
+        if zooms[0] is not None:
+            self.set_metadata(minzoom=zooms[0], maxzoom=zooms[1])
+        # Checkpoints the WAL and removes the -wal/-shm files
+        self.db.execute("PRAGMA journal_mode = DELETE")
+        self.db.close()
+
+
+def iter_directory_tiles(tiles_dir, suffix='.png'):
+    """(z, x, y, path) for every tile file in a {z}/{x}/{y}{suffix} directory"""
+    for path in sorted(Path(tiles_dir).glob(f'*/*/*{suffix}')):
+        try:
+            z, x, y = int(path.parent.parent.name), int(path.parent.name), int(path.stem)
+        except ValueError:
+            continue
+        yield z, x, y, path
+
+
+def import_directory(tiles_dir, store, suffix='.png', tms=False):
+    """
+    Add every tile in a directory layout to a store; returns the number added
+
+    tms=True reads directory rows as TMS (bottom-up, as gdal2tiles
+    writes them by default) instead of XYZ.
+    """
+    count = 0
+    for z, x, y, path in iter_directory_tiles(tiles_dir, suffix):
+        if tms:
+            y = _tms_row(z, y)
+        store.put(z, x, y, path.read_bytes())
+        count += 1
+    store.commit()
+    return count
+
+
+def export_directory(store, output_dir, suffix='.png', tms=False):
+    """
+    Write every tile in a store to {output_dir}/{z}/{x}/{y}{suffix};
+    returns the number written. tms=True writes TMS rows instead of XYZ.
+    """
+    output_dir = Path(output_dir)
+    count = 0
+    for z, x, y, data in store.tiles():
+        if tms:
+            y = _tms_row(z, y)
+        path = output_dir / str(z) / str(x) / f"{y}{suffix}"
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_bytes(data)
+        count += 1
+    return count
+
+
+def print_stats(store):
+    stats = store.stats()
+    print(f"  Tiles: {stats['tiles']:,}")
+    print(f"  Unique images: {stats['images']:,} ({stats['image_bytes'] / 2**20:.1f} MB)")
+    if stats['tiles']:
+        print(f"  Duplicates stored once: {stats['tiles'] - stats['images']:,} "
+              f"({1 - stats['images'] / stats['tiles']:.0%} of tiles)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Deduplicating MBTiles tile store')
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    import_parser = subparsers.add_parser('import', help='Pack a {z}/{x}/{y}.png directory')
+    import_parser.add_argument('tiles_dir')
+    import_parser.add_argument('mbtiles_file')
+    import_parser.add_argument('--name', help='Tileset name (default: directory name)')
+    import_parser.add_argument('--tms', action='store_true',
+                               help='Directory rows are TMS (gdal2tiles without --xyz)')
+
+    export_parser = subparsers.add_parser('export', help='Write tiles out as {z}/{x}/{y}.png')
+    export_parser.add_argument('mbtiles_file')
+    export_parser.add_argument('output_dir')
+    export_parser.add_argument('--tms', action='store_true', help='Write TMS rows instead of XYZ')
+
+    info_parser = subparsers.add_parser('info', help='Show metadata and deduplication')
+    info_parser.add_argument('mbtiles_file')
+
+    args = parser.parse_args()
+
+    if args.command != 'import' and not Path(args.mbtiles_file).exists():
+        print(f"No such MBTiles file: {args.mbtiles_file}")
+        sys.exit(1)
+
+    if args.command == 'import':
+        name = args.name or Path(args.tiles_dir).resolve().name
+        with MBTilesStore(args.mbtiles_file, {'name': name, 'format': 'png'}) as store:
+            count = import_directory(args.tiles_dir, store, tms=args.tms)
+            print(f"✓ Imported {count:,} tiles into {args.mbtiles_file}")
+            print_stats(store)
+
+    elif args.command == 'export':
+        with MBTilesStore(args.mbtiles_file, read_only=True) as store:
+            count = export_directory(store, args.output_dir, tms=args.tms)
+        print(f"✓ Exported {count:,} tiles to {args.output_dir}")
+
+    else:
+        with MBTilesStore(args.mbtiles_file, read_only=True) as store:
+            print(f"MBTiles: {args.mbtiles_file}")
+            for name, value in sorted(store.metadata().items()):
+                print(f"  {name}: {value}")
+            print_stats(store)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,174 @@
+#!/usr/bin/env python3
+"""
+Precomputed navigability masks per minimum-depth threshold
+
+For every threshold from 0 to 3 m in 0.1 m steps, one bit per cell of
+the routing lattice says whether a vessel needing that much water
+(draft plus safety margin) may use the cell: it must be in water, and
+either deeper than the threshold or without depth data (which routing
+treats as navigable). Threshold 0 is the plain water mask.
+
+js/navigation.js loads the masks once; changing the vessel draft then
+selects another mask instead of re-testing every cell against the
+boundary polygons and depth grid.
+
+    Header (56 bytes, little-endian)
+        0   4s   magic "NAVM"
+        4   H    format version (1)
+        6   H    number of masks
+        8   H    first threshold (decimetres)
+        10  H    threshold step (decimetres)
+        12  I    rows
+        16  I    cols
+        20  d    south (latitude of row 0)
+        28  d    west (longitude of column 0)
+        36  d    latStep (degrees)
+        44  d    lngStep (degrees)
+        52  4x   padding
+    Body
+        56  masks * ceil(rows * cols / 8) bytes; mask k is for threshold
+            first + k * step. Cell (row, col) is bit (i % 8) of byte i // 8
+            with i = row * cols + col (least significant bit first).
+
+Usage:
+    python navigability_masks.py <boundary.geojson> <output.bin> <depth-grid.bin> [<depth-grid.bin> ...]
+    python navigability_masks.py --info <navigability.bin>
+"""
+
+import argparse
+import struct
+import sys
+
+try:
+    import numpy as np
+    from depth_grid_binary import DEPTH_SCALE, DepthGrid
+    from grid_lattice import GRID_LATTICE, GridLattice
+    from process_bathymetry_geojson import rasterize_water_mask
+except ImportError as e:
+    print(f"Missing dependency: {e}")
+    print("\nInstall required packages:")
+    print("pip install numpy scipy")
+    sys.exit(1)
+
+MAGIC = b'NAVM'
+VERSION = 1
+HEADER = struct.Struct('<4sHHHHIIdddd4x')
+HEADER_SIZE = HEADER.size  # 56
+
+# Thresholds in decimetres: 0.0 m to 3.0 m every 0.1 m
+FIRST_THRESHOLD_DM = 0
+THRESHOLD_STEP_DM = 1
+MASK_COUNT = 31
+
+
+def lattice_depths(lattice, depth_grid_files):
+    """
+    (rows, cols) depths in decimetres on a lattice, -1 where no data
+
+    Depth grids are consulted in order and the first with data for a
+    cell wins, matching getDepthAt() in navigation.js.
+    """
+    depths = np.full((lattice.rows, lattice.cols), -1, dtype=np.int32)
+    lats, lngs = lattice.cell_coordinates()
+
+    for depth_grid_file in depth_grid_files:
+        grid = DepthGrid(depth_grid_file)
+        rows, cols = grid.lattice.cells_of(lats, lngs)
+        inside = rows >= 0
+
+        values = np.full(lattice.size, grid.nodata, dtype=np.int32)
+        values[inside] = grid.decimetres[rows[inside], cols[inside]]
+        values = values.reshape(lattice.rows, lattice.cols)
+
+        fill = (depths < 0) & (values != grid.nodata)
+        depths[fill] = values[fill]
+
+    return depths
+
+
+def build_masks(water, depths_dm, thresholds_dm):
+    """
+    (len(thresholds_dm), rows, cols) boolean navigability masks
+
+    depths_dm must be rounded down (to_decimetres() in depth_grid_binary.py)
+    so no cell shallower than a threshold passes it.
+    """
+    no_data = depths_dm < 0
+    return np.stack([water & (no_data | (depths_dm >= threshold)) for threshold in thresholds_dm])
+
+
+def write_masks(path, lattice, first_dm, step_dm, masks):
+    """Pack masks 8 cells per byte and write them; returns bytes written"""
+    header = HEADER.pack(MAGIC, VERSION, len(masks), first_dm, step_dm,
+                         lattice.rows, lattice.cols,
+                         lattice.south, lattice.west, lattice.lat_step, lattice.lng_step)
+
+    with open(path, 'wb') as f:
+        f.write(header)
+        for mask in masks:
+            f.write(np.packbits(mask.ravel(), bitorder='little').tobytes())
+
+    return HEADER_SIZE + len(masks) * ((lattice.size + 7) // 8)
+
+
+def read_masks(path):
+    """(lattice, thresholds_dm, masks) from a navigability mask file"""
+    with open(path, 'rb') as f:
+        data = f.read()
+
+    if len(data) < HEADER_SIZE:
+        raise ValueError(f"{path} is too short to be a navigability mask file")
+
+    (magic, version, count, first_dm, step_dm, rows, cols,
+     south, west, lat_step, lng_step) = HEADER.unpack_from(data)
+
+    if magic != MAGIC:
+        raise ValueError(f"{path} is not a navigability mask file (bad magic {magic!r})")
+    if version != VERSION:
+        raise ValueError(f"{path} has unsupported navigability mask version {version}")
+
+    lattice = GridLattice(south, west, lat_step, lng_step, rows, cols)
+    mask_bytes = (lattice.size + 7) // 8
+    packed = np.frombuffer(data, dtype=np.uint8, count=count * mask_bytes, offset=HEADER_SIZE)
+    masks = np.unpackbits(packed.reshape(count, mask_bytes), axis=1, count=lattice.size,
+                          bitorder='little').astype(bool).reshape(count, rows, cols)
+
+    return lattice, first_dm + step_dm * np.arange(count), masks
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Build navigability masks per minimum depth')
+    parser.add_argument('--info', metavar='MASK_FILE', help='Summarize an existing mask file')
+    parser.add_argument('boundary_file', nargs='?', help='Water boundary GeoJSON file')
+    parser.add_argument('output_file', nargs='?', help='Output mask .bin file')
+    parser.add_argument('depth_grids', nargs='*', help='Binary depth grids, highest priority first')
+    args = parser.parse_args()
+
+    if args.info:
+        lattice, thresholds, masks = read_masks(args.info)
+        print(f"Navigability masks: {args.info}")
+        print(f"  Lattice: {lattice.rows} rows x {lattice.cols} cols")
+        for threshold, mask in zip(thresholds, masks):
+            print(f"  >= {threshold / DEPTH_SCALE:.1f} m: {int(mask.sum()):,} cells")
+        return
+
+    if not args.boundary_file or not args.output_file:
+        parser.error('boundary_file and output_file are required')
+
+    lattice = GRID_LATTICE
+    lats, lngs = lattice.axes()
+    water = rasterize_water_mask(args.boundary_file, lats, lngs)
+    depths_dm = lattice_depths(lattice, args.depth_grids)
+
+    thresholds = FIRST_THRESHOLD_DM + THRESHOLD_STEP_DM * np.arange(MASK_COUNT)
+    masks = build_masks(water, depths_dm, thresholds)
+    size = write_masks(args.output_file, lattice, FIRST_THRESHOLD_DM, THRESHOLD_STEP_DM, masks)
+
+    print(f"✓ Wrote {len(masks)} navigability masks to {args.output_file} ({size / 1024:.1f} KB)")
+    print(f"  Water cells: {int(water.sum()):,}")
+    print(f"  Cells with depth: {int((water & (depths_dm >= 0)).sum()):,}")
+    print(f"  Navigable at {thresholds[-1] / DEPTH_SCALE:.1f} m: {int(masks[-1].sum()):,}")
+
+
+if __name__ == '__main__':
+    main()
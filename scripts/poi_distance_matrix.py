@@ -0,0 +1,598 @@
+#!/usr/bin/env python3
+"""
+Precomputed POI-to-POI water route matrix
+
+For one minimum depth (draft plus safety margin), every ordered pair of
+POIs gets the flat A* route WaterRouter computes: the route distance,
+its A* cost with shore clearance and turn penalties, and the route
+geometry as an encoded polyline. Routes are computed across a process
+pool, one task per snapped source node.
+
+Where a hierarchy file exists, HierarchicalRouter and the app plan
+long routes on it instead, so their routes may cost more than the
+stored ones (see routing_hierarchy.py for measured figures).
+
+Rebuilding against an existing matrix only recomputes what can have
+changed: rows and columns of POIs that were added, moved or now snap to
+another cell, and pairs whose search region (the ellipse of points no
+farther from both endpoints than the old route cost) contains a cell
+whose navigability changed. Everything else is copied across. The
+stored routes need not be optimal (turn penalties make A* over nodes
+inexact); this works because a search never expands a node outside
+its pair's ellipse while the heuristic is at least the haversine
+distance and the graph, cost model and landmarks are unchanged. The
+header therefore records a fingerprint of the graph, the edge costs
+(shore clearance), the turn penalties and the landmark table; a
+matrix built under another fingerprint is rebuilt in full, as with
+--full.
+
+    Header (96 bytes, little-endian)
+        0   4s   magic "PDMX"
+        4   H    format version (2)
+        6   H    minimum depth (decimetres)
+        8   I    POIs (n)
+        12  I    lattice rows
+        16  I    lattice cols
+        20  I    polyline bytes
+        24  I    POI id bytes
+        28  4x   padding
+        32  d    south (latitude of row 0)
+        40  d    west (longitude of column 0)
+        48  d    latStep (degrees)
+        56  d    lngStep (degrees)
+        64  32s  SHA-256 fingerprint of the graph and cost model
+    Body, in order
+        <f8  n * 2      POI latitude, longitude pairs
+        <f4  n * n      route distances in km, row = start POI (NaN: no water route)
+        <f4  n * n      route A* costs in km (NaN: no water route)
+        <u4  n * n + 1  offsets into the polyline bytes
+        polyline bytes  Google encoded polylines (1e-5 degrees), empty without a route
+        POI id bytes    UTF-8, newline separated
+        ceil(rows * cols / 8) bytes of the navigable cell mask the routes
+                        were computed on (least significant bit first)
+
+Usage:
+    python poi_distance_matrix.py build [--draft M ...] [--margin M] [--output-dir DIR] [--full]
+    python poi_distance_matrix.py info <matrix.bin>
+    python poi_distance_matrix.py lookup <matrix.bin> <start_poi_id> <end_poi_id>
+"""
+
+import argparse
+import hashlib
+import json
+import multiprocessing
+import os
+import struct
+import sys
+import time
+from pathlib import Path
+
+try:
+    import numpy as np
+    from scipy.sparse import csr_matrix
+    from scipy.sparse.csgraph import connected_components
+    from depth_grid_binary import DEPTH_SCALE
+    from grid_lattice import GridLattice
+    from routing_graph import haversine_km
+    from water_router import (DEFAULT_DRAFTS_M, DEFAULT_GRAPH_FILE, DEFAULT_POI_FILE,
+                              DEFAULT_SAFETY_MARGIN_M, MAX_GRID_SEARCH_DISTANCE_KM, REPO_ROOT,
+                              WaterRouter, haversine, load_pois, minimum_depth_decimetres)
+except ImportError as e:
+    print(f"Missing dependency: {e}")
+    print("\nInstall required packages:")
+    print("pip install numpy scipy")
+    sys.exit(1)
+
+MAGIC = b'PDMX'
+VERSION = 2
+HEADER = struct.Struct('<4sHHIIIII4xdddd32s')
+HEADER_SIZE = HEADER.size  # 96
+
+DEFAULT_OUTPUT_DIR = REPO_ROOT / 'data' / 'routing'
+MATRIX_FILE = 'lake-champlain-poi-matrix-{:02d}dm.bin'
+
+# Polyline precision (decimal places), as in Google's encoding
+POLYLINE_PRECISION = 5
+
+# Slack when testing changed cells against a stored (float32) route cost (km)
+COST_TOLERANCE_KM = 1e-3
+
+# Past this many changed cells the per-pair ellipse test costs more than
+# routing every pair (it holds a POIs x changed cells distance table and
+# a copy of it per POI), so every pair is treated as stale instead
+MAX_ELLIPSE_TEST_CELLS = 4096
+
+
+def encode_polyline(coordinates, precision=POLYLINE_PRECISION):
+    """Google encoded polyline of (lat, lng) pairs"""
+    factor = 10 ** precision
+    chunks = []
+    previous = (0, 0)
+
+    for lat, lng in coordinates:
+        point = (round(lat * factor), round(lng * factor))
+        for value, last in zip(point, previous):
+            value = value - last
+            value = ~(value << 1) if value < 0 else value << 1
+            while value >= 0x20:
+                chunks.append(chr((0x20 | (value & 0x1f)) + 63))
+                value >>= 5
+            chunks.append(chr(value + 63))
+        previous = point
+
+    return ''.join(chunks)
+
+
+def decode_polyline(encoded, precision=POLYLINE_PRECISION):
+    """(lat, lng) pairs of a Google encoded polyline"""
+    factor = 10 ** precision
+    coordinates = []
+    values = [0, 0]
+    index = 0
+
+    while index < len(encoded):
+        for k in range(2):
+            shift = result = 0
+            while True:
+                byte = ord(encoded[index]) - 63
+                index += 1
+                result |= (byte & 0x1f) << shift
+                shift += 5
+                if byte < 0x20:
+                    break
+            values[k] += ~(result >> 1) if result & 1 else result >> 1
+        coordinates.append((values[0] / factor, values[1] / factor))
+
+    return coordinates
+
+
+class PoiDistanceMatrix:
+    """
+    Routes between every ordered pair of POIs for one minimum depth
+
+    distances and costs are (n, n) float32 arrays (NaN without a water
+    route); polylines is a list of n * n encoded strings in row-major
+    order, mask the lattice's navigable cells at build time and
+    fingerprint the cost_model_fingerprint() of the router used.
+    """
+
+    def __init__(self, lattice, minimum_depth_dm, poi_ids, poi_coordinates,
+                 distances, costs, polylines, mask, fingerprint):
+        self.lattice = lattice
+        self.minimum_depth_dm = minimum_depth_dm
+        self.poi_ids = list(poi_ids)
+        self.poi_coordinates = poi_coordinates
+        self.distances = distances
+        self.costs = costs
+        self.polylines = polylines
+        self.mask = mask
+        self.fingerprint = fingerprint
+        self.index = {poi_id: i for i, poi_id in enumerate(self.poi_ids)}
+
+    @classmethod
+    def load(cls, path):
+        with open(path, 'rb') as f:
+            data = f.read()
+
+        if len(data) < HEADER_SIZE:
+            raise ValueError(f"{path} is too short to be a POI distance matrix")
+
+        (magic, version, minimum_depth_dm, n, rows, cols, polyline_bytes, id_bytes,
+         south, west, lat_step, lng_step, fingerprint) = HEADER.unpack_from(data)
+
+        if magic != MAGIC:
+            raise ValueError(f"{path} is not a POI distance matrix (bad magic {magic!r})")
+        if version != VERSION:
+            raise ValueError(f"{path} has unsupported POI distance matrix version {version}")
+
+        offset = HEADER_SIZE
+        arrays = []
+        for dtype, count in (('<f8', n * 2), ('<f4', n * n), ('<f4', n * n), ('<u4', n * n + 1)):
+            arrays.append(np.frombuffer(data, dtype=dtype, count=count, offset=offset))
+            offset += np.dtype(dtype).itemsize * count
+        coordinates, distances, costs, offsets = arrays
+
+        text = data[offset:offset + polyline_bytes].decode('ascii')
+        polylines = [text[offsets[k]:offsets[k + 1]] for k in range(n * n)]
+        offset += polyline_bytes
+
+        poi_ids = data[offset:offset + id_bytes].decode('utf-8').split('\n') if n else []
+        offset += id_bytes
+
+        lattice = GridLattice(south, west, lat_step, lng_step, rows, cols)
+        packed = np.frombuffer(data, dtype=np.uint8, count=(lattice.size + 7) // 8, offset=offset)
+        mask = np.unpackbits(packed, count=lattice.size, bitorder='little').astype(bool)
+
+        return cls(lattice, minimum_depth_dm, poi_ids, coordinates.reshape(n, 2),
+                   distances.reshape(n, n), costs.reshape(n, n), polylines, mask, fingerprint)
+
+    def save(self, path):
+        """Write the matrix; returns the number of bytes written"""
+        n = len(self.poi_ids)
+        text = ''.join(self.polylines).encode('ascii')
+        offsets = np.zeros(n * n + 1, dtype='<u4')
+        np.cumsum([len(polyline) for polyline in self.polylines], out=offsets[1:])
+        ids = '\n'.join(self.poi_ids).encode('utf-8')
+
+        lattice = self.lattice
+        header = HEADER.pack(MAGIC, VERSION, self.minimum_depth_dm, n, lattice.rows, lattice.cols,
+                             len(text), len(ids),
+                             lattice.south, lattice.west, lattice.lat_step, lattice.lng_step,
+                             self.fingerprint)
+        parts = (
+            header,
+            np.asarray(self.poi_coordinates, dtype='<f8').tobytes(),
+            np.asarray(self.distances, dtype='<f4').tobytes(),
+            np.asarray(self.costs, dtype='<f4').tobytes(),
+            offsets.tobytes(),
+            text,
+            ids,
+            np.packbits(self.mask, bitorder='little').tobytes()
+        )
+
+        with open(path, 'wb') as f:
+            for part in parts:
+                f.write(part)
+
+        return sum(len(part) for part in parts)
+
+    def route(self, start_id, end_id):
+        """
+        Stored route between two POI ids, or None if either is unknown
+
+        Returns {'coordinates', 'distance_km', 'fallback'}; pairs without
+        a water route have an empty coordinate list and NaN distance.
+        """
+        if start_id not in self.index or end_id not in self.index:
+            return None
+
+        i, j = self.index[start_id], self.index[end_id]
+        distance = float(self.distances[i, j])
+        return {
+            'coordinates': decode_polyline(self.polylines[i * len(self.poi_ids) + j]),
+            'distance_km': distance,
+            'fallback': bool(np.isnan(distance))
+        }
+
+
+def snap_cells(lattice, mask, poi_lats, poi_lngs):
+    """
+    Lattice cell each POI snaps to on a navigable mask, or -1
+
+    Same rule as WaterRouter.nearest_node(): the nearest navigable cell
+    (lowest index on ties) within MAX_GRID_SEARCH_DISTANCE_KM.
+    """
+    cells = np.flatnonzero(mask)
+    snapped = np.full(len(poi_lats), -1, dtype=np.int64)
+    if len(cells) == 0:
+        return snapped
+
+    lats, lngs = lattice.cell_coordinates()
+    lats = np.round(lats[cells], 6)
+    lngs = np.round(lngs[cells], 6)
+
+    for k, (lat, lng) in enumerate(zip(poi_lats, poi_lngs)):
+        dists = haversine_km(lat, lng, lats, lngs)
+        nearest = int(np.argmin(dists))
+        if dists[nearest] <= MAX_GRID_SEARCH_DISTANCE_KM:
+            snapped[k] = cells[nearest]
+
+    return snapped
+
+
+def cost_model_fingerprint(router):
+    """
+    SHA-256 digest of everything but depths that shapes the router's routes
+
+    Covers the graph's cells and edges, the edge costs (lengths scaled by
+    shore clearance), the turn penalties and the landmark table.
+    """
+    graph = router.graph
+    digest = hashlib.sha256()
+    for array in (graph.cells, graph.offsets, graph.neighbors,
+                  np.asarray(router.edge_costs, dtype=np.float64)):
+        digest.update(np.ascontiguousarray(array).tobytes())
+    digest.update(json.dumps(router.turn_penalty, sort_keys=True).encode('utf-8'))
+
+    landmarks = router.landmarks
+    if landmarks is None:
+        digest.update(b'no landmarks')
+    else:
+        digest.update(np.ascontiguousarray(landmarks.landmarks).tobytes())
+        digest.update(np.ascontiguousarray(landmarks.units).tobytes())
+        digest.update(json.dumps(landmarks.penalties, sort_keys=True).encode('utf-8'))
+        digest.update(struct.pack('<d', landmarks.unit_km))
+
+    return digest.digest()
+
+
+def navigable_components(router):
+    """Connected component label per graph node over navigable nodes"""
+    graph = router.graph
+    n = graph.node_count
+    sources = np.repeat(np.arange(n), np.diff(graph.offsets.astype(np.int64)))
+    targets = graph.neighbors.astype(np.int64)
+    keep = router.navigable_mask[sources] & router.navigable_mask[targets]
+
+    adjacency = csr_matrix((np.ones(int(keep.sum()), dtype=np.int8), (sources[keep], targets[keep])),
+                           shape=(n, n))
+    return connected_components(adjacency, directed=False)[1]
+
+
+def stale_pairs(previous, lattice, mask, poi_ids, poi_coordinates, snapped):
+    """
+    (n, n) boolean array of pairs to recompute and the previous index of
+    each POI (-1 for new POIs)
+
+    Without a compatible previous matrix, or when more than
+    MAX_ELLIPSE_TEST_CELLS cells changed navigability, every pair (bar
+    the diagonal, which needs no route) is stale.
+    """
+    n = len(poi_ids)
+    old_index = np.full(n, -1, dtype=np.int64)
+
+    if previous is None or previous.lattice != lattice:
+        stale = np.ones((n, n), dtype=bool)
+        np.fill_diagonal(stale, False)
+        return stale, old_index
+
+    for i, poi_id in enumerate(poi_ids):
+        old_index[i] = previous.index.get(poi_id, -1)
+
+    known = old_index >= 0
+    same_place = np.zeros(n, dtype=bool)
+    same_place[known] = np.all(previous.poi_coordinates[old_index[known]] == poi_coordinates[known], axis=1)
+
+    # A POI whose snap cell moved has new routes even if it did not move
+    old_snapped = np.full(n, -1, dtype=np.int64)
+    old_snapped[same_place] = snap_cells(lattice, previous.mask, poi_coordinates[same_place, 0],
+                                         poi_coordinates[same_place, 1])
+    unchanged = same_place & (old_snapped == snapped)
+
+    stale = ~(unchanged[:, None] & unchanged[None, :])
+    np.fill_diagonal(stale, False)
+
+    changed_cells = np.flatnonzero(previous.mask != mask)
+    if len(changed_cells) == 0:
+        return stale, old_index
+    if len(changed_cells) > MAX_ELLIPSE_TEST_CELLS:
+        stale[:] = True
+        np.fill_diagonal(stale, False)
+        return stale, old_index
+
+    rows = np.flatnonzero(unchanged & (snapped >= 0))
+    old_costs = previous.costs[np.ix_(old_index[rows], old_index[rows])]
+
+    # Pairs without a route can only gain one from newly navigable cells
+    if np.any(mask[changed_cells]):
+        block = stale[np.ix_(rows, rows)]
+        block |= np.isnan(old_costs)
+        stale[np.ix_(rows, rows)] = block
+
+    # A route can only change if a changed cell lies within its ellipse
+    lats, lngs = lattice.cell_coordinates()
+    lats, lngs = np.round(lats, 6), np.round(lngs, 6)
+    snap_lats, snap_lngs = lats[snapped[rows]], lngs[snapped[rows]]
+    to_changed = haversine_km(snap_lats[:, None], snap_lngs[:, None],
+                              lats[changed_cells][None, :], lngs[changed_cells][None, :])
+
+    for k, i in enumerate(rows):
+        detour = (to_changed[k][None, :] + to_changed).min(axis=1)
+        stale[i, rows] |= detour <= old_costs[k] + COST_TOLERANCE_KM
+
+    np.fill_diagonal(stale, False)
+    return stale, old_index
+
+
+# Read-only state for route workers, installed by _init_route_worker.
+# With the fork start method the router is inherited copy-on-write.
+_ROUTE_STATE = {}
+
+def _init_route_worker(state):
+    _ROUTE_STATE.clear()
+    _ROUTE_STATE.update(state)
+
+def _route_source(task):
+    """Routes for (source node, [(i, j), ...]); list of (i, j, distance, cost, polyline)"""
+    source, pairs = task
+    router = _ROUTE_STATE['router']
+    poi_coordinates = _ROUTE_STATE['poi_coordinates']
+    node_of_poi = _ROUTE_STATE['node_of_poi']
+
+    searches = {}
+    results = []
+    for i, j in pairs:
+        target = node_of_poi[j]
+        if target not in searches:
+            searches[target] = router._search(source, target)
+        found = searches[target]
+
+        if found is None:
+            results.append((i, j, np.nan, np.nan, ''))
+            continue
+
+        nodes, _, cost = found
+        coordinates = ([tuple(poi_coordinates[i])] +
+                       [(router.lats[node], router.lngs[node]) for node in nodes] +
+                       [tuple(poi_coordinates[j])])
+        distance = sum(haversine(*a, *b) for a, b in zip(coordinates, coordinates[1:]))
+        results.append((i, j, distance, cost, encode_polyline(coordinates)))
+
+    return results
+
+def map_route_tasks(tasks, state, workers=1):
+    """Run _route_source over tasks and yield results in task order"""
+    if workers <= 1 or len(tasks) <= 1:
+        _init_route_worker(state)
+        try:
+            for task in tasks:
+                yield _route_source(task)
+        finally:
+            _ROUTE_STATE.clear()
+        return
+
+    with multiprocessing.Pool(min(workers, len(tasks)), initializer=_init_route_worker,
+                              initargs=(state,)) as pool:
+        yield from pool.imap(_route_source, tasks)
+
+
+def build_matrix(router, pois, previous=None, workers=1):
+    """
+    Matrix of routes between all POIs for the router's vessel settings
+
+    With a previous matrix for the same lattice, minimum depth and cost
+    model fingerprint, only stale pairs are routed. Returns (matrix,
+    routed pair count).
+    """
+    graph = router.graph
+    lattice = graph.lattice
+    minimum_depth_dm = minimum_depth_decimetres(router.draft_m, router.margin_m)
+    fingerprint = cost_model_fingerprint(router)
+    if previous is not None and (previous.minimum_depth_dm != minimum_depth_dm or
+                                 previous.fingerprint != fingerprint):
+        previous = None
+
+    mask = np.zeros(lattice.size, dtype=bool)
+    mask[graph.cells[router.navigable_mask]] = True
+
+    poi_ids = sorted(pois)
+    n = len(poi_ids)
+    poi_coordinates = np.array([(pois[poi_id]['lat'], pois[poi_id]['lng']) for poi_id in poi_ids],
+                               dtype=np.float64).reshape(n, 2)
+    snapped = snap_cells(lattice, mask, poi_coordinates[:, 0], poi_coordinates[:, 1])
+    node_of_poi = np.where(snapped >= 0, graph.node_of_cell()[np.maximum(snapped, 0)], -1)
+
+    stale, old_index = stale_pairs(previous, lattice, mask, poi_ids, poi_coordinates, snapped)
+
+    distances = np.full((n, n), np.nan, dtype=np.float32)
+    costs = np.full((n, n), np.nan, dtype=np.float32)
+    polylines = [''] * (n * n)
+
+    # Copy fresh pairs across from the previous matrix
+    if previous is not None:
+        old_n = len(previous.poi_ids)
+        for i, j in zip(*np.nonzero(~stale)):
+            oi, oj = old_index[i], old_index[j]
+            if oi < 0 or oj < 0:
+                continue
+            distances[i, j] = previous.distances[oi, oj]
+            costs[i, j] = previous.costs[oi, oj]
+            polylines[i * n + j] = previous.polylines[oi * old_n + oj]
+
+    for i in range(n):
+        distances[i, i] = costs[i, i] = 0
+        polylines[i * n + i] = encode_polyline([poi_coordinates[i]])
+
+    components = navigable_components(router)
+    tasks = {}
+    for i, j in zip(*np.nonzero(stale)):
+        source, target = node_of_poi[i], node_of_poi[j]
+        if source < 0 or target < 0 or components[source] != components[target]:
+            continue  # No water route; leave NaN
+        tasks.setdefault(int(source), []).append((int(i), int(j)))
+
+    state = {
+        'router': router,
+        'poi_coordinates': poi_coordinates,
+        'node_of_poi': node_of_poi
+    }
+    routed = 0
+    for results in map_route_tasks(sorted(tasks.items()), state, workers):
+        for i, j, distance, cost, polyline in results:
+            distances[i, j] = distance
+            costs[i, j] = cost
+            polylines[i * n + j] = polyline
+            routed += 1
+
+    matrix = PoiDistanceMatrix(lattice, minimum_depth_dm, poi_ids, poi_coordinates,
+                               distances, costs, polylines, mask, fingerprint)
+    return matrix, routed
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Precompute POI-to-POI water routes')
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    build = subparsers.add_parser('build', help='Build or update matrices for a set of drafts')
+    build.add_argument('--draft', type=float, action='append', dest='drafts',
+                       help=f'Vessel draft in meters, repeatable (default: {", ".join(map(str, DEFAULT_DRAFTS_M))})')
+    build.add_argument('--margin', type=float, default=DEFAULT_SAFETY_MARGIN_M,
+                       help=f'Safety margin in meters (default: {DEFAULT_SAFETY_MARGIN_M})')
+    build.add_argument('--graph', default=str(DEFAULT_GRAPH_FILE), help='Routing graph .bin file')
+    build.add_argument('--pois', default=str(DEFAULT_POI_FILE), help='POI JSON file')
+    build.add_argument('--output-dir', default=str(DEFAULT_OUTPUT_DIR),
+                       help=f'Directory for matrix files (default: {DEFAULT_OUTPUT_DIR})')
+    build.add_argument('--full', action='store_true', help='Ignore existing matrices and route every pair')
+    build.add_argument('--workers', type=int, default=os.cpu_count() or 1,
+                       help='Worker processes for routing (default: CPU count)')
+
+    info = subparsers.add_parser('info', help='Summarize a matrix file')
+    info.add_argument('matrix_file')
+
+    lookup = subparsers.add_parser('lookup', help='Look up the stored route between two POI IDs')
+    lookup.add_argument('matrix_file')
+    lookup.add_argument('start_poi')
+    lookup.add_argument('end_poi')
+
+    args = parser.parse_args()
+
+    if args.command == 'build':
+        pois = load_pois(args.pois)
+        router = WaterRouter(args.graph)
+        output_dir = Path(args.output_dir)
+        output_dir.mkdir(parents=True, exist_ok=True)
+
+        for draft in args.drafts or DEFAULT_DRAFTS_M:
+            router.set_vessel(draft, args.margin)
+            minimum_depth_dm = minimum_depth_decimetres(draft, args.margin)
+            output_file = output_dir / MATRIX_FILE.format(minimum_depth_dm)
+
+            previous = None
+            if output_file.exists() and not args.full:
+                try:
+                    previous = PoiDistanceMatrix.load(output_file)
+                except ValueError as e:
+                    print(f"Warning: {e} - routing every pair")
+
+            started = time.perf_counter()
+            matrix, routed = build_matrix(router, pois, previous, args.workers)
+            size = matrix.save(output_file)
+
+            n = len(matrix.poi_ids)
+            found = int(np.count_nonzero(~np.isnan(matrix.distances))) - n
+            print(f"✓ Wrote {output_file} ({size / 1024:.1f} KB) for draft {draft} m "
+                  f"(minimum depth {minimum_depth_dm / DEPTH_SCALE:.1f} m)")
+            print(f"  POIs: {n:,}, water routes: {found:,} of {n * (n - 1):,} pairs")
+            print(f"  Routed {routed:,} pairs in {time.perf_counter() - started:.1f}s")
+
+    elif args.command == 'info':
+        matrix = PoiDistanceMatrix.load(args.matrix_file)
+        n = len(matrix.poi_ids)
+        off_diagonal = ~np.eye(n, dtype=bool)
+        routed = off_diagonal & ~np.isnan(matrix.distances)
+        print(f"POI distance matrix: {args.matrix_file}")
+        print(f"  Minimum depth: {matrix.minimum_depth_dm / DEPTH_SCALE:.1f} m")
+        print(f"  Lattice: {matrix.lattice.rows} rows x {matrix.lattice.cols} cols "
+              f"({int(matrix.mask.sum()):,} navigable cells)")
+        print(f"  POIs: {n:,}")
+        print(f"  Water routes: {int(routed.sum()):,} of {int(off_diagonal.sum()):,} pairs")
+        if routed.any():
+            print(f"  Longest route: {float(matrix.distances[routed].max()):.1f} km")
+
+    else:
+        matrix = PoiDistanceMatrix.load(args.matrix_file)
+        route = matrix.route(args.start_poi, args.end_poi)
+        if route is None:
+            print(f"ERROR: POI not in matrix: {args.start_poi} or {args.end_poi}")
+            sys.exit(1)
+
+        print(f"Route: {args.start_poi} → {args.end_poi}")
+        if route['fallback']:
+            print("  No water route")
+        else:
+            print(f"  Distance: {route['distance_km']:.2f} km ({route['distance_km'] * 0.539957:.2f} nm)")
+            print(f"  Waypoints: {len(route['coordinates'])}")
+
+
+if __name__ == '__main__':
+    main()
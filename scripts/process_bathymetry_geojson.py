@@ -8,124 +8,311 @@ Handles both:
 """
 
 import json
+import multiprocessing
+import os
 import sys
-from math import sqrt
+import time
 import argparse
+from pathlib import Path
+
+try:
+    import numpy as np
+    from scipy.spatial import cKDTree
+    from geojson_stream import iter_features, iter_point_chunks
+    from bathymetry_cache import DEFAULT_CACHE_DIR, load_kdtree, load_point_columns
+    from depth_grid_binary import write_depth_grid
+    from grid_lattice import GRID_CONFIG, GRID_LATTICE
+except ImportError as e:
+    print(f"Missing dependency: {e}")
+    print("\nInstall required packages:")
+    print("pip install numpy scipy")
+    sys.exit(1)
+
+# Earth radius in meters (matches EARTH_RADIUS_KM in navigation.js)
+EARTH_RADIUS_M = 6371000
+
+# Point cloud soundings shallower than this (3 feet) are shoreline/land
+MIN_POINT_DEPTH_M = 0.9
+
+# Grid points farther than this from any bathymetric point get no depth.
+# 1110 m is the 0.01° latitude cutoff the degree-space search used.
+MAX_NEAREST_DISTANCE_M = 1110
+
+# Contour gridding: cells farther than this from every contour get no
+# depth (555 m is the old 0.005° cutoff). Within the bracket search
+# radius, depth is interpolated toward the nearest contour of a
+# different depth.
+MAX_CONTOUR_DISTANCE_M = 555
+CONTOUR_BRACKET_SEARCH_M = 2000
+MAX_SEGMENT_LENGTH_M = 100
+
+# Lattice rows per unit of work for band-parallel gridding
+ROWS_PER_BAND = 64
+
+def project_to_metres(lat, lng, central_lng=None):
+    """
+    Project lat/lng (degrees) to planar x/y in meters
 
-# Grid configuration (must match navigation.js)
-GRID_CONFIG = {
-    'latStep': 0.00180,  # 200m
-    'lngStep': 0.00240,  # 200m
-    'bounds': {
-        'south': 43.5300,
-        'north': 45.0900,
-        'west': -73.5200,
-        'east': -73.0700
-    }
-}
+    Uses a sinusoidal projection centered on the grid, which keeps
+    distances within a fraction of a percent of haversine across
+    the narrow east-west extent of the lake.
+    """
+    lat = np.asarray(lat, dtype=np.float64)
+    lng = np.asarray(lng, dtype=np.float64)
+
+    if central_lng is None:
+        bounds = GRID_CONFIG['bounds']
+        central_lng = (bounds['west'] + bounds['east']) / 2
 
-def distance(lat1, lng1, lat2, lng2):
-    """Simple Euclidean distance for nearby points"""
-    return sqrt((lat2 - lat1)**2 + (lng2 - lng1)**2)
+    lat_rad = np.radians(lat)
+    x = np.radians(lng - central_lng) * np.cos(lat_rad) * EARTH_RADIUS_M
+    y = lat_rad * EARTH_RADIUS_M
+    return np.column_stack((x, y))
 
-def process_point_cloud(bathymetry_file, water_boundary_file, output_file):
+def boundary_polygons(water_boundary_file):
     """
-    Process point cloud bathymetry (Lake Champlain format)
-    Each grid point gets depth from nearest bathymetric point
+    Polygons from a water boundary GeoJSON as lists of (lng, lat) ring arrays
+
+    The first ring of each polygon is the shoreline, the rest are islands.
     """
-    print(f"Processing point cloud: {bathymetry_file}")
+    with open(water_boundary_file, 'r') as f:
+        boundary_data = json.load(f)
 
-    # Load bathymetric points
-    with open(bathymetry_file, 'r') as f:
-        bathy_data = json.load(f)
+    polygons = []
+    for feature in boundary_data['features']:
+        geometry = feature['geometry']
+        if geometry['type'] == 'Polygon':
+            parts = [geometry['coordinates']]
+        elif geometry['type'] == 'MultiPolygon':
+            parts = geometry['coordinates']
+        else:
+            continue
 
-    print(f"Loaded {len(bathy_data['features']):,} bathymetric points")
+        for rings in parts:
+            polygons.append([np.asarray(ring, dtype=np.float64)[:, :2] for ring in rings])
 
-    # Extract points with depths
-    bathy_points = []
-    for feature in bathy_data['features']:
-        coords = feature['geometry']['coordinates']
-        props = feature['properties']
+    return polygons
 
-        # Handle depth field (could be DEPTH_FT, CONTOUR, etc.)
-        depth_ft = props.get('DEPTH_FT') or props.get('depth_ft') or props.get('DEPTH')
+def rasterize_water_mask(water_boundary_file, lats, lngs):
+    """
+    Boolean (rows, cols) mask of lattice cells in navigable water
 
-        if depth_ft is not None:
-            # Convert negative feet to positive meters
-            depth_m = abs(float(depth_ft)) * 0.3048  # feet to meters
+    Scanline version of the ray casting test in navigation.js
+    (pointInPolygon): for each row, every ring edge crossing that
+    latitude is intersected once, and a cell is inside a polygon when
+    an odd number of crossings lie east of it. Counting crossings over
+    all rings of a polygon together excludes its islands.
+    """
+    lats = np.asarray(lats, dtype=np.float64)
+    lngs = np.asarray(lngs, dtype=np.float64)
+    mask = np.zeros((len(lats), len(lngs)), dtype=bool)
+
+    for rings in boundary_polygons(water_boundary_file):
+        xi = np.concatenate([ring[:, 0] for ring in rings])
+        yi = np.concatenate([ring[:, 1] for ring in rings])
+        # Previous vertex of each vertex, wrapping within its own ring
+        xj = np.concatenate([np.roll(ring[:, 0], 1) for ring in rings])
+        yj = np.concatenate([np.roll(ring[:, 1], 1) for ring in rings])
+
+        south, north = yi.min(), yi.max()
+        for row in np.flatnonzero((lats >= south) & (lats <= north)):
+            lat = lats[row]
+            crossing = (yi > lat) != (yj > lat)
+            xs = np.sort((xj[crossing] - xi[crossing]) * (lat - yi[crossing]) /
+                         (yj[crossing] - yi[crossing]) + xi[crossing])
+            east_of = len(xs) - np.searchsorted(xs, lngs, side='right')
+            mask[row] |= (east_of % 2) == 1
+
+    return mask
+
+def load_point_cloud(bathymetry_file, min_depth_m=MIN_POINT_DEPTH_M, cache_dir=None):
+    """
+    Load bathymetric points as (lats, lngs, depths_m, digest) arrays
 
-            # FILTER OUT SHORELINE/LAND POINTS (depth < 3 feet / 1 meter)
-            # These are elevation points, not navigable water
-            if depth_m >= 0.9:  # 3 feet minimum
-                bathy_points.append({
-                    'lat': coords[1],
-                    'lng': coords[0],
-                    'depth_m': depth_m
-                })
+    With a cache_dir, columns come from the bathymetry cache (digest is
+    the source file hash); otherwise features are streamed in chunks and
+    digest is None. Points shallower than min_depth_m are dropped as
+    shoreline/land.
+    """
+    if cache_dir is not None:
+        lngs, lats, depths, digest = load_point_columns(bathymetry_file, cache_dir)
+        print(f"Loaded {len(depths):,} bathymetric points from cache")
+        keep = depths >= min_depth_m
+        return lats[keep], lngs[keep], depths[keep], digest
+
+    stats = {}
+    lats = []
+    lngs = []
+    depths = []
+    for chunk_lngs, chunk_lats, chunk_depths in iter_point_chunks(bathymetry_file, stats=stats):
+        # FILTER OUT SHORELINE/LAND POINTS (depth < 3 feet / 1 meter)
+        # These are elevation points, not navigable water
+        keep = chunk_depths >= min_depth_m
+        lats.append(chunk_lats[keep])
+        lngs.append(chunk_lngs[keep])
+        depths.append(chunk_depths[keep])
+
+    print(f"Loaded {stats['features']:,} bathymetric points")
+
+    if not depths:
+        return np.empty(0), np.empty(0), np.empty(0), None
+
+    return np.concatenate(lats), np.concatenate(lngs), np.concatenate(depths), None
+
+def build_point_index(lats, lngs, digest=None, min_depth_m=MIN_POINT_DEPTH_M, cache_dir=None):
+    """
+    Build a KD-tree over bathymetric points in projected meters
 
-    print(f"Extracted {len(bathy_points):,} valid depth points")
+    When the points came from the bathymetry cache (digest is set), the
+    tree is persisted there and reused by later runs.
+    """
+    if digest is None or cache_dir is None:
+        return cKDTree(project_to_metres(lats, lngs))
 
-    if not bathy_points:
-        print("ERROR: No valid depth points found!")
-        return
+    bounds = GRID_CONFIG['bounds']
+    central_lng = (bounds['west'] + bounds['east']) / 2
+    index_name = f"points-min{min_depth_m:g}m-lng{central_lng:.6f}"
+    return load_kdtree(digest, index_name, lambda: project_to_metres(lats, lngs), cache_dir)
 
-    # Load water boundary
-    with open(water_boundary_file, 'r') as f:
-        boundary_data = json.load(f)
+# Read-only state for band workers, installed by _init_band_worker.
+# With the fork start method this is inherited copy-on-write, so large
+# indexes are shared with the parent rather than copied.
+_BAND_STATE = {}
 
-    # Simple point-in-polygon check (can be optimized)
-    def point_in_water(lat, lng):
-        # Simplified - just check bounding box for now
-        # In production, use proper point-in-polygon
-        bounds = GRID_CONFIG['bounds']
-        return (bounds['south'] <= lat <= bounds['north'] and
-                bounds['west'] <= lng <= bounds['east'])
+def _init_band_worker(state):
+    _BAND_STATE.clear()
+    _BAND_STATE.update(state)
 
-    # Generate grid and find nearest depth for each point
-    depth_grid = {}
-    grid_id = 0
-    total_checked = 0
-    water_with_depth = 0
+def map_row_bands(func, state, n_rows, workers=1, rows_per_band=ROWS_PER_BAND):
+    """
+    Run func over latitude bands of the lattice and yield results in order
 
-    print(f"Generating depth grid...")
+    func receives (first_row, end_row) and reads everything else from
+    _BAND_STATE. Results come back in band order whatever the worker
+    count, so merged output is deterministic.
+    """
+    bands = [(start, min(start + rows_per_band, n_rows))
+             for start in range(0, n_rows, rows_per_band)]
+
+    if workers <= 1 or len(bands) <= 1:
+        _init_band_worker(state)
+        try:
+            for band in bands:
+                yield band, func(band)
+        finally:
+            _BAND_STATE.clear()
+        return
+
+    with multiprocessing.Pool(min(workers, len(bands)), initializer=_init_band_worker,
+                              initargs=(state,)) as pool:
+        yield from zip(bands, pool.imap(func, bands))
+
+def _band_water_cells(band):
+    """Row-major indexes of the water cells in a band of rows"""
+    cols = _BAND_STATE['cols']
+    water_cells = _BAND_STATE['water_cells']
+    first, end = np.searchsorted(water_cells, (band[0] * cols, band[1] * cols))
+    return water_cells[first:end]
+
+def _point_cloud_band(band):
+    """Nearest bathymetric point (distance, index) for each water cell in a band"""
+    cells = _band_water_cells(band)
+    return _BAND_STATE['tree'].query(
+        project_to_metres(_BAND_STATE['cell_lats'][cells], _BAND_STATE['cell_lngs'][cells]),
+        distance_upper_bound=MAX_NEAREST_DISTANCE_M
+    )
+
+def query_nearest_points(tree, cell_lats, cell_lngs, water_cells, cols, workers=1):
+    """
+    Nearest bathymetric point (dists, indexes) for each water cell
+
+    water_cells are ascending row-major indexes into cell_lats/cell_lngs
+    on a lattice with cols columns. Cells with no point within
+    MAX_NEAREST_DISTANCE_M get an infinite distance.
+    """
+    state = {
+        'tree': tree,
+        'cell_lats': cell_lats,
+        'cell_lngs': cell_lngs,
+        'water_cells': water_cells,
+        'cols': cols
+    }
+    n_rows = -(-len(cell_lats) // cols)
+    band_results = [result for _, result in
+                    map_row_bands(_point_cloud_band, state, n_rows, workers)]
+    if not band_results:
+        return np.empty(0), np.empty(0, dtype=np.int64)
+    return (np.concatenate([band_dists for band_dists, _ in band_results]),
+            np.concatenate([band_nearest for _, band_nearest in band_results]))
+
+def _contour_band(band):
+    """Interpolated depth for each water cell in a band"""
+    s = _BAND_STATE
+    cells = _band_water_cells(band)
+    points = project_to_metres(s['cell_lats'][cells], s['cell_lngs'][cells], s['central_lng'])
+    depths, _ = interpolate_from_contours(points, s['tree'], s['starts'], s['ends'],
+                                          s['seg_depths'], s['max_half_length'])
+    return depths
+
+def process_point_cloud(bathymetry_file, water_boundary_file, output_file,
+                        min_depth_m=MIN_POINT_DEPTH_M, cache_dir=None, workers=1):
+    """
+    Process point cloud bathymetry (Lake Champlain format)
+    Each grid point gets depth from nearest bathymetric point
+    """
+    print(f"Processing point cloud: {bathymetry_file}")
+    timings = {}
 
-    lat = GRID_CONFIG['bounds']['south']
-    while lat <= GRID_CONFIG['bounds']['north']:
-        lng = GRID_CONFIG['bounds']['west']
+    started = time.perf_counter()
+    point_lats, point_lngs, point_depths, digest = load_point_cloud(
+        bathymetry_file, min_depth_m, cache_dir
+    )
+    timings['load'] = time.perf_counter() - started
 
-        while lng <= GRID_CONFIG['bounds']['east']:
-            total_checked += 1
+    print(f"Extracted {len(point_depths):,} valid depth points")
 
-            if total_checked % 10000 == 0:
-                print(f"  Processed {total_checked:,} grid points, found {water_with_depth:,} with depth data...")
+    if len(point_depths) == 0:
+        print("ERROR: No valid depth points found!")
+        return
 
-            if point_in_water(lat, lng):
-                # Find nearest bathymetric point
-                nearest_depth = None
-                min_dist = float('inf')
+    started = time.perf_counter()
+    tree = build_point_index(point_lats, point_lngs, digest, min_depth_m, cache_dir)
+    timings['index'] = time.perf_counter() - started
 
-                for bathy_point in bathy_points:
-                    dist = distance(lat, lng, bathy_point['lat'], bathy_point['lng'])
+    # Every cell of the routing lattice, in row-major order
+    lattice = GRID_LATTICE
+    lats, lngs = lattice.axes()
+    cell_lats, cell_lngs = lattice.cell_coordinates()
 
-                    if dist < min_dist:
-                        min_dist = dist
-                        nearest_depth = bathy_point['depth_m']
+    started = time.perf_counter()
+    in_water = rasterize_water_mask(water_boundary_file, lats, lngs).ravel()
+    timings['mask'] = time.perf_counter() - started
 
-                # Only include if nearest point is within 0.01° (~1km)
-                if nearest_depth is not None and min_dist < 0.01:
-                    depth_grid[f"g{grid_id}"] = {
-                        "lat": round(lat, 6),
-                        "lng": round(lng, 6),
-                        "depth": round(nearest_depth, 2),
-                        "nearest_dist": round(min_dist * 111000, 0)  # degrees to meters
-                    }
+    print(f"Generating depth grid...")
+    print(f"  {int(in_water.sum()):,} of {len(in_water):,} grid points are in water")
 
-                    water_with_depth += 1
-                    grid_id += 1
+    # Nearest bathymetric point for every water cell, one batched
+    # query per latitude band
+    started = time.perf_counter()
+    water_cells = np.flatnonzero(in_water)
+    dists, nearest = query_nearest_points(tree, cell_lats, cell_lngs, water_cells,
+                                          len(lngs), workers)
+    has_depth = np.isfinite(dists)
+    timings['query'] = time.perf_counter() - started
 
-            lng += GRID_CONFIG['lngStep']
+    print(f"  Found {int(has_depth.sum()):,} water grid points with depth data")
 
-        lat += GRID_CONFIG['latStep']
+    depth_grid = {}
+    for grid_id, i in enumerate(np.flatnonzero(has_depth)):
+        cell = water_cells[i]
+        depth_grid[f"g{grid_id}"] = {
+            "lat": round(float(cell_lats[cell]), 6),
+            "lng": round(float(cell_lngs[cell]), 6),
+            "row": int(cell // lattice.cols),
+            "col": int(cell % lattice.cols),
+            "depth": round(float(point_depths[nearest[i]]), 2),
+            "nearest_dist": round(float(dists[i]), 0)
+        }
 
     if not depth_grid:
         print("ERROR: No grid points with depth data!")
@@ -141,8 +328,10 @@ def process_point_cloud(bathymetry_file, water_boundary_file, output_file):
             "resolution_m": 200,
             "grid_points": len(depth_grid),
             "bounds": GRID_CONFIG['bounds'],
+            "lattice": lattice.to_dict(),
             "units": "meters",
-            "coverage_note": "Only areas with nearby bathymetric data"
+            "water_boundary": water_boundary_file,
+            "coverage_note": "Only water areas with nearby bathymetric data"
         },
         "depth_grid": depth_grid,
         "depth_statistics": {
@@ -154,9 +343,17 @@ def process_point_cloud(bathymetry_file, water_boundary_file, output_file):
     }
 
     # Write output
+    started = time.perf_counter()
     with open(output_file, 'w') as f:
         json.dump(output, f, indent=2)
 
+    dense = np.full(len(cell_lats), np.nan)
+    dense[water_cells[has_depth]] = point_depths[nearest[has_depth]]
+    binary_file = Path(output_file).with_suffix('.bin')
+    binary_size = write_depth_grid(binary_file, lattice,
+                                   dense.reshape(lattice.rows, lattice.cols))
+    timings['write'] = time.perf_counter() - started
+
     file_size_kb = len(json.dumps(output)) / 1024
 
     print(f"\n✓ Created depth grid:")
@@ -164,75 +361,241 @@ def process_point_cloud(bathymetry_file, water_boundary_file, output_file):
     print(f"  Depth range: {output['depth_statistics']['min']}m - {output['depth_statistics']['max']}m")
     print(f"  Average depth: {output['depth_statistics']['mean']}m")
     print(f"  File size: {file_size_kb:.1f} KB")
+    print(f"  Binary grid: {binary_file} ({binary_size / 1024:.1f} KB)")
+    print(f"  Timings: " + ", ".join(f"{stage} {secs:.2f}s" for stage, secs in timings.items()))
 
-def process_contour_lines(bathymetry_file, water_boundary_file, output_file):
+def load_contour_segments(bathymetry_file):
     """
-    Process contour line bathymetry (Hudson River format)
-    Interpolate depth between contour lines
+    Load contour lines as straight segments, streaming the input
+
+    Returns (starts, ends, depths_m) where starts/ends are (n, 2)
+    lng/lat arrays, one row per segment between consecutive vertices.
     """
-    print(f"Processing contour lines: {bathymetry_file}")
+    starts = []
+    ends = []
+    depths = []
+    lines_read = 0
+    for feature in iter_features(bathymetry_file):
+        lines_read += 1
+        depth_ft = feature['properties'].get('CONTOUR')
+        geometry = feature['geometry']
 
-    with open(bathymetry_file, 'r') as f:
-        bathy_data = json.load(f)
+        if depth_ft is None:
+            continue
 
-    print(f"Loaded {len(bathy_data['features']):,} contour lines")
+        if geometry['type'] == 'LineString':
+            lines = [geometry['coordinates']]
+        elif geometry['type'] == 'MultiLineString':
+            lines = geometry['coordinates']
+        else:
+            continue
 
-    # Extract contour segments
-    contour_segments = []
-    for feature in bathy_data['features']:
-        depth_ft = feature['properties'].get('CONTOUR')
+        depth_m = abs(float(depth_ft)) * 0.3048
 
-        if depth_ft is not None and feature['geometry']['type'] == 'LineString':
-            depth_m = abs(float(depth_ft)) * 0.3048
+        for coords in lines:
+            coords = np.asarray(coords, dtype=np.float64)[:, :2]
+            if len(coords) < 2:
+                continue
+            starts.append(coords[:-1])
+            ends.append(coords[1:])
+            depths.append(np.full(len(coords) - 1, depth_m))
 
-            coords = feature['geometry']['coordinates']
-            contour_segments.append({
-                'depth_m': depth_m,
-                'coords': coords
-            })
+    print(f"Loaded {lines_read:,} contour lines")
 
-    print(f"Extracted {len(contour_segments):,} contour segments")
+    if not starts:
+        return np.empty((0, 2)), np.empty((0, 2)), np.empty(0)
 
-    # For each grid point, find nearest contour and use its depth
-    # (Simple approach - can be improved with interpolation)
+    return np.concatenate(starts), np.concatenate(ends), np.concatenate(depths)
 
-    depth_grid = {}
-    grid_id = 0
+def split_long_segments(starts, ends, depths, max_length_m):
+    """
+    Split projected segments longer than max_length_m into equal pieces
+
+    Keeps every segment short so a midpoint index gives a tight bound
+    on true point-to-segment distance.
+    """
+    lengths = np.hypot(*(ends - starts).T)
+    pieces = np.maximum(1, np.ceil(lengths / max_length_m).astype(np.int64))
+
+    if pieces.max() == 1:
+        return starts, ends, depths
 
-    lat = GRID_CONFIG['bounds']['south']
-    while lat <= GRID_CONFIG['bounds']['north']:
-        lng = GRID_CONFIG['bounds']['west']
+    owner = np.repeat(np.arange(len(starts)), pieces)
+    first = np.cumsum(pieces) - pieces
+    step = np.arange(len(owner)) - first[owner]
+    t0 = (step / pieces[owner])[:, None]
+    t1 = ((step + 1) / pieces[owner])[:, None]
+    delta = ends[owner] - starts[owner]
 
-        while lng <= GRID_CONFIG['bounds']['east']:
+    return starts[owner] + t0 * delta, starts[owner] + t1 * delta, depths[owner]
 
-            # Find nearest contour point
-            nearest_depth = None
-            min_dist = float('inf')
+def point_segment_distances(points, starts, ends):
+    """
+    Distance from each point to each of its candidate segments
+
+    points is (n, 2); starts/ends are (n, k, 2). Returns (n, k).
+    """
+    delta = ends - starts
+    length_sq = np.einsum('nkd,nkd->nk', delta, delta)
+    offset = points[:, None, :] - starts
+    t = np.einsum('nkd,nkd->nk', offset, delta)
+    t = np.clip(np.divide(t, length_sq, out=np.zeros_like(t), where=length_sq > 0), 0, 1)
+    closest = starts + t[..., None] * delta
+    return np.hypot(*(points[:, None, :] - closest).transpose(2, 0, 1))
+
+def interpolate_from_contours(points, tree, starts, ends, depths, max_half_length):
+    """
+    Depth at each point from the two nearest contours of different depth
+
+    Candidate segments come from a KD-tree over segment midpoints. A
+    point is settled once its k-th candidate midpoint is far enough
+    away that no unseen segment could be closer; unsettled points are
+    re-queried with twice as many candidates.
 
-            for contour in contour_segments:
-                for coord in contour['coords']:
-                    dist = distance(lat, lng, coord[1], coord[0])
+    Returns (depths_m, nearest_dist_m); points with no contour within
+    MAX_CONTOUR_DISTANCE_M get NaN depth.
+    """
+    search_m = CONTOUR_BRACKET_SEARCH_M
+    bound = search_m + max_half_length
+
+    n = len(points)
+    near_dist = np.full(n, np.inf)
+    near_depth = np.full(n, np.nan)
+    other_dist = np.full(n, np.inf)
+    other_depth = np.full(n, np.nan)
+
+    pending = np.arange(n)
+    k = 16
+    while len(pending):
+        k = min(k, len(starts))
+        mid_dist, idx = tree.query(points[pending], k=k, distance_upper_bound=bound)
+        if k == 1:
+            mid_dist, idx = mid_dist[:, None], idx[:, None]
+
+        found = np.isfinite(mid_dist)
+        idx = np.where(found, idx, 0)
+
+        seg_dist = point_segment_distances(points[pending], starts[idx], ends[idx])
+        seg_dist[~found] = np.inf
+        seg_depth = depths[idx]
+
+        rows = np.arange(len(pending))
+        best = np.argmin(seg_dist, axis=1)
+        d1 = seg_dist[rows, best]
+        z1 = seg_depth[rows, best]
+
+        differs = seg_depth != z1[:, None]
+        second_dist = np.where(differs, seg_dist, np.inf)
+        second = np.argmin(second_dist, axis=1)
+        d2 = second_dist[rows, second]
+        z2 = seg_depth[rows, second]
+
+        # Anything not returned has a midpoint at least this far away
+        reach = np.minimum(mid_dist[:, -1], bound) - max_half_length
+        settled = (
+            ((d1 <= reach) | (reach >= MAX_CONTOUR_DISTANCE_M)) &
+            ((d1 > MAX_CONTOUR_DISTANCE_M) | (d2 <= reach) | (reach >= search_m))
+        )
+        if k == len(starts):
+            settled[:] = True
+
+        done = pending[settled]
+        near_dist[done] = d1[settled]
+        near_depth[done] = z1[settled]
+        other_dist[done] = d2[settled]
+        other_depth[done] = z2[settled]
+
+        pending = pending[~settled]
+        k *= 2
+
+    # Linear interpolation by distance between the bracketing contours
+    bracketed = np.isfinite(other_dist) & (other_dist <= search_m)
+    total = near_dist + other_dist
+    weight = np.divide(near_dist, total, out=np.zeros(n), where=bracketed & (total > 0))
+    result = np.where(bracketed, near_depth + (other_depth - near_depth) * weight, near_depth)
+    result[near_dist > MAX_CONTOUR_DISTANCE_M] = np.nan
+
+    return result, near_dist
+
+def process_contour_lines(bathymetry_file, water_boundary_file, output_file, workers=1):
+    """
+    Process contour line bathymetry (Hudson River format)
+    Interpolate depth between contour lines
+    """
+    print(f"Processing contour lines: {bathymetry_file}")
+    timings = {}
 
-                    if dist < min_dist:
-                        min_dist = dist
-                        nearest_depth = contour['depth_m']
+    started = time.perf_counter()
+    seg_starts, seg_ends, seg_depths = load_contour_segments(bathymetry_file)
+    timings['load'] = time.perf_counter() - started
 
-            # Only include if within 0.005° (~500m) of a contour
-            if nearest_depth is not None and min_dist < 0.005:
-                depth_grid[f"g{grid_id}"] = {
-                    "lat": round(lat, 6),
-                    "lng": round(lng, 6),
-                    "depth": round(nearest_depth, 2)
-                }
+    print(f"Extracted {len(seg_depths):,} contour segments")
 
-                grid_id += 1
+    if len(seg_depths) == 0:
+        print("ERROR: No contour segments found!")
+        return
 
-            lng += GRID_CONFIG['lngStep']
+    # Only walk the part of the lattice covered by contour data
+    all_coords = np.concatenate((seg_starts, seg_ends))
+    west, south = all_coords.min(axis=0)
+    east, north = all_coords.max(axis=0)
+    pad_lat = MAX_CONTOUR_DISTANCE_M / EARTH_RADIUS_M * 180 / np.pi
+    pad_lng = pad_lat / np.cos(np.radians(max(abs(south), abs(north))))
+    central_lng = (west + east) / 2
+
+    started = time.perf_counter()
+    starts = project_to_metres(seg_starts[:, 1], seg_starts[:, 0], central_lng)
+    ends = project_to_metres(seg_ends[:, 1], seg_ends[:, 0], central_lng)
+    starts, ends, seg_depths = split_long_segments(starts, ends, seg_depths, MAX_SEGMENT_LENGTH_M)
+    tree = cKDTree((starts + ends) / 2)
+    max_half_length = float(np.hypot(*(ends - starts).T).max()) / 2
+    timings['index'] = time.perf_counter() - started
+
+    lattice = GRID_LATTICE.covering(south - pad_lat, north + pad_lat,
+                                    west - pad_lng, east + pad_lng)
+    lats, lngs = lattice.axes()
+    cell_lats, cell_lngs = lattice.cell_coordinates()
+
+    started = time.perf_counter()
+    in_water = rasterize_water_mask(water_boundary_file, lats, lngs).ravel()
+    timings['mask'] = time.perf_counter() - started
+
+    water_cells = np.flatnonzero(in_water)
+    print(f"Generating depth grid over {len(water_cells):,} water cells "
+          f"({len(lats):,} x {len(lngs):,} lattice)...")
+
+    started = time.perf_counter()
+    grid_depths = np.full(len(cell_lats), np.nan)
+    state = {
+        'tree': tree,
+        'starts': starts,
+        'ends': ends,
+        'seg_depths': seg_depths,
+        'max_half_length': max_half_length,
+        'central_lng': central_lng,
+        'cell_lats': cell_lats,
+        'cell_lngs': cell_lngs,
+        'water_cells': water_cells,
+        'cols': len(lngs)
+    }
+    offset = 0
+    for (first_row, end_row), band_depths in map_row_bands(_contour_band, state,
+                                                            len(lats), workers):
+        grid_depths[water_cells[offset:offset + len(band_depths)]] = band_depths
+        offset += len(band_depths)
 
-        lat += GRID_CONFIG['latStep']
+        print(f"  Progress: {lats[end_row - 1]:.2f}° ({int(np.isfinite(grid_depths).sum())} points)")
+    timings['interpolate'] = time.perf_counter() - started
 
-        if int(lat * 100) % 10 == 0:
-            print(f"  Progress: {lat:.2f}° ({grid_id} points)")
+    depth_grid = {}
+    for grid_id, cell in enumerate(np.flatnonzero(np.isfinite(grid_depths))):
+        depth_grid[f"g{grid_id}"] = {
+            "lat": round(float(cell_lats[cell]), 6),
+            "lng": round(float(cell_lngs[cell]), 6),
+            "row": int(cell // lattice.cols),
+            "col": int(cell % lattice.cols),
+            "depth": round(float(grid_depths[cell]), 2)
+        }
 
     # Calculate statistics and save
     if not depth_grid:
@@ -247,8 +610,16 @@ def process_contour_lines(bathymetry_file, water_boundary_file, output_file):
             "format": "contour_lines",
             "resolution_m": 200,
             "grid_points": len(depth_grid),
-            "bounds": GRID_CONFIG['bounds'],
-            "units": "meters"
+            "bounds": {
+                "south": round(lattice.south, 6),
+                "north": round(lattice.north, 6),
+                "west": round(lattice.west, 6),
+                "east": round(lattice.east, 6)
+            },
+            "lattice": lattice.to_dict(),
+            "units": "meters",
+            "water_boundary": water_boundary_file,
+            "interpolation": "linear between nearest contours of different depth"
         },
         "depth_grid": depth_grid,
         "depth_statistics": {
@@ -259,15 +630,23 @@ def process_contour_lines(bathymetry_file, water_boundary_file, output_file):
         }
     }
 
+    started = time.perf_counter()
     with open(output_file, 'w') as f:
         json.dump(output, f, indent=2)
 
+    binary_file = Path(output_file).with_suffix('.bin')
+    binary_size = write_depth_grid(binary_file, lattice,
+                                   grid_depths.reshape(lattice.rows, lattice.cols))
+    timings['write'] = time.perf_counter() - started
+
     file_size_kb = len(json.dumps(output)) / 1024
 
     print(f"\n✓ Created depth grid:")
     print(f"  Grid points: {len(depth_grid):,}")
     print(f"  Depth range: {output['depth_statistics']['min']}m - {output['depth_statistics']['max']}m")
     print(f"  File size: {file_size_kb:.1f} KB")
+    print(f"  Binary grid: {binary_file} ({binary_size / 1024:.1f} KB)")
+    print(f"  Timings: " + ", ".join(f"{stage} {secs:.2f}s" for stage, secs in timings.items()))
 
 if __name__ == '__main__':
     parser = argparse.ArgumentParser(description='Process bathymetric GeoJSON data')
@@ -276,10 +655,22 @@ if __name__ == '__main__':
     parser.add_argument('output_file', help='Output depth grid JSON file')
     parser.add_argument('--format', choices=['points', 'contours'], required=True,
                         help='Bathymetry data format')
+    parser.add_argument('--min-depth', type=float, default=MIN_POINT_DEPTH_M,
+                        help=f'Minimum point cloud depth in meters (default: {MIN_POINT_DEPTH_M})')
+    parser.add_argument('--cache-dir', default=str(DEFAULT_CACHE_DIR),
+                        help=f'Point cloud cache directory (default: {DEFAULT_CACHE_DIR})')
+    parser.add_argument('--no-cache', action='store_true',
+                        help='Stream the point cloud GeoJSON without using the cache')
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 1,
+                        help='Worker processes for band-parallel gridding (default: CPU count)')
 
     args = parser.parse_args()
 
     if args.format == 'points':
-        process_point_cloud(args.bathymetry_file, args.boundary_file, args.output_file)
+        process_point_cloud(args.bathymetry_file, args.boundary_file, args.output_file,
+                            min_depth_m=args.min_depth,
+                            cache_dir=None if args.no_cache else args.cache_dir,
+                            workers=args.workers)
     else:
-        process_contour_lines(args.bathymetry_file, args.boundary_file, args.output_file)
+        process_contour_lines(args.bathymetry_file, args.boundary_file, args.output_file,
+                              workers=args.workers)
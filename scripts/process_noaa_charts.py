@@ -7,23 +7,44 @@ This script downloads NOAA nautical chart tiles and removes land areas,
 leaving only water portions visible. The processed tiles can be used as
 an overlay on satellite/street maps.
 
+Tiles are downloaded asynchronously (see tile_fetcher.py): one
+keep-alive session, a requests-per-second cap and a few requests in
+flight, with jittered backoff on errors. Downloads feed a bounded queue
+to a process pool that decodes, masks and PNG-encodes tiles, and writer
+threads save the results; stage depths are shown with the progress bar
+and summarized at the end.
+
+Original tile bytes are kept in a raw tile cache (see raw_tile_cache.py)
+apart from the processed output. After changing the land detection
+thresholds, --offline re-masks every cached tile without touching NOAA;
+--refresh revalidates cached tiles with conditional requests and
+reprocesses only those that changed.
+
 Requirements:
-    pip install requests pillow numpy shapely geopandas rasterio mercantile tqdm
+    pip install aiohttp requests pillow numpy shapely geopandas rasterio mercantile tqdm
+
+With --mbtiles, processed tiles go into one MBTiles file instead of
+loose PNGs, storing each distinct image once (see mbtiles_store.py,
+which also exports it back to the directory layout).
 
 Usage:
-    python process_noaa_charts.py
+    python process_noaa_charts.py [--refresh | --offline] [--mbtiles FILE]
 
 Output:
-    Processed tiles in ./processed_tiles/{z}/{x}/{y}.png
+    Processed tiles in ./processed_tiles/{z}/{x}/{y}.png (or the --mbtiles file)
+    Raw tiles in ./raw_tile_cache/{z}/{x}/{y}.tile
 """
 
 import os
 import sys
 import math
+import argparse
+import asyncio
+import sqlite3
 import requests
 from pathlib import Path
-from concurrent.futures import ThreadPoolExecutor, as_completed
 from io import BytesIO
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
 
 try:
     from PIL import Image
@@ -33,10 +54,14 @@ try:
     import geopandas as gpd
     from shapely.geometry import box, shape
     from shapely.ops import unary_union
+    from tile_fetcher import TileFetcher
+    from raw_tile_cache import RawTileCache, fetch_through_cache
+    from chart_colors import detect_land_by_color, land_color_lut
+    from mbtiles_store import MBTilesStore, print_stats
 except ImportError as e:
     print(f"Missing dependency: {e}")
     print("\nInstall required packages:")
-    print("pip install requests pillow numpy shapely geopandas mercantile tqdm")
+    print("pip install aiohttp requests pillow numpy shapely geopandas mercantile tqdm")
     sys.exit(1)
 
 
@@ -56,10 +81,10 @@ BOUNDS = {
 # Which region to process
 REGION = 'lake_champlain'
 
-# Zoom levels to process - Start with lower zooms for overnight batch 1
-# Batch 1: Zoom 10-12 (~108 tiles, ~6 minutes at 2s/tile + 2s delay)
-# Batch 2: Zoom 13 (~280 tiles, ~19 minutes)
-# Batch 3: Zoom 14+ (larger batches for later)
+# Zoom levels to process
+# Zoom 10-12: ~108 tiles, under a minute at 2 requests/s
+# Zoom 13: ~280 tiles, ~2.5 minutes
+# Zoom 14: ~1,000 tiles, ~9 minutes
 ZOOM_LEVELS = range(10, 13)  # Zoom 10-12 for first batch
 
 # NOAA tile server URLs (try seamless RNC service - more reliable)
@@ -71,15 +96,24 @@ NOAA_TILE_URL = "https://seamlessrnc.nauticalcharts.noaa.gov/arcgis/rest/service
 # Output directory
 OUTPUT_DIR = Path("./processed_tiles")
 
+# Original tile bytes and HTTP validators, kept so masking can rerun offline
+RAW_CACHE_DIR = Path("./raw_tile_cache")
+
 # Water data source (will be downloaded if not present)
 WATER_DATA_URL = "https://naciscdn.org/naturalearth/10m/physical/ne_10m_ocean.zip"
 WATER_DATA_DIR = Path("./water_data")
 
-# Processing settings - SLOW MODE for overnight batch processing
-MAX_WORKERS = 1  # Single thread to be gentle on NOAA servers
-RETRY_ATTEMPTS = 5  # More retry attempts
-RETRY_DELAY = 5  # Longer delay between retries (seconds)
-REQUEST_DELAY = 2  # Delay between each tile request (seconds)
+# Download settings - polite to NOAA: a steady request rate, never a burst
+REQUESTS_PER_SECOND = 2  # Token bucket rate shared by all requests, retries included
+MAX_CONCURRENT_REQUESTS = 4  # Requests in flight, to hide server latency
+RETRY_ATTEMPTS = 5  # Attempts per tile
+RETRY_DELAY = 5  # Backoff base (seconds): retry n waits a random 0 to RETRY_DELAY * 2^n
+
+# Pipeline settings - each stage is sized on its own
+MASK_WORKERS = os.cpu_count() or 1  # Processes decoding, masking and PNG-encoding tiles
+WRITE_WORKERS = 2  # Threads saving encoded tiles
+PIPELINE_QUEUE_SIZE = 32  # Tiles buffered between stages before the stage ahead waits
+DEPTH_SAMPLE_INTERVAL = 0.5  # Seconds between stage depth samples
 LAND_COLORS_THRESHOLD = 200  # Brightness threshold for land detection
 USE_WATER_MASK = False  # Use color-based detection (works better for inland waters like Lake Champlain)
 
@@ -206,41 +240,6 @@ def load_water_geometry(bounds):
 # Tile Processing Functions
 # =============================================================================
 
-def download_tile(z, x, y):
-    """Download a single NOAA tile with retry logic."""
-    import time
-
-    url = NOAA_TILE_URL.format(z=z, x=x, y=y)
-
-    for attempt in range(RETRY_ATTEMPTS):
-        try:
-            response = requests.get(url, timeout=60, headers={
-                'User-Agent': 'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) NOAA Chart Processor'
-            })
-            if response.status_code == 200:
-                # Check if we got actual image data
-                if len(response.content) > 100:
-                    return Image.open(BytesIO(response.content)).convert('RGBA')
-                else:
-                    return None  # Empty/placeholder tile
-            elif response.status_code == 404:
-                return None  # No chart data for this tile
-            else:
-                if attempt < RETRY_ATTEMPTS - 1:
-                    time.sleep(RETRY_DELAY * (attempt + 1))
-                    continue
-                return None
-        except Exception as e:
-            if attempt < RETRY_ATTEMPTS - 1:
-                time.sleep(RETRY_DELAY * (attempt + 1))
-                continue
-            # Only print error on final attempt
-            print(f"Failed tile {z}/{x}/{y} after {RETRY_ATTEMPTS} attempts: {type(e).__name__}")
-            return None
-
-    return None
-
-
 def create_water_mask_for_tile(tile_bounds, water_geom, tile_size=256):
     """Create a binary mask where water=255 and land=0."""
     from shapely.geometry import mapping
@@ -271,96 +270,287 @@ def create_water_mask_for_tile(tile_bounds, water_geom, tile_size=256):
     return mask
 
 
-def detect_land_by_color(img_array):
-    """
-    Detect land areas by color analysis for NOAA nautical charts.
-
-    NOAA chart colors:
-    - Land: Tan/beige (RGB ~220, 200, 170) - sandy/earthy colors
-    - Water: Blue tints, white, light cyan
-    - Urban areas: Yellow/gray tints
-    - Depth contours: Blue lines on lighter background
-    """
-    r, g, b, a = img_array[:,:,0], img_array[:,:,1], img_array[:,:,2], img_array[:,:,3]
-
-    # Detect land colors in NOAA charts
-    # Land is typically tan/beige: high R, medium-high G, lower B
-    is_land_tan = (
-        (r > 180) & (r < 250) &
-        (g > 160) & (g < 230) &
-        (b > 120) & (b < 200) &
-        (r > b + 15) &  # R higher than B (tan/beige characteristic)
-        (g > b)  # G also higher than B
-    )
-
-    # Urban/developed areas often have yellow-gray tint
-    is_land_urban = (
-        (r > 190) & (g > 190) & (b > 150) & (b < 200) &
-        (abs(r.astype(int) - g.astype(int)) < 30)  # R and G similar
-    )
-
-    # Very light beige/cream for some land areas
-    is_land_light = (
-        (r > 230) & (g > 220) & (b > 200) & (b < 230) &
-        (r > b)
-    )
+# =============================================================================
+# Tile Pipeline
+# =============================================================================
 
-    # Combine land detection
-    is_land = is_land_tan | is_land_urban | is_land_light
+def tile_output_path(z, x, y):
+    """Where the processed tile is saved."""
+    return OUTPUT_DIR / str(z) / str(x) / f"{y}.png"
 
-    # Create mask (255 = keep/water, 0 = make transparent/land)
-    mask = np.where(is_land, 0, 255).astype(np.uint8)
 
-    return mask
+# Water geometry for mask workers, set once per process by _init_mask_worker
+_worker_water_geom = None
+# Colour mask and lookup index buffers, reused by each worker for every tile
+_worker_color_buffers = None
 
 
-def process_tile(z, x, y, water_geom=None):
-    """Download and process a single tile."""
-    import time
+def _init_mask_worker(water_geom):
+    global _worker_water_geom
+    _worker_water_geom = water_geom
+    # Build the colour lookup table up front (a no-op if forked after it was built)
+    land_color_lut()
 
-    output_path = OUTPUT_DIR / str(z) / str(x) / f"{y}.png"
 
-    # Skip if already processed
-    if output_path.exists():
-        return True, (z, x, y), "skipped"
+def _color_mask(img_array):
+    """Colour-based land mask written into the worker's reusable buffers"""
+    global _worker_color_buffers
+    shape = img_array.shape[:-1]
+    if _worker_color_buffers is None or _worker_color_buffers[0].shape != shape:
+        _worker_color_buffers = (np.empty(shape, dtype=np.uint8), np.empty(shape, dtype=np.uint32))
+    mask, index = _worker_color_buffers
+    return detect_land_by_color(img_array, out=mask, index=index)
 
-    # Add delay between requests to be gentle on NOAA servers
-    time.sleep(REQUEST_DELAY)
 
-    # Download tile
-    img = download_tile(z, x, y)
-    if img is None:
-        return False, (z, x, y), "download failed"
+def mask_tile(z, x, y, data):
+    """
+    Decode a downloaded tile, mask out land and encode it as PNG.
+    Returns (png_bytes, status); png_bytes is None if the tile is unusable.
+    Runs in a mask worker process.
+    """
+    # Check if we got actual image data
+    if len(data) <= 100:
+        return None, "empty tile"
 
     # Convert to numpy array
-    img_array = np.array(img)
+    try:
+        img_array = np.array(Image.open(BytesIO(data)).convert('RGBA'))
+    except OSError as e:
+        print(f"Undecodable tile {z}/{x}/{y}: {e}")
+        return None, "decode failed"
 
     # Check if tile is empty (all transparent or single color)
     if img_array[:,:,3].max() == 0:
-        return False, (z, x, y), "empty tile"
+        return None, "empty tile"
 
     # Create water mask
-    if USE_WATER_MASK and water_geom is not None:
+    if USE_WATER_MASK and _worker_water_geom is not None:
         tile_bounds = get_tile_bounds(x, y, z)
         try:
-            mask = create_water_mask_for_tile(tile_bounds, water_geom)
+            mask = create_water_mask_for_tile(tile_bounds, _worker_water_geom)
         except Exception as e:
             # Fallback to color detection
-            mask = detect_land_by_color(img_array)
+            mask = _color_mask(img_array)
     else:
         # Use color-based detection
-        mask = detect_land_by_color(img_array)
+        mask = _color_mask(img_array)
 
     # Apply mask to alpha channel
     # Where mask is 0 (land), make transparent
     img_array[:,:,3] = np.minimum(img_array[:,:,3], mask)
 
-    # Save processed tile
+    # Encode processed tile
+    output = BytesIO()
+    Image.fromarray(img_array).save(output, 'PNG', optimize=True)
+
+    return output.getvalue(), "processed"
+
+
+def save_tile(z, x, y, png):
+    """Write an encoded tile; a partly written file never looks processed."""
+    output_path = tile_output_path(z, x, y)
     output_path.parent.mkdir(parents=True, exist_ok=True)
-    result_img = Image.fromarray(img_array)
-    result_img.save(output_path, 'PNG', optimize=True)
+    tmp_path = output_path.with_name(output_path.name + '.tmp')
+    tmp_path.write_bytes(png)
+    os.replace(tmp_path, output_path)
 
-    return True, (z, x, y), "processed"
+
+class TilePipeline:
+    """
+    Staged tile processing joined by bounded queues:
+
+        source (downloads or cache reads) -> mask queue
+        -> mask workers (processes: decode, mask, PNG encode) -> write queue
+        -> writers (threads: save as files, or one thread into an MBTiles store)
+
+    A full queue holds back the stage before it, so downloads pause
+    while masking catches up instead of piling tiles up in memory.
+    depths() reports how many tiles each stage holds: a queue that stays
+    full points at the stage after it as the bottleneck, one that stays
+    empty at the stage before it.
+    """
+
+    def __init__(self, water_geom=None, store=None, mask_workers=MASK_WORKERS,
+                 write_workers=WRITE_WORKERS, queue_size=PIPELINE_QUEUE_SIZE):
+        self.water_geom = water_geom
+        self.store = store
+        self.mask_workers = mask_workers
+        # SQLite takes one writer at a time
+        self.write_workers = 1 if store else write_workers
+        self._stored = store.tile_keys() if store else None
+        self.mask_queue = asyncio.Queue(queue_size)
+        self.write_queue = asyncio.Queue(queue_size)
+        self.fetcher = None  # TileFetcher feeding the source, if downloading
+        self.masking = 0
+        self.writing = 0
+        self.counts = {'processed': 0, 'skipped': 0, 'failed': 0}
+        self.depth_samples = []
+        self._pbar = None
+
+    def is_processed(self, z, x, y):
+        """Whether processed output already exists for a tile"""
+        if self.store:
+            return (z, x, y) in self._stored
+        return tile_output_path(z, x, y).exists()
+
+    def _save(self, z, x, y, png):
+        if self.store:
+            self.store.put(z, x, y, png)
+        else:
+            save_tile(z, x, y, png)
+
+    def depths(self):
+        """Tiles held by each stage right now"""
+        return {
+            'downloading': self.fetcher.in_flight if self.fetcher else 0,
+            'mask_queue': self.mask_queue.qsize(),
+            'masking': self.masking,
+            'write_queue': self.write_queue.qsize(),
+            'writing': self.writing
+        }
+
+    def depth_summary(self):
+        """{stage: (mean, max)} over the depths sampled during the run"""
+        if not self.depth_samples:
+            return {}
+        return {
+            stage: (sum(sample[stage] for sample in self.depth_samples) / len(self.depth_samples),
+                    max(sample[stage] for sample in self.depth_samples))
+            for stage in self.depth_samples[0]
+        }
+
+    def _finish(self, outcome):
+        self.counts[outcome] += 1
+        self._pbar.update(1)
+
+    async def _mask_stage(self, pool):
+        loop = asyncio.get_running_loop()
+        while True:
+            (z, x, y), data = await self.mask_queue.get()
+            self.masking += 1
+            try:
+                png, status = await loop.run_in_executor(pool, mask_tile, z, x, y, data)
+            except Exception as e:
+                print(f"Masking failed for tile {z}/{x}/{y}: {e}")
+                png = None
+            self.masking -= 1
+
+            if png is None:
+                self._finish('failed')
+            else:
+                await self.write_queue.put(((z, x, y), png))
+            self.mask_queue.task_done()
+
+    async def _write_stage(self, pool):
+        loop = asyncio.get_running_loop()
+        while True:
+            (z, x, y), png = await self.write_queue.get()
+            self.writing += 1
+            try:
+                await loop.run_in_executor(pool, self._save, z, x, y, png)
+                self._finish('processed')
+            except (OSError, sqlite3.Error) as e:
+                print(f"Could not save tile {z}/{x}/{y}: {e}")
+                self._finish('failed')
+            self.writing -= 1
+            self.write_queue.task_done()
+
+    async def _monitor(self):
+        while True:
+            depths = self.depths()
+            self.depth_samples.append(depths)
+            self._pbar.set_postfix(depths, refresh=False)
+            await asyncio.sleep(DEPTH_SAMPLE_INTERVAL)
+
+    async def run(self, source, total, skipped=0):
+        """
+        Process ((z, x, y), status, data) items from an async source;
+        returns counts by outcome
+
+        Status 200 or 304 carries tile bytes; a 304 tile that is already
+        processed is skipped. Anything else (404, None) counts as failed.
+        total and skipped size the progress bar.
+        """
+        self.counts['skipped'] += skipped
+
+        with ProcessPoolExecutor(self.mask_workers, initializer=_init_mask_worker,
+                                 initargs=(self.water_geom,)) as mask_pool, \
+                ThreadPoolExecutor(self.write_workers) as write_pool, \
+                tqdm(total=total, initial=skipped, desc="Processing") as self._pbar:
+            stages = [asyncio.create_task(self._mask_stage(mask_pool))
+                      for _ in range(self.mask_workers)]
+            stages += [asyncio.create_task(self._write_stage(write_pool))
+                       for _ in range(self.write_workers)]
+            stages.append(asyncio.create_task(self._monitor()))
+
+            try:
+                async for tile, status, data in source:
+                    if status == 304 and self.is_processed(*tile):
+                        # Unchanged on the server and already processed
+                        self._finish('skipped')
+                    elif status in (200, 304):
+                        await self.mask_queue.put((tile, data))
+                    else:
+                        # 404: no chart data for this tile; None: retries ran out
+                        self._finish('failed')
+
+                await self.mask_queue.join()
+                await self.write_queue.join()
+            finally:
+                for stage in stages:
+                    stage.cancel()
+                await asyncio.gather(*stages, return_exceptions=True)
+
+        return self.counts
+
+
+async def process_tiles(tiles, water_geom=None, refresh=False, store=None,
+                        url_template=NOAA_TILE_URL):
+    """
+    Download and process tiles; returns the finished TilePipeline
+
+    Tiles already processed, or known to be missing on the server, are
+    skipped without a request unless refresh is set. Downloads go
+    through the raw tile cache, so cached tiles are revalidated with
+    conditional requests and only reprocessed when they changed.
+    Output goes to store (an MBTilesStore) if given, else OUTPUT_DIR.
+    """
+    cache = RawTileCache(RAW_CACHE_DIR)
+    pipeline = TilePipeline(water_geom, store)
+    todo = []
+    for z, x, y in tiles:
+        if not refresh and (pipeline.is_processed(z, x, y) or cache.is_missing(z, x, y)):
+            continue
+        todo.append((z, x, y))
+
+    async with TileFetcher(url_template, rate=REQUESTS_PER_SECOND,
+                           concurrency=MAX_CONCURRENT_REQUESTS, retries=RETRY_ATTEMPTS,
+                           backoff_base=RETRY_DELAY) as fetcher:
+        pipeline.fetcher = fetcher
+        await pipeline.run(fetch_through_cache(fetcher, cache, todo),
+                           total=len(tiles), skipped=len(tiles) - len(todo))
+
+    return pipeline
+
+
+async def process_cached_tiles(tiles, water_geom=None, store=None):
+    """
+    Re-mask tiles from the raw tile cache without any requests,
+    overwriting processed output; returns the finished TilePipeline
+
+    Tiles that were never downloaded count as failed.
+    """
+    cache = RawTileCache(RAW_CACHE_DIR)
+    loop = asyncio.get_running_loop()
+
+    async def read_cached():
+        for tile in tiles:
+            data = await loop.run_in_executor(None, cache.read, *tile)
+            yield tile, (200 if data is not None else None), data
+
+    pipeline = TilePipeline(water_geom, store)
+    await pipeline.run(read_cached(), total=len(tiles))
+    return pipeline
 
 
 # =============================================================================
@@ -368,6 +558,17 @@ def process_tile(z, x, y, water_geom=None):
 # =============================================================================
 
 def main():
+    parser = argparse.ArgumentParser(description='Download NOAA chart tiles and mask out land')
+    mode = parser.add_mutually_exclusive_group()
+    mode.add_argument('--refresh', action='store_true',
+                      help='Revalidate every tile with NOAA and reprocess the ones that changed')
+    mode.add_argument('--offline', action='store_true',
+                      help=f'Reprocess every tile from the raw tile cache ({RAW_CACHE_DIR}) '
+                           'without network access')
+    parser.add_argument('--mbtiles', metavar='FILE',
+                        help=f'Write tiles into a deduplicating MBTiles file instead of {OUTPUT_DIR}')
+    args = parser.parse_args()
+
     print("=" * 60)
     print("NOAA Chart Tile Processor - Water-Only Extraction")
     print("=" * 60)
@@ -396,43 +597,55 @@ def main():
             print(f"Warning: Could not load water geometry: {e}")
             print("Falling back to color-based land detection")
 
-    # Create output directory
-    OUTPUT_DIR.mkdir(parents=True, exist_ok=True)
+    # Open the output
+    store = None
+    if args.mbtiles:
+        store = MBTilesStore(args.mbtiles, {
+            'name': f"NOAA charts, water only ({REGION})",
+            'format': 'png',
+            'type': 'overlay',
+            'bounds': ','.join(str(v) for v in bounds),
+            'attribution': 'NOAA (processed)'
+        })
+    else:
+        OUTPUT_DIR.mkdir(parents=True, exist_ok=True)
 
     # Process tiles
-    print(f"\nProcessing tiles with {MAX_WORKERS} workers...")
-
-    processed = 0
-    skipped = 0
-    failed = 0
-
-    with ThreadPoolExecutor(max_workers=MAX_WORKERS) as executor:
-        futures = {
-            executor.submit(process_tile, z, x, y, water_geom): (z, x, y)
-            for z, x, y in all_tiles
-        }
-
-        with tqdm(total=len(all_tiles), desc="Processing") as pbar:
-            for future in as_completed(futures):
-                success, tile_coords, status = future.result()
-
-                if status == "processed":
-                    processed += 1
-                elif status == "skipped":
-                    skipped += 1
-                else:
-                    failed += 1
-
-                pbar.update(1)
+    if args.offline:
+        print(f"\nReprocessing cached tiles from {RAW_CACHE_DIR} "
+              f"({MASK_WORKERS} mask workers)...")
+        pipeline = asyncio.run(process_cached_tiles(all_tiles, water_geom, store))
+    else:
+        print(f"\nDownloading at up to {REQUESTS_PER_SECOND} requests/s "
+              f"({MAX_CONCURRENT_REQUESTS} in flight, {MASK_WORKERS} mask workers)...")
+        pipeline = asyncio.run(process_tiles(all_tiles, water_geom, refresh=args.refresh,
+                                             store=store))
+    counts = pipeline.counts
+    processed, skipped, failed = counts['processed'], counts['skipped'], counts['failed']
 
     # Summary
     print("\n" + "=" * 60)
     print("Processing Complete!")
     print("=" * 60)
     print(f"  Processed: {processed}")
-    print(f"  Skipped (existing): {skipped}")
+    print(f"  Skipped (existing or unchanged): {skipped}")
     print(f"  Failed: {failed}")
-    print(f"\nOutput directory: {OUTPUT_DIR.absolute()}")
+
+    # Mean and peak tiles per stage; a queue that stays full means the
+    # stage after it is the one to give more workers
+    depths = pipeline.depth_summary()
+    if depths:
+        print("\nStage depths (mean / max):")
+        for stage, (mean, peak) in depths.items():
+            print(f"  {stage}: {mean:.1f} / {peak}")
+
+    if store:
+        print(f"\nMBTiles file: {Path(args.mbtiles).absolute()}")
+        print_stats(store)
+        store.close()
+        print(f"Export to {{z}}/{{x}}/{{y}}.png with: python mbtiles_store.py export {args.mbtiles} DIR")
+    else:
+        print(f"\nOutput directory: {OUTPUT_DIR.absolute()}")
 
     # Generate tile server info
     print("\n" + "-" * 60)
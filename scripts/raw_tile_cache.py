@@ -0,0 +1,188 @@
+#!/usr/bin/env python3
+"""
+Raw chart tile cache
+
+Keeps the original tile bytes exactly as the tile server sent them,
+together with the ETag and Last-Modified validators, apart from any
+processed output. Re-running the masking stage with new thresholds
+reads tiles from here instead of downloading them again, and refreshing
+the cache sends conditional requests so unchanged tiles cost a 304
+rather than a full download.
+
+Usage:
+    python raw_tile_cache.py info [--cache-dir DIR]
+
+Cache layout:
+    {cache_dir}/{z}/{x}/{y}.tile   - tile bytes as served
+    {cache_dir}/{z}/{x}/{y}.json   - {status, etag, last_modified, content_type, fetched, checked}
+
+A tile the server answered with 404 has only its .json file, with
+status 404, so later runs do not ask for it again unless refreshing.
+"""
+
+import argparse
+import json
+import os
+import time
+from pathlib import Path
+
+DEFAULT_CACHE_DIR = Path("./raw_tile_cache")
+
+
+def _write_atomic(path, data):
+    """Write via a temporary file so readers never see a partial entry"""
+    tmp_path = path.with_name(path.name + '.tmp')
+    with open(tmp_path, 'wb') as f:
+        f.write(data)
+    os.replace(tmp_path, path)
+
+
+class RawTileCache:
+    """Tile bytes and HTTP validators stored under {cache_dir}/{z}/{x}/{y}"""
+
+    def __init__(self, cache_dir=DEFAULT_CACHE_DIR):
+        self.cache_dir = Path(cache_dir)
+
+    def _path(self, z, x, y, suffix):
+        return self.cache_dir / str(z) / str(x) / f"{y}{suffix}"
+
+    def metadata(self, z, x, y):
+        """Stored metadata for a tile, or None if it was never fetched"""
+        try:
+            with open(self._path(z, x, y, '.json'), 'r') as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return None
+
+    def read(self, z, x, y):
+        """Cached tile bytes, or None"""
+        meta = self.metadata(z, x, y)
+        if meta is None or meta['status'] != 200:
+            return None
+        try:
+            return self._path(z, x, y, '.tile').read_bytes()
+        except FileNotFoundError:
+            return None
+
+    def is_missing(self, z, x, y):
+        """Whether the server had no tile (404) when last asked"""
+        meta = self.metadata(z, x, y)
+        return meta is not None and meta['status'] == 404
+
+    def conditional_headers(self, z, x, y):
+        """If-None-Match / If-Modified-Since headers for a cached tile, or None"""
+        meta = self.metadata(z, x, y)
+        if meta is None or meta['status'] != 200:
+            return None
+
+        headers = {}
+        if meta.get('etag'):
+            headers['If-None-Match'] = meta['etag']
+        if meta.get('last_modified'):
+            headers['If-Modified-Since'] = meta['last_modified']
+        return headers or None
+
+    def _write_metadata(self, z, x, y, meta):
+        path = self._path(z, x, y, '.json')
+        path.parent.mkdir(parents=True, exist_ok=True)
+        _write_atomic(path, json.dumps(meta).encode('utf-8'))
+
+    def store(self, z, x, y, body, headers):
+        """Save a 200 response; the metadata is written last, marking the entry complete"""
+        tile_path = self._path(z, x, y, '.tile')
+        tile_path.parent.mkdir(parents=True, exist_ok=True)
+        _write_atomic(tile_path, body)
+
+        now = time.time()
+        self._write_metadata(z, x, y, {
+            'status': 200,
+            'etag': headers.get('ETag'),
+            'last_modified': headers.get('Last-Modified'),
+            'content_type': headers.get('Content-Type'),
+            'fetched': now,
+            'checked': now
+        })
+
+    def revalidated(self, z, x, y, headers):
+        """Record a 304: the cached bytes are current, validators may be refreshed"""
+        meta = self.metadata(z, x, y)
+        meta['etag'] = headers.get('ETag', meta.get('etag'))
+        meta['last_modified'] = headers.get('Last-Modified', meta.get('last_modified'))
+        meta['checked'] = time.time()
+        self._write_metadata(z, x, y, meta)
+
+    def mark_missing(self, z, x, y):
+        """Record a 404, dropping any bytes cached before"""
+        self._path(z, x, y, '.tile').unlink(missing_ok=True)
+        self._write_metadata(z, x, y, {'status': 404, 'checked': time.time()})
+
+    def tiles(self):
+        """(z, x, y) of every tile with cached bytes"""
+        for meta_path in sorted(self.cache_dir.glob('*/*/*.json')):
+            z, x = int(meta_path.parent.parent.name), int(meta_path.parent.name)
+            y = int(meta_path.stem)
+            if self.read(z, x, y) is not None:
+                yield z, x, y
+
+
+async def fetch_through_cache(fetcher, cache, tiles):
+    """
+    Fetch tiles with a TileFetcher, revalidating cached ones
+
+    Cached tiles are requested conditionally. Yields ((z, x, y), status,
+    body): 200 with new or changed bytes (now cached), 304 with the
+    cached bytes, 404 when the server has no tile, None if the download
+    failed.
+    """
+    async for tile, status, body, headers in fetcher.fetch_all(tiles, cache.conditional_headers):
+        if status == 304:
+            body = cache.read(*tile)
+            if body is not None:
+                cache.revalidated(*tile, headers)
+                yield tile, 304, body
+                continue
+            # Entry vanished since the request went out
+            status, body, headers = await fetcher.fetch(*tile)
+
+        if status == 200:
+            cache.store(*tile, body, headers)
+        elif status == 404:
+            cache.mark_missing(*tile)
+        yield tile, status, body
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Inspect the raw chart tile cache')
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    info = subparsers.add_parser('info', help='Summarize cached tiles by zoom level')
+    info.add_argument('--cache-dir', default=str(DEFAULT_CACHE_DIR),
+                      help=f'Cache directory (default: {DEFAULT_CACHE_DIR})')
+
+    args = parser.parse_args()
+
+    cache = RawTileCache(args.cache_dir)
+    by_zoom = {}
+    for meta_path in cache.cache_dir.glob('*/*/*.json'):
+        z = int(meta_path.parent.parent.name)
+        stats = by_zoom.setdefault(z, {'tiles': 0, 'missing': 0, 'bytes': 0})
+        tile_path = meta_path.with_suffix('.tile')
+        if tile_path.exists():
+            stats['tiles'] += 1
+            stats['bytes'] += tile_path.stat().st_size
+        else:
+            stats['missing'] += 1
+
+    if not by_zoom:
+        print(f"No tiles cached in {cache.cache_dir}")
+        return
+
+    print(f"Raw tile cache: {cache.cache_dir.absolute()}")
+    for z in sorted(by_zoom):
+        stats = by_zoom[z]
+        print(f"  Zoom {z}: {stats['tiles']} tiles ({stats['bytes'] / 1024:.1f} KB), "
+              f"{stats['missing']} missing on server")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,346 @@
+#!/usr/bin/env python3
+"""
+Build-time routing graph in compressed sparse row (CSR) form
+
+Nodes are the water cells of the routing lattice in row-major order.
+Every node links to its 8-connected water neighbours, listed in the
+same direction order as getNeighbors() in navigation.js (N, NE, E, SE,
+S, SW, W, NW), with the haversine edge length precomputed in km.
+Node depths are stored so routers can apply any draft without touching
+the depth grid; a node's neighbours are
+neighbors[offsets[node]:offsets[node + 1]].
+
+    Header (56 bytes, little-endian)
+        0   4s   magic "RGPH"
+        4   H    format version (1)
+        6   h    depth nodata sentinel (-32768)
+        8   I    lattice rows
+        12  I    lattice cols
+        16  I    nodes (n)
+        20  I    directed edges (m)
+        24  d    south (latitude of row 0)
+        32  d    west (longitude of column 0)
+        40  d    latStep (degrees)
+        48  d    lngStep (degrees)
+    Body, in order
+        <f8  n      node latitudes (rounded to 6 decimals)
+        <f8  n      node longitudes (rounded to 6 decimals)
+        <u4  n      node lattice cell (row * cols + col)
+        <u4  n + 1  offsets into neighbors/lengths
+        <u4  m      neighbour node indexes
+        <f4  m      edge lengths (km)
+        <i2  n      node depths in decimetres
+
+Usage:
+    python routing_graph.py build <boundary.geojson> <output.bin> [<depth-grid.bin> ...]
+    python routing_graph.py info <graph.bin>
+"""
+
+import argparse
+import struct
+import sys
+from pathlib import Path
+
+try:
+    import numpy as np
+    from depth_grid_binary import DEPTH_SCALE, NODATA
+    from grid_lattice import GRID_LATTICE, GridLattice
+    from navigability_masks import lattice_depths
+    from process_bathymetry_geojson import rasterize_water_mask
+except ImportError as e:
+    print(f"Missing dependency: {e}")
+    print("\nInstall required packages:")
+    print("pip install numpy scipy")
+    sys.exit(1)
+
+MAGIC = b'RGPH'
+VERSION = 1
+HEADER = struct.Struct('<4sHhIIIIdddd')
+HEADER_SIZE = HEADER.size  # 56
+
+# Earth radius in km (matches EARTH_RADIUS_KM in navigation.js)
+EARTH_RADIUS_KM = 6371
+
+# Neighbour order used by getNeighbors() in navigation.js
+DIRECTIONS = (
+    (-1, 0), (-1, 1), (0, 1), (1, 1),
+    (1, 0), (1, -1), (0, -1), (-1, -1)
+)
+
+# Turn penalties in km-equivalent cost (ROUTING_CONFIG.turnPenalty)
+TURN_PENALTY = {
+    'enabled': True,
+    'gentle': 0.05,      # < 30°
+    'moderate': 0.15,    # 30-60°
+    'sharp': 0.40,       # 60-90°
+    'verySharp': 0.80    # > 90°
+}
+
+# Shore clearance cost (ROUTING_CONFIG.shoreClearance): edges into water
+# closer than distance_m to land cost up to (1 + weight) times their length
+SHORE_CLEARANCE = {
+    'enabled': True,
+    'distance_m': 400,
+    'weight': 0.5
+}
+
+
+def haversine_km(lat1, lng1, lat2, lng2):
+    """Vectorized haversineDistance() from navigation.js"""
+    lat1, lng1, lat2, lng2 = (np.asarray(v, dtype=np.float64) for v in (lat1, lng1, lat2, lng2))
+    d_lat = np.radians(lat2 - lat1)
+    d_lng = np.radians(lng2 - lng1)
+    a = (np.sin(d_lat / 2) ** 2 +
+         np.cos(np.radians(lat1)) * np.cos(np.radians(lat2)) * np.sin(d_lng / 2) ** 2)
+    return EARTH_RADIUS_KM * 2 * np.arctan2(np.sqrt(a), np.sqrt(1 - a))
+
+
+def bearings(lat1, lng1, lat2, lng2):
+    """Vectorized calculateBearing(): initial bearings in degrees 0-360"""
+    d_lng = np.radians(lng2 - lng1)
+    lat1 = np.radians(lat1)
+    lat2 = np.radians(lat2)
+    y = np.sin(d_lng) * np.cos(lat2)
+    x = np.cos(lat1) * np.sin(lat2) - np.sin(lat1) * np.cos(lat2) * np.cos(d_lng)
+    return (np.degrees(np.arctan2(y, x)) + 360) % 360
+
+
+def turn_cost(turn_angle, penalties=TURN_PENALTY):
+    """calculateTurnCost(): km-equivalent penalty for a turn in degrees"""
+    if not penalties['enabled']:
+        return 0
+
+    angle = abs(turn_angle)
+    if angle < 30:
+        return penalties['gentle']
+    elif angle < 60:
+        return penalties['moderate']
+    elif angle < 90:
+        return penalties['sharp']
+    return penalties['verySharp']
+
+
+def clearance_factors(shore_distances_m, clearance=SHORE_CLEARANCE):
+    """
+    calculateClearanceFactor(): edge cost multiplier per shore distance
+
+    1 + weight * (1 - distance / distance_m) inside the clearance
+    distance, falling linearly to 1 at it; NaN (no field) counts as clear.
+    """
+    distances = np.asarray(shore_distances_m, dtype=np.float64)
+    if not clearance['enabled']:
+        return np.ones(distances.shape)
+
+    shortfall = np.clip(1 - distances / clearance['distance_m'], 0, 1)
+    return 1 + clearance['weight'] * np.nan_to_num(shortfall, nan=0.0)
+
+
+class RoutingGraph:
+    """
+    CSR water graph over a lattice
+
+    Arrays: lats, lngs, cells, depths_dm (per node), offsets (n + 1),
+    neighbors and lengths_km (per directed edge).
+    """
+
+    def __init__(self, lattice, lats, lngs, cells, offsets, neighbors, lengths_km, depths_dm):
+        self.lattice = lattice
+        self.lats = lats
+        self.lngs = lngs
+        self.cells = cells
+        self.offsets = offsets
+        self.neighbors = neighbors
+        self.lengths_km = lengths_km
+        self.depths_dm = depths_dm
+
+    @classmethod
+    def build(cls, lattice, water, depths_dm=None):
+        """
+        Graph over the water cells of a (rows, cols) mask
+
+        depths_dm holds depths in decimetres with negative values (or
+        NODATA) where there is no data; omit it for a depth-less graph.
+        """
+        water = np.asarray(water, dtype=bool)
+        rows, cols = water.shape
+        if (rows, cols) != (lattice.rows, lattice.cols):
+            raise ValueError(f"Water mask is {rows} x {cols} but lattice is {lattice.rows} x {lattice.cols}")
+
+        cells = np.flatnonzero(water)
+        node_of = np.full(water.size, -1, dtype=np.int64)
+        node_of[cells] = np.arange(len(cells))
+
+        node_rows, node_cols = np.divmod(cells, cols)
+        lat_axis, lng_axis = lattice.axes()
+        lats = np.round(lat_axis[node_rows], 6)
+        lngs = np.round(lng_axis[node_cols], 6)
+
+        sources = []
+        targets = []
+        directions = []
+        for direction, (dr, dc) in enumerate(DIRECTIONS):
+            r = node_rows + dr
+            c = node_cols + dc
+            inside = (r >= 0) & (r < rows) & (c >= 0) & (c < cols)
+            target = np.full(len(cells), -1, dtype=np.int64)
+            target[inside] = node_of[r[inside] * cols + c[inside]]
+            linked = np.flatnonzero(target >= 0)
+
+            sources.append(linked)
+            targets.append(target[linked])
+            directions.append(np.full(len(linked), direction))
+
+        sources = np.concatenate(sources)
+        targets = np.concatenate(targets)
+        order = np.lexsort((np.concatenate(directions), sources))
+        sources = sources[order]
+        targets = targets[order]
+
+        offsets = np.zeros(len(cells) + 1, dtype=np.uint32)
+        np.cumsum(np.bincount(sources, minlength=len(cells)), out=offsets[1:])
+
+        lengths = haversine_km(lats[sources], lngs[sources], lats[targets], lngs[targets])
+
+        if depths_dm is None:
+            node_depths = np.full(len(cells), NODATA, dtype=np.int16)
+        else:
+            values = np.asarray(depths_dm).ravel()[cells]
+            node_depths = np.where(values >= 0, values, NODATA).astype(np.int16)
+
+        return cls(lattice, lats, lngs, cells.astype(np.uint32), offsets,
+                   targets.astype(np.uint32), lengths.astype(np.float32), node_depths)
+
+    @classmethod
+    def load(cls, path):
+        with open(path, 'rb') as f:
+            data = f.read()
+
+        if len(data) < HEADER_SIZE:
+            raise ValueError(f"{path} is too short to be a routing graph")
+
+        (magic, version, nodata, rows, cols, n, m,
+         south, west, lat_step, lng_step) = HEADER.unpack_from(data)
+
+        if magic != MAGIC:
+            raise ValueError(f"{path} is not a routing graph (bad magic {magic!r})")
+        if version != VERSION:
+            raise ValueError(f"{path} has unsupported routing graph version {version}")
+
+        offset = HEADER_SIZE
+        arrays = []
+        for dtype, count in (('<f8', n), ('<f8', n), ('<u4', n), ('<u4', n + 1),
+                             ('<u4', m), ('<f4', m), ('<i2', n)):
+            arrays.append(np.frombuffer(data, dtype=dtype, count=count, offset=offset))
+            offset += np.dtype(dtype).itemsize * count
+
+        lats, lngs, cells, offsets, neighbors, lengths, depths = arrays
+        depths = np.where(depths == nodata, NODATA, depths).astype(np.int16)
+
+        return cls(GridLattice(south, west, lat_step, lng_step, rows, cols),
+                   lats, lngs, cells, offsets, neighbors, lengths, depths)
+
+    def save(self, path):
+        """Write the graph; returns the number of bytes written"""
+        lattice = self.lattice
+        header = HEADER.pack(MAGIC, VERSION, NODATA, lattice.rows, lattice.cols,
+                             self.node_count, self.edge_count,
+                             lattice.south, lattice.west, lattice.lat_step, lattice.lng_step)
+        arrays = (
+            self.lats.astype('<f8'), self.lngs.astype('<f8'), self.cells.astype('<u4'),
+            self.offsets.astype('<u4'), self.neighbors.astype('<u4'),
+            self.lengths_km.astype('<f4'), self.depths_dm.astype('<i2')
+        )
+
+        with open(path, 'wb') as f:
+            f.write(header)
+            for array in arrays:
+                f.write(array.tobytes())
+
+        return HEADER_SIZE + sum(array.nbytes for array in arrays)
+
+    @property
+    def node_count(self):
+        return len(self.cells)
+
+    @property
+    def edge_count(self):
+        return len(self.neighbors)
+
+    def edges(self, node):
+        """(neighbour nodes, lengths in km) of a node"""
+        start, end = self.offsets[node], self.offsets[node + 1]
+        return self.neighbors[start:end], self.lengths_km[start:end]
+
+    def edge_bearings(self):
+        """Initial bearing in degrees of every directed edge"""
+        sources = np.repeat(np.arange(self.node_count), np.diff(self.offsets.astype(np.int64)))
+        targets = self.neighbors.astype(np.int64)
+        return bearings(self.lats[sources], self.lngs[sources], self.lats[targets], self.lngs[targets])
+
+    def depth_m(self, node):
+        """Depth of a node in meters, or None where there is no data"""
+        value = int(self.depths_dm[node])
+        return None if value == NODATA else value / DEPTH_SCALE
+
+    def depths_hash(self):
+        """
+        32-bit FNV-1a hash of the node depths (little-endian int16 bytes)
+
+        Tables derived from the depths record it to detect a depth rebuild,
+        which keeps the node and edge counts; routingGraphDepthsHash() in
+        navigation.js computes the same value.
+        """
+        value = 0x811c9dc5
+        for byte in self.depths_dm.astype('<i2').tobytes():
+            value = ((value ^ byte) * 0x01000193) & 0xffffffff
+        return value
+
+    def node_of_cell(self):
+        """Int array over lattice cells: node index, or -1 for land"""
+        nodes = np.full(self.lattice.size, -1, dtype=np.int64)
+        nodes[self.cells] = np.arange(self.node_count)
+        return nodes
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Build the CSR routing graph')
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    build = subparsers.add_parser('build', help='Build the graph from the water boundary and depth grids')
+    build.add_argument('boundary_file', help='Water boundary GeoJSON file')
+    build.add_argument('output_file', help='Output graph .bin file')
+    build.add_argument('depth_grids', nargs='*', help='Binary depth grids, highest priority first')
+
+    info = subparsers.add_parser('info', help='Summarize a routing graph')
+    info.add_argument('graph_file')
+
+    args = parser.parse_args()
+
+    if args.command == 'build':
+        lattice = GRID_LATTICE
+        lats, lngs = lattice.axes()
+        water = rasterize_water_mask(args.boundary_file, lats, lngs)
+        depths_dm = lattice_depths(lattice, args.depth_grids)
+
+        graph = RoutingGraph.build(lattice, water, depths_dm)
+        Path(args.output_file).parent.mkdir(parents=True, exist_ok=True)
+        size = graph.save(args.output_file)
+
+        print(f"✓ Wrote routing graph to {args.output_file} ({size / 1024:.1f} KB)")
+        print(f"  Nodes: {graph.node_count:,}")
+        print(f"  Directed edges: {graph.edge_count:,}")
+
+    else:
+        graph = RoutingGraph.load(args.graph_file)
+        lattice = graph.lattice
+        degrees = np.diff(graph.offsets.astype(np.int64))
+        print(f"Routing graph: {args.graph_file}")
+        print(f"  Lattice: {lattice.rows} rows x {lattice.cols} cols")
+        print(f"  Nodes: {graph.node_count:,} ({int((graph.depths_dm != NODATA).sum()):,} with depth)")
+        print(f"  Directed edges: {graph.edge_count:,}")
+        print(f"  Degree: mean {degrees.mean():.2f}, isolated nodes {int((degrees == 0).sum()):,}")
+        print(f"  Edge length: {graph.lengths_km.min() * 1000:.0f} - {graph.lengths_km.max() * 1000:.0f} m")
+
+
+if __name__ == '__main__':
+    main()
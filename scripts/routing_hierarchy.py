@@ -0,0 +1,629 @@
+#!/usr/bin/env python3
+"""
+Hierarchical routing abstraction (HPA*) over the routing graph
+
+The routing lattice is cut into square clusters of CLUSTER_SIZE cells.
+Wherever navigable water crosses the border between two clusters, the
+crossing becomes one entrance (short openings) or two (long openings,
+one at each end), each a pair of graph nodes facing each other across
+the border. The abstract graph links
+
+    - the two nodes of every entrance (one graph edge), and
+    - every pair of entrance nodes of a cluster that are connected
+      inside it, with the cost and node path of the cheapest route
+      between them that stays in the cluster.
+
+Long routes are then planned on this small graph: the start and end
+are linked to the entrance nodes of their own clusters by a local
+search, A* runs over the abstract graph, and the cached paths are
+stitched into a full grid route. A final A* kept to the clusters that
+route passes through smooths out the turns the entrances force. The
+corridor cannot undo a poor choice of entrances, so routes shorter
+than HIERARCHY_MIN_DISTANCE_KM are searched flat: below it some routes
+came out 8-10% costlier than flat A*. Over 300 random pairs of water
+cells at least that far apart, hierarchical routes cost 0.5% more than
+flat A* on average and at most about 2.5% more (`bench`). Navigability
+depends on the vessel, so there is one file per minimum depth.
+
+    Header (32 bytes, little-endian)
+        0   4s   magic "HPAG"
+        4   H    format version (1)
+        6   H    minimum depth (decimetres)
+        8   H    cluster size (lattice cells)
+        10  2x   padding
+        12  I    graph nodes
+        16  I    graph directed edges
+        20  I    entrance nodes (e)
+        24  I    abstract edges (a)
+        28  I    path nodes (p)
+    Body, in order
+        <u4  e      graph node of each entrance node (ascending)
+        <u4  e + 1  offsets into the abstract edges per entrance node
+        <u4  a      abstract edge targets (entrance node indexes)
+        <f4  a      abstract edge costs in km with clearance and turn penalties
+        <u4  a + 1  offsets into the path nodes per abstract edge
+        <u4  p      graph nodes of each edge's path, both ends included
+
+Usage:
+    python routing_hierarchy.py build [--draft M ...] [--margin M] [--output-dir DIR]
+    python routing_hierarchy.py info <hierarchy.bin>
+    python routing_hierarchy.py bench [--draft M] [--pairs N] [--endpoints water|pois]
+"""
+
+import argparse
+import heapq
+import random
+import struct
+import sys
+import time
+from pathlib import Path
+
+try:
+    import numpy as np
+    from depth_grid_binary import DEPTH_SCALE
+    from routing_graph import turn_cost
+    from water_router import (DEFAULT_DRAFT_M, DEFAULT_DRAFTS_M, DEFAULT_GRAPH_FILE, DEFAULT_POI_FILE,
+                              DEFAULT_SAFETY_MARGIN_M, REPO_ROOT, WaterRouter, haversine,
+                              load_pois, minimum_depth_decimetres, run_js_benchmark,
+                              summarize_latency, time_routes)
+except ImportError as e:
+    print(f"Missing dependency: {e}")
+    print("\nInstall required packages:")
+    print("pip install numpy scipy")
+    sys.exit(1)
+
+MAGIC = b'HPAG'
+VERSION = 1
+HEADER = struct.Struct('<4sHHH2xIIIII')
+HEADER_SIZE = HEADER.size  # 32
+
+DEFAULT_OUTPUT_DIR = REPO_ROOT / 'data' / 'routing'
+HIERARCHY_FILE = 'lake-champlain-hierarchy-{:02d}dm.bin'
+
+# Cluster edge in lattice cells (16 cells is about 3 km)
+CLUSTER_SIZE = 16
+
+# Border openings at least this many cells long get an entrance at each end
+LONG_ENTRANCE_CELLS = 6
+
+# Routes shorter than this (straight line, km) are searched flat; the
+# worst-case cost excess grows quickly below it
+HIERARCHY_MIN_DISTANCE_KM = 80
+
+
+def local_search(router, source, members, targets=None):
+    """
+    Cheapest paths from source that stay within members
+
+    Turn-aware Dijkstra with the same cost model and tie-breaking as
+    WaterRouter._search(). Stops once every node in targets (if given)
+    is settled. Returns ({node: cost}, {node: previous node}) for the
+    settled nodes.
+    """
+    offsets, neighbors, edge_costs = router.offsets, router.neighbors, router.edge_costs
+    edge_bearings = router.edge_bearings
+    navigable = router.navigable
+    penalties = router.turn_penalty
+    turns = penalties['enabled']
+
+    g_score = {source: 0.0}
+    came_from = {source: -1}
+    came_by = {source: -1}
+    order = {source: 0}
+    settled = {}
+    remaining = set(targets) if targets is not None else None
+    heap = [(0.0, 0, source)]
+
+    while heap:
+        g, _, current = heapq.heappop(heap)
+        if current in settled or g != g_score[current]:
+            continue  # Stale heap entry
+
+        settled[current] = g
+        if remaining is not None:
+            remaining.discard(current)
+            if not remaining:
+                break
+
+        arrived = came_by[current]
+        for edge in range(offsets[current], offsets[current + 1]):
+            neighbor = neighbors[edge]
+            if neighbor in settled or neighbor not in members or not navigable[neighbor]:
+                continue
+
+            tentative = g + edge_costs[edge]
+            if turns and arrived >= 0:
+                angle = abs(edge_bearings[edge] - edge_bearings[arrived])
+                if angle > 180:
+                    angle = 360 - angle
+                tentative += turn_cost(angle, penalties)
+
+            if tentative < g_score.get(neighbor, float('inf')):
+                g_score[neighbor] = tentative
+                came_from[neighbor] = current
+                came_by[neighbor] = edge
+                if neighbor not in order:
+                    order[neighbor] = len(order)
+                heapq.heappush(heap, (tentative, order[neighbor], neighbor))
+
+    return settled, {node: came_from[node] for node in settled}
+
+
+def junction_cost(router, incoming, outgoing):
+    """Turn penalty where the node path outgoing continues incoming"""
+    if not router.turn_penalty['enabled'] or len(incoming) < 2 or len(outgoing) < 2:
+        return 0.0
+
+    angle = abs(edge_bearing(router, outgoing[0], outgoing[1]) -
+                edge_bearing(router, incoming[-2], incoming[-1]))
+    if angle > 180:
+        angle = 360 - angle
+    return turn_cost(angle, router.turn_penalty)
+
+
+def edge_bearing(router, source, target):
+    """Bearing of the graph edge source -> target"""
+    start = router.offsets[source]
+    edge = start + router.neighbors[start:router.offsets[source + 1]].index(target)
+    return router.edge_bearings[edge]
+
+
+def trace_path(came_from, node):
+    """Node path from a local_search() source to node"""
+    path = [node]
+    while came_from[path[-1]] >= 0:
+        path.append(came_from[path[-1]])
+    path.reverse()
+    return path
+
+
+def node_clusters(graph, cluster_size):
+    """Cluster id of every graph node (row-major over clusters)"""
+    cols = graph.lattice.cols
+    cluster_cols = -(-cols // cluster_size)
+    rows, columns = np.divmod(graph.cells.astype(np.int64), cols)
+    return (rows // cluster_size) * cluster_cols + columns // cluster_size
+
+
+def find_entrances(router, cluster_size=CLUSTER_SIZE):
+    """
+    Entrance node pairs across cluster borders
+
+    Returns a list of (node, node) pairs, each a navigable graph node
+    and its straight neighbour in the adjacent cluster.
+    """
+    graph = router.graph
+    lattice = graph.lattice
+    node_of_cell = graph.node_of_cell().reshape(lattice.rows, lattice.cols)
+    navigable = np.zeros(lattice.size, dtype=bool)
+    navigable[graph.cells[router.navigable_mask].astype(np.int64)] = True
+    navigable = navigable.reshape(lattice.rows, lattice.cols)
+
+    pairs = []
+
+    def add_openings(open_along, first_cells, second_cells):
+        """Entrances along one border from a boolean run of open crossings"""
+        run_start = None
+        for k in range(len(open_along) + 1):
+            is_open = k < len(open_along) and open_along[k]
+            if is_open and run_start is None:
+                run_start = k
+            elif not is_open and run_start is not None:
+                length = k - run_start
+                picks = ((run_start, k - 1) if length >= LONG_ENTRANCE_CELLS
+                         else (run_start + (length - 1) // 2,))
+                for pick in picks:
+                    pairs.append((int(node_of_cell[first_cells[pick]]),
+                                  int(node_of_cell[second_cells[pick]])))
+                run_start = None
+
+    # Borders between cluster rows, split where cluster columns change
+    for row in range(cluster_size, lattice.rows, cluster_size):
+        for col_start in range(0, lattice.cols, cluster_size):
+            cols = np.arange(col_start, min(col_start + cluster_size, lattice.cols))
+            open_along = navigable[row - 1, cols] & navigable[row, cols]
+            add_openings(open_along, [(row - 1, c) for c in cols], [(row, c) for c in cols])
+
+    # Borders between cluster columns, split where cluster rows change
+    for col in range(cluster_size, lattice.cols, cluster_size):
+        for row_start in range(0, lattice.rows, cluster_size):
+            rows = np.arange(row_start, min(row_start + cluster_size, lattice.rows))
+            open_along = navigable[rows, col - 1] & navigable[rows, col]
+            add_openings(open_along, [(r, col - 1) for r in rows], [(r, col) for r in rows])
+
+    return pairs
+
+
+class RouteHierarchy:
+    """
+    Abstract graph over cluster entrances for one minimum depth
+
+    Entrance nodes are indexed 0..e-1; edges(k) yields (target index,
+    cost, path) for entrance node k.
+    """
+
+    def __init__(self, minimum_depth_dm, cluster_size, node_count, edge_count,
+                 entrances, offsets, targets, costs, path_offsets, path_nodes):
+        self.minimum_depth_dm = minimum_depth_dm
+        self.cluster_size = cluster_size
+        self.node_count = node_count
+        self.edge_count = edge_count
+        self.entrances = entrances
+        self.offsets = offsets
+        self.targets = targets
+        self.costs = costs
+        self.path_offsets = path_offsets
+        self.path_nodes = path_nodes
+        self._index()
+
+    def _index(self):
+        """Python-side lookups used by the search"""
+        self.entrance_index = {int(node): k for k, node in enumerate(self.entrances)}
+        self._offsets = self.offsets.tolist()
+        self._targets = self.targets.tolist()
+        self._costs = self.costs.astype(np.float64).tolist()
+        self._path_offsets = self.path_offsets.tolist()
+        self._path_nodes = self.path_nodes.tolist()
+
+    @classmethod
+    def build(cls, router, cluster_size=CLUSTER_SIZE):
+        graph = router.graph
+        clusters = node_clusters(graph, cluster_size)
+        pairs = find_entrances(router, cluster_size)
+
+        entrances = sorted({node for pair in pairs for node in pair})
+        index = {node: k for k, node in enumerate(entrances)}
+        edges = [[] for _ in entrances]
+
+        for a, b in pairs:
+            edges[index[a]].append((index[b], router.path_cost([a, b]), [a, b]))
+            edges[index[b]].append((index[a], router.path_cost([b, a]), [b, a]))
+
+        by_cluster = {}
+        for node in entrances:
+            by_cluster.setdefault(int(clusters[node]), []).append(node)
+
+        navigable_nodes = np.flatnonzero(router.navigable_mask)
+        members_of = {}
+        for node, cluster in zip(navigable_nodes.tolist(), clusters[navigable_nodes].tolist()):
+            members_of.setdefault(cluster, set()).add(node)
+
+        for cluster, nodes in by_cluster.items():
+            members = members_of[cluster]
+            for source in nodes:
+                others = [node for node in nodes if node != source]
+                settled, came_from = local_search(router, source, members, others)
+                for target in others:
+                    if target in settled:
+                        edges[index[source]].append((index[target], settled[target],
+                                                     trace_path(came_from, target)))
+
+        offsets = np.zeros(len(entrances) + 1, dtype=np.uint32)
+        np.cumsum([len(edge_list) for edge_list in edges], out=offsets[1:])
+        flat = [edge for edge_list in edges for edge in edge_list]
+        path_offsets = np.zeros(len(flat) + 1, dtype=np.uint32)
+        np.cumsum([len(path) for _, _, path in flat], out=path_offsets[1:])
+
+        return cls(minimum_depth_decimetres(router.draft_m, router.margin_m), cluster_size,
+                   graph.node_count, graph.edge_count,
+                   np.array(entrances, dtype=np.uint32), offsets,
+                   np.array([target for target, _, _ in flat], dtype=np.uint32),
+                   np.array([cost for _, cost, _ in flat], dtype=np.float32),
+                   path_offsets,
+                   np.array([node for _, _, path in flat for node in path], dtype=np.uint32))
+
+    @classmethod
+    def load(cls, path):
+        with open(path, 'rb') as f:
+            data = f.read()
+
+        if len(data) < HEADER_SIZE:
+            raise ValueError(f"{path} is too short to be a routing hierarchy")
+
+        (magic, version, minimum_depth_dm, cluster_size,
+         n, m, e, a, p) = HEADER.unpack_from(data)
+
+        if magic != MAGIC:
+            raise ValueError(f"{path} is not a routing hierarchy (bad magic {magic!r})")
+        if version != VERSION:
+            raise ValueError(f"{path} has unsupported routing hierarchy version {version}")
+
+        offset = HEADER_SIZE
+        arrays = []
+        for dtype, count in (('<u4', e), ('<u4', e + 1), ('<u4', a), ('<f4', a),
+                             ('<u4', a + 1), ('<u4', p)):
+            arrays.append(np.frombuffer(data, dtype=dtype, count=count, offset=offset))
+            offset += np.dtype(dtype).itemsize * count
+
+        return cls(minimum_depth_dm, cluster_size, n, m, *arrays)
+
+    def save(self, path):
+        """Write the hierarchy; returns the number of bytes written"""
+        header = HEADER.pack(MAGIC, VERSION, self.minimum_depth_dm, self.cluster_size,
+                             self.node_count, self.edge_count, len(self.entrances),
+                             len(self.targets), len(self.path_nodes))
+        arrays = (
+            self.entrances.astype('<u4'), self.offsets.astype('<u4'), self.targets.astype('<u4'),
+            self.costs.astype('<f4'), self.path_offsets.astype('<u4'), self.path_nodes.astype('<u4')
+        )
+
+        with open(path, 'wb') as f:
+            f.write(header)
+            for array in arrays:
+                f.write(array.tobytes())
+
+        return HEADER_SIZE + sum(array.nbytes for array in arrays)
+
+    def matches(self, router):
+        """Whether the hierarchy fits the router's graph and vessel"""
+        return (self.node_count == router.graph.node_count and
+                self.edge_count == router.graph.edge_count and
+                self.minimum_depth_dm == minimum_depth_decimetres(router.draft_m, router.margin_m))
+
+    def edges(self, k):
+        """(target entrance index, cost, node path) for entrance node k"""
+        for edge in range(self._offsets[k], self._offsets[k + 1]):
+            path = self._path_nodes[self._path_offsets[edge]:self._path_offsets[edge + 1]]
+            yield self._targets[edge], self._costs[edge], path
+
+    def search(self, router, start, end, clusters):
+        """
+        Stitched node path from start to end, or None
+
+        The start and end are linked to the entrance nodes of their
+        clusters by local searches; A* over the abstract graph then
+        picks the entrances, and cached paths fill in the route. Turns
+        where one cached path joins the next are charged as the search
+        goes, from the path each entrance was reached by.
+        Returns (nodes, abstract nodes expanded).
+        """
+        start_cluster, end_cluster = clusters[start], clusters[end]
+        members = router.cluster_members
+
+        settled, came_from = local_search(router, start, members[start_cluster])
+        exits = [(self.entrance_index[node], cost, trace_path(came_from, node))
+                 for node, cost in settled.items() if node in self.entrance_index]
+
+        settled, came_from = local_search(router, end, members[end_cluster])
+        arrivals = {self.entrance_index[node]: (cost, trace_path(came_from, node)[::-1])
+                    for node, cost in settled.items() if node in self.entrance_index}
+
+        if not exits or not arrivals:
+            return None
+
+        # Abstract nodes: entrances 0..e-1, then the start (e) and end (e + 1)
+        e = len(self.entrances)
+        source, target = e, e + 1
+        bounds = router.heuristic(end)
+        bounds = bounds[self.entrances].tolist() + [float(bounds[start]), 0.0]
+
+        def heuristic(k):
+            return bounds[k]
+
+        g_score = {source: 0.0}
+        came_by = {source: None}
+        order = {source: 0}
+        closed = set()
+        heap = [(heuristic(source), 0, source)]
+        expanded = 0
+
+        while heap:
+            f, _, current = heapq.heappop(heap)
+            if current in closed or f != g_score[current] + heuristic(current):
+                continue  # Stale heap entry
+
+            if current == target:
+                segments = []
+                while came_by[current] is not None:
+                    current, path = came_by[current]
+                    segments.append(path)
+                nodes = []
+                for path in reversed(segments):
+                    nodes.extend(path[1:] if nodes else path)
+                return nodes, expanded
+
+            closed.add(current)
+            expanded += 1
+
+            if current == source:
+                links = exits
+            else:
+                links = list(self.edges(current))
+                if current in arrivals:
+                    cost, path = arrivals[current]
+                    links.append((target, cost, path))
+
+            incoming = came_by[current][1] if came_by[current] is not None else ()
+            for neighbor, cost, path in links:
+                if neighbor in closed:
+                    continue
+                tentative = g_score[current] + cost + junction_cost(router, incoming, path)
+                if tentative < g_score.get(neighbor, float('inf')):
+                    g_score[neighbor] = tentative
+                    came_by[neighbor] = (current, path)
+                    if neighbor not in order:
+                        order[neighbor] = len(order)
+                    heapq.heappush(heap, (tentative + heuristic(neighbor), order[neighbor], neighbor))
+
+        return None
+
+
+class HierarchicalRouter(WaterRouter):
+    """
+    WaterRouter that plans long routes on a RouteHierarchy
+
+    The stitched abstract route is refined by A* kept to the clusters it
+    passes through, which irons out the turns forced at entrances.
+    Hierarchy files are looked up per minimum depth in hierarchy_dir;
+    without one for the current vessel, or when the abstract search finds
+    nothing, routes fall back to flat A*.
+    """
+
+    def __init__(self, graph=None, draft_m=DEFAULT_DRAFT_M, margin_m=DEFAULT_SAFETY_MARGIN_M,
+                 hierarchy_dir=DEFAULT_OUTPUT_DIR, **kwargs):
+        self.hierarchy_dir = Path(hierarchy_dir)
+        self.hierarchy = None
+        super().__init__(graph, draft_m, margin_m, **kwargs)
+
+    def set_vessel(self, draft_m, margin_m=DEFAULT_SAFETY_MARGIN_M):
+        super().set_vessel(draft_m, margin_m)
+
+        hierarchy_file = self.hierarchy_dir / HIERARCHY_FILE.format(minimum_depth_decimetres(draft_m, margin_m))
+        self.hierarchy = RouteHierarchy.load(hierarchy_file) if hierarchy_file.exists() else None
+        if self.hierarchy is not None and not self.hierarchy.matches(self):
+            print(f"Warning: {hierarchy_file} was built for another routing graph - ignoring it")
+            self.hierarchy = None
+
+        if self.hierarchy is not None:
+            self.cluster_array = node_clusters(self.graph, self.hierarchy.cluster_size)
+            self.clusters = self.cluster_array.tolist()
+            self.cluster_members = {}
+            for node in np.flatnonzero(self.navigable_mask).tolist():
+                self.cluster_members.setdefault(self.clusters[node], set()).add(node)
+
+    def _search(self, start, end):
+        if (self.hierarchy is None or self.clusters[start] == self.clusters[end] or
+                haversine(self.lats[start], self.lngs[start], self.lats[end], self.lngs[end])
+                < HIERARCHY_MIN_DISTANCE_KM):
+            return super()._search(start, end)
+
+        found = self.hierarchy.search(self, start, end, self.clusters)
+        if found is None:
+            return super()._search(start, end)
+
+        nodes, expanded = found
+        refined = super()._search(start, end, self.corridor(nodes))
+        if refined is None:
+            return nodes, expanded, self.path_cost(nodes)
+
+        path, refine_expanded, cost = refined
+        return path, expanded + refine_expanded, cost
+
+    def corridor(self, nodes):
+        """Navigable list limited to the clusters a node path passes through"""
+        touched = np.fromiter({self.clusters[node] for node in nodes}, dtype=np.int64)
+        return (np.isin(self.cluster_array, touched) & self.navigable_mask).tolist()
+
+
+def benchmark(draft_m, margin_m, n_pairs, seed, graph_file, poi_file, hierarchy_dir, endpoints='water'):
+    """
+    Compare hierarchical and flat routes between random long-haul pairs
+    of navigable water cells (endpoints='water') or of POIs ('pois')
+    """
+    flat = WaterRouter(graph_file, draft_m, margin_m)
+    hierarchical = HierarchicalRouter(flat.graph, draft_m, margin_m, hierarchy_dir=hierarchy_dir)
+    if hierarchical.hierarchy is None:
+        print(f"No routing hierarchy for minimum depth {draft_m + margin_m:.1f} m in {hierarchy_dir}")
+        sys.exit(1)
+
+    if endpoints == 'pois':
+        points = [(poi['lat'], poi['lng']) for _, poi in sorted(load_pois(poi_file).items())]
+    else:
+        points = [(flat.lats[node], flat.lngs[node]) for node in np.flatnonzero(flat.navigable_mask).tolist()]
+
+    rng = random.Random(seed)
+    pairs = []
+    for _ in range(n_pairs * 50):
+        if len(pairs) == n_pairs:
+            break
+        a, b = rng.sample(points, 2)
+        if haversine(*a, *b) >= HIERARCHY_MIN_DISTANCE_KM:
+            pairs.append([*a, *b])
+
+    label = 'POI' if endpoints == 'pois' else 'water cell'
+    print(f"Comparing hierarchical and flat routes for {len(pairs)} long-haul {label} pairs "
+          f"(draft {draft_m} m + margin {margin_m} m)...")
+
+    flat_results = time_routes(flat, pairs)
+    results = time_routes(hierarchical, pairs)
+    summarize_latency("Flat A*", [r['ms'] for r in flat_results])
+    summarize_latency("Hierarchical", [r['ms'] for r in results])
+
+    routed = [(f, r) for f, r in zip(flat_results, results) if f['nodes'] and r['nodes']]
+    if not routed:
+        print("  No long-haul routes found")
+        return
+
+    expanded = sum(r['expanded'] for _, r in routed) / sum(f['expanded'] for f, _ in routed)
+    excess = np.array([flat.path_cost(r['nodes']) / flat.path_cost(f['nodes']) - 1 for f, r in routed])
+    print(f"  Nodes expanded vs flat A*: {expanded:.0%}")
+    print(f"  Cost vs flat A*: mean {excess.mean():+.2%}, worst {excess.max():+.2%}")
+
+    js_results = run_js_benchmark(pairs, draft_m, margin_m, hierarchy=True)
+    if js_results is None:
+        return
+
+    summarize_latency("JavaScript (hierarchical)", [r['ms'] for r in js_results])
+    same_path = sum(1 for py, js in zip(results, js_results) if py['nodes'] == js['nodes'])
+    print(f"  Identical paths: {same_path} of {len(pairs)}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Build the hierarchical routing abstraction')
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    build = subparsers.add_parser('build', help='Build hierarchies for a set of drafts')
+    build.add_argument('--draft', type=float, action='append', dest='drafts',
+                       help=f'Vessel draft in meters, repeatable (default: {", ".join(map(str, DEFAULT_DRAFTS_M))})')
+    build.add_argument('--margin', type=float, default=DEFAULT_SAFETY_MARGIN_M,
+                       help=f'Safety margin in meters (default: {DEFAULT_SAFETY_MARGIN_M})')
+    build.add_argument('--graph', default=str(DEFAULT_GRAPH_FILE), help='Routing graph .bin file')
+    build.add_argument('--output-dir', default=str(DEFAULT_OUTPUT_DIR),
+                       help=f'Directory for hierarchy files (default: {DEFAULT_OUTPUT_DIR})')
+    build.add_argument('--cluster-size', type=int, default=CLUSTER_SIZE,
+                       help=f'Cluster edge in lattice cells (default: {CLUSTER_SIZE})')
+
+    info = subparsers.add_parser('info', help='Summarize a hierarchy file')
+    info.add_argument('hierarchy_file')
+
+    bench = subparsers.add_parser('bench', help='Compare hierarchical and flat routing')
+    bench.add_argument('--draft', type=float, default=DEFAULT_DRAFT_M,
+                       help=f'Vessel draft in meters (default: {DEFAULT_DRAFT_M})')
+    bench.add_argument('--margin', type=float, default=DEFAULT_SAFETY_MARGIN_M,
+                       help=f'Safety margin in meters (default: {DEFAULT_SAFETY_MARGIN_M})')
+    bench.add_argument('--pairs', type=int, default=100, help='Number of route pairs (default: 100)')
+    bench.add_argument('--seed', type=int, default=0, help='Random seed for route pairs (default: 0)')
+    bench.add_argument('--endpoints', choices=('water', 'pois'), default='water',
+                       help='Route between random navigable cells or random POIs (default: water)')
+    bench.add_argument('--graph', default=str(DEFAULT_GRAPH_FILE), help='Routing graph .bin file')
+    bench.add_argument('--pois', default=str(DEFAULT_POI_FILE), help='POI JSON file')
+    bench.add_argument('--hierarchy-dir', default=str(DEFAULT_OUTPUT_DIR),
+                       help=f'Directory of hierarchy files (default: {DEFAULT_OUTPUT_DIR})')
+
+    args = parser.parse_args()
+
+    if args.command == 'build':
+        router = WaterRouter(args.graph, landmarks=None)
+        output_dir = Path(args.output_dir)
+        output_dir.mkdir(parents=True, exist_ok=True)
+
+        for draft in args.drafts or DEFAULT_DRAFTS_M:
+            router.set_vessel(draft, args.margin)
+            started = time.perf_counter()
+            hierarchy = RouteHierarchy.build(router, args.cluster_size)
+            output_file = output_dir / HIERARCHY_FILE.format(hierarchy.minimum_depth_dm)
+            size = hierarchy.save(output_file)
+
+            print(f"✓ Wrote {output_file} ({size / 1024:.1f} KB) for draft {draft} m "
+                  f"(minimum depth {hierarchy.minimum_depth_dm / DEPTH_SCALE:.1f} m)")
+            print(f"  Entrance nodes: {len(hierarchy.entrances):,}, abstract edges: {len(hierarchy.targets):,}")
+            print(f"  Built in {time.perf_counter() - started:.1f}s")
+
+    elif args.command == 'info':
+        hierarchy = RouteHierarchy.load(args.hierarchy_file)
+        path_lengths = np.diff(hierarchy.path_offsets.astype(np.int64))
+        print(f"Routing hierarchy: {args.hierarchy_file}")
+        print(f"  Minimum depth: {hierarchy.minimum_depth_dm / DEPTH_SCALE:.1f} m")
+        print(f"  Cluster size: {hierarchy.cluster_size} cells")
+        print(f"  Graph: {hierarchy.node_count:,} nodes, {hierarchy.edge_count:,} directed edges")
+        print(f"  Entrance nodes: {len(hierarchy.entrances):,}")
+        print(f"  Abstract edges: {len(hierarchy.targets):,} "
+              f"(mean cached path {path_lengths.mean():.1f} nodes)")
+
+    else:
+        benchmark(args.draft, args.margin, args.pairs, args.seed, args.graph, args.pois,
+                  args.hierarchy_dir, args.endpoints)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,305 @@
+#!/usr/bin/env python3
+"""
+Landmark distance tables for the ALT (A*, landmarks, triangle
+inequality) routing heuristic
+
+A handful of landmark nodes are spread across the routing graph by
+farthest-point selection, and a Dijkstra search from each records the
+cost of reaching every node. For any landmark L the triangle inequality
+gives a lower bound on the remaining cost from v to the target t that,
+unlike the straight-line haversine bound, knows about islands and
+peninsulas.
+
+Costs include the router's turn penalties (ROUTING_CONFIG.turnPenalty),
+which make up a large share of real route costs; the searches run over
+directed edges so each turn can be charged. Joining two paths at v adds
+at most one turn, so the bound is
+
+    cost(v, t) >= |d(L, t) - d(L, v)| - largest turn penalty
+
+Costs are measured on the full water graph, so the bound stays
+admissible for every draft (shallow cells only ever lengthen routes)
+and for any router whose turn penalties are at least the table's.
+
+Distances are stored as whole DISTANCE_UNIT_KM units rounded down,
+capped below the sentinel, and readers subtract one unit from the
+difference so that rounding never overestimates.
+
+    Header (56 bytes, little-endian)
+        0   4s   magic "ALTL"
+        4   H    format version (1)
+        6   H    landmarks (k)
+        8   I    graph nodes (n)
+        12  I    graph directed edges (m)
+        16  d    distance unit (km)
+        24  d    gentle turn penalty (km, < 30°)
+        32  d    moderate turn penalty (km, 30-60°)
+        40  d    sharp turn penalty (km, 60-90°)
+        48  d    very sharp turn penalty (km, > 90°)
+    Body, in order
+        <u4  k      landmark node indexes
+        <u2  k * n  cost from each landmark to each node, landmark
+                    major (65535: unreachable)
+
+Usage:
+    python routing_landmarks.py build <graph.bin> <output.bin> [--landmarks K]
+    python routing_landmarks.py info <landmarks.bin>
+"""
+
+import argparse
+import struct
+import sys
+from pathlib import Path
+
+try:
+    import numpy as np
+    from scipy.sparse import csr_matrix
+    from scipy.sparse.csgraph import connected_components, dijkstra
+    from routing_graph import TURN_PENALTY, RoutingGraph
+except ImportError as e:
+    print(f"Missing dependency: {e}")
+    print("\nInstall required packages:")
+    print("pip install numpy scipy")
+    sys.exit(1)
+
+MAGIC = b'ALTL'
+VERSION = 1
+HEADER = struct.Struct('<4sHHIIddddd')
+HEADER_SIZE = HEADER.size  # 56
+
+# Stored distance resolution (km): 10 m units reach 655 km in a uint16
+DISTANCE_UNIT_KM = 0.01
+UNREACHABLE = 0xFFFF
+
+# Beyond about 8 landmarks each extra one saves few expansions
+DEFAULT_LANDMARKS = 8
+
+PENALTY_KEYS = ('gentle', 'moderate', 'sharp', 'verySharp')
+
+
+class CostSearch:
+    """
+    Single-source costs over the routing graph, optionally turn-aware
+
+    With turn penalties the search runs on directed edges: moving from
+    edge (u, v) to edge (v, w) costs the length of (v, w) plus the turn
+    penalty at v, matching the router's cost model.
+    """
+
+    def __init__(self, graph, penalties=TURN_PENALTY):
+        self.graph = graph
+        self.penalties = penalties
+        n, m = graph.node_count, graph.edge_count
+        offsets = graph.offsets.astype(np.int64)
+        self.targets = graph.neighbors.astype(np.int64)
+        self.lengths = graph.lengths_km.astype(np.float64)
+
+        if not penalties['enabled']:
+            self.matrix = csr_matrix((self.lengths, self.targets, offsets), shape=(n, n))
+            return
+
+        # One transition per (incoming edge, outgoing edge) pair at each node
+        fan_out = np.diff(offsets)[self.targets]
+        incoming = np.repeat(np.arange(m), fan_out)
+        group_start = np.repeat(np.cumsum(fan_out) - fan_out, fan_out)
+        outgoing = np.repeat(offsets[self.targets], fan_out) + np.arange(len(incoming)) - group_start
+
+        edge_bearings = graph.edge_bearings()
+        angles = np.abs(edge_bearings[outgoing] - edge_bearings[incoming])
+        angles = np.where(angles > 180, 360 - angles, angles)
+        turns = np.select([angles < 30, angles < 60, angles < 90],
+                          [penalties['gentle'], penalties['moderate'], penalties['sharp']],
+                          penalties['verySharp'])
+
+        self.transitions = (incoming, outgoing, self.lengths[outgoing] + turns)
+        self.offsets = offsets
+
+    def costs_from(self, source):
+        """Cost (km) from source to every node; inf where unreachable"""
+        if not self.penalties['enabled']:
+            return dijkstra(self.matrix, indices=source)
+
+        # A virtual state m starts the search along each edge out of source
+        m = self.graph.edge_count
+        first = np.arange(self.offsets[source], self.offsets[source + 1])
+        incoming, outgoing, costs = self.transitions
+        matrix = csr_matrix((np.concatenate([costs, self.lengths[first]]),
+                             (np.concatenate([incoming, np.full(len(first), m)]),
+                              np.concatenate([outgoing, first]))),
+                            shape=(m + 1, m + 1))
+        edge_costs = dijkstra(matrix, indices=m)[:m]
+
+        node_costs = np.full(self.graph.node_count, np.inf)
+        np.minimum.at(node_costs, self.targets, edge_costs)
+        node_costs[source] = 0
+        return node_costs
+
+
+def select_landmarks(search, count):
+    """
+    Farthest-point landmark selection
+
+    The first landmark is the node farthest from the first node of the
+    largest component; each next one maximizes the cost to its nearest
+    chosen landmark. Returns (landmarks, costs) with one cost row per
+    landmark.
+    """
+    graph = search.graph
+    adjacency = csr_matrix((np.ones(graph.edge_count, dtype=np.int8),
+                            graph.neighbors.astype(np.int64), graph.offsets.astype(np.int64)),
+                           shape=(graph.node_count, graph.node_count))
+    labels = connected_components(adjacency, directed=False)[1]
+    seed = int(np.flatnonzero(labels == np.argmax(np.bincount(labels)))[0])
+
+    from_seed = search.costs_from(seed)
+    landmarks = [int(np.argmax(np.where(np.isfinite(from_seed), from_seed, -1)))]
+    rows = [search.costs_from(landmarks[0])]
+    nearest = rows[0].copy()
+
+    while len(landmarks) < count:
+        candidate = int(np.argmax(np.where(np.isfinite(nearest), nearest, -1)))
+        if nearest[candidate] <= 0:
+            break  # Every reachable node is already a landmark
+        landmarks.append(candidate)
+        rows.append(search.costs_from(candidate))
+        nearest = np.minimum(nearest, rows[-1])
+
+    return np.array(landmarks, dtype=np.uint32), np.vstack(rows)
+
+
+def quantize(costs_km):
+    """uint16 distance units, rounded down and capped below UNREACHABLE"""
+    units = np.floor(np.where(np.isfinite(costs_km), costs_km, 0) / DISTANCE_UNIT_KM)
+    units = np.minimum(units, UNREACHABLE - 1).astype(np.uint16)
+    units[~np.isfinite(costs_km)] = UNREACHABLE
+    return units
+
+
+class LandmarkTable:
+    """
+    Landmark nodes and their (k, n) quantized costs to every node
+
+    penalties holds the turn penalties the costs include (all zero for
+    plain distances).
+    """
+
+    def __init__(self, landmarks, units, edge_count, penalties, unit_km=DISTANCE_UNIT_KM):
+        self.landmarks = landmarks
+        self.units = units
+        self.edge_count = edge_count
+        self.penalties = penalties
+        self.unit_km = unit_km
+
+    @classmethod
+    def build(cls, graph, count=DEFAULT_LANDMARKS, penalties=TURN_PENALTY):
+        landmarks, costs = select_landmarks(CostSearch(graph, penalties), count)
+        table_penalties = {key: penalties[key] if penalties['enabled'] else 0.0 for key in PENALTY_KEYS}
+        return cls(landmarks, quantize(costs), graph.edge_count, table_penalties)
+
+    @classmethod
+    def load(cls, path):
+        with open(path, 'rb') as f:
+            data = f.read()
+
+        if len(data) < HEADER_SIZE:
+            raise ValueError(f"{path} is too short to be a landmark table")
+
+        magic, version, k, n, m, unit_km, *penalties = HEADER.unpack_from(data)
+
+        if magic != MAGIC:
+            raise ValueError(f"{path} is not a landmark table (bad magic {magic!r})")
+        if version != VERSION:
+            raise ValueError(f"{path} has unsupported landmark table version {version}")
+
+        landmarks = np.frombuffer(data, dtype='<u4', count=k, offset=HEADER_SIZE)
+        units = np.frombuffer(data, dtype='<u2', count=k * n, offset=HEADER_SIZE + 4 * k)
+        return cls(landmarks, units.reshape(k, n), m, dict(zip(PENALTY_KEYS, penalties)), unit_km)
+
+    def save(self, path):
+        """Write the table; returns the number of bytes written"""
+        header = HEADER.pack(MAGIC, VERSION, len(self.landmarks), self.node_count, self.edge_count,
+                             self.unit_km, *(self.penalties[key] for key in PENALTY_KEYS))
+        arrays = (self.landmarks.astype('<u4'), self.units.astype('<u2'))
+
+        with open(path, 'wb') as f:
+            f.write(header)
+            for array in arrays:
+                f.write(array.tobytes())
+
+        return HEADER_SIZE + sum(array.nbytes for array in arrays)
+
+    @property
+    def node_count(self):
+        return self.units.shape[1]
+
+    def matches(self, graph):
+        """Whether the table was built for this graph"""
+        return self.node_count == graph.node_count and self.edge_count == graph.edge_count
+
+    def admissible_for(self, penalties):
+        """Whether bounds hold for a router with these turn penalties"""
+        if not any(self.penalties.values()):
+            return True
+        return penalties['enabled'] and all(penalties[key] >= self.penalties[key] for key in PENALTY_KEYS)
+
+    def lower_bounds(self, target):
+        """
+        Lower bound on the cost (km) from every node to target
+
+        Landmarks that cannot reach the target or a node add nothing
+        for that node.
+        """
+        units = self.units.astype(np.int32)
+        to_target = units[:, target][:, None]
+        usable = (units != UNREACHABLE) & (to_target != UNREACHABLE)
+        differences = np.where(usable, np.abs(to_target - units) - 1, 0).max(axis=0)
+        return np.maximum(differences * self.unit_km - max(self.penalties.values()), 0)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Build ALT landmark cost tables')
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    build = subparsers.add_parser('build', help='Select landmarks and tabulate their costs')
+    build.add_argument('graph_file', help='Routing graph .bin file')
+    build.add_argument('output_file', help='Output landmark table .bin file')
+    build.add_argument('--landmarks', type=int, default=DEFAULT_LANDMARKS,
+                       help=f'Number of landmarks (default: {DEFAULT_LANDMARKS})')
+    build.add_argument('--no-turns', action='store_true',
+                       help='Tabulate plain distances without turn penalties')
+
+    info = subparsers.add_parser('info', help='Summarize a landmark table')
+    info.add_argument('landmark_file')
+    info.add_argument('--graph', help='Routing graph .bin file, to show landmark positions')
+
+    args = parser.parse_args()
+
+    if args.command == 'build':
+        graph = RoutingGraph.load(args.graph_file)
+        penalties = dict(TURN_PENALTY, enabled=not args.no_turns)
+        table = LandmarkTable.build(graph, args.landmarks, penalties)
+        Path(args.output_file).parent.mkdir(parents=True, exist_ok=True)
+        size = table.save(args.output_file)
+
+        print(f"✓ Wrote {len(table.landmarks)} landmarks to {args.output_file} ({size / 1024:.1f} KB)")
+        for node in table.landmarks:
+            print(f"  Node {node}: {graph.lats[node]:.4f}, {graph.lngs[node]:.4f}")
+
+    else:
+        table = LandmarkTable.load(args.landmark_file)
+        reachable = table.units != UNREACHABLE
+        print(f"Landmark table: {args.landmark_file}")
+        print(f"  Landmarks: {len(table.landmarks)}")
+        print(f"  Graph: {table.node_count:,} nodes, {table.edge_count:,} directed edges")
+        print("  Turn penalties: " + ", ".join(f"{key} {table.penalties[key]:g}" for key in PENALTY_KEYS))
+        print(f"  Nodes reached by every landmark: {int(reachable.all(axis=0).sum()):,}")
+        print(f"  Largest cost: {int(table.units[reachable].max()) * table.unit_km:.1f} km")
+
+        if args.graph:
+            graph = RoutingGraph.load(args.graph)
+            for node in table.landmarks:
+                print(f"  Node {node}: {graph.lats[node]:.4f}, {graph.lngs[node]:.4f}")
+
+
+if __name__ == '__main__':
+    main()
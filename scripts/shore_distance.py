@@ -0,0 +1,125 @@
+#!/usr/bin/env python3
+"""
+Signed distance-to-shore field over the routing lattice
+
+For every lattice cell, the distance in meters from its centre to the
+centre of the nearest cell on the other side of the shoreline: positive
+in water (clearance from land), negative on land (distance to water).
+It is computed with one Euclidean distance transform per side of the
+rasterized water mask, with cell sizes taken at the lattice's middle
+latitude (they vary by under 3% across Lake Champlain).
+
+The field is stored in the depth grid format (see depth_grid_binary.py),
+so values are decimetres and saturate at +/-MAX_DISTANCE_M (3276.7 m),
+well beyond any clearance routing cares about. Routers turn it into a
+per-node cost factor (see SHORE_CLEARANCE in routing_graph.py) with one
+lookup per edge instead of testing geometry.
+
+Usage:
+    python shore_distance.py build <boundary.geojson> <output.bin>
+    python shore_distance.py info <shore-distance.bin>
+    python shore_distance.py lookup <shore-distance.bin> <lat> <lng>
+"""
+
+import argparse
+import math
+import sys
+
+try:
+    import numpy as np
+    from scipy.ndimage import distance_transform_edt
+    from depth_grid_binary import DEPTH_SCALE, DepthGrid, write_depth_grid
+    from grid_lattice import GRID_LATTICE
+    from process_bathymetry_geojson import rasterize_water_mask
+    from routing_graph import EARTH_RADIUS_KM
+except ImportError as e:
+    print(f"Missing dependency: {e}")
+    print("\nInstall required packages:")
+    print("pip install numpy scipy")
+    sys.exit(1)
+
+# Largest distance the depth grid format holds (int16 decimetres)
+MAX_DISTANCE_M = np.iinfo(np.int16).max / DEPTH_SCALE
+
+
+def cell_size_m(lattice):
+    """(north-south, east-west) size of a lattice cell in meters"""
+    meters_per_degree = math.radians(1) * EARTH_RADIUS_KM * 1000
+    middle_lat = lattice.south + lattice.lat_step * (lattice.rows - 1) / 2
+    return (lattice.lat_step * meters_per_degree,
+            lattice.lng_step * meters_per_degree * math.cos(math.radians(middle_lat)))
+
+
+def signed_shore_distance(water, lattice):
+    """
+    Signed distance in meters for a (rows, cols) water mask
+
+    Positive in water, negative on land, clipped to +/-MAX_DISTANCE_M
+    (which is also what every cell gets when there is no shoreline).
+    """
+    water = np.asarray(water, dtype=bool)
+    if water.all() or not water.any():
+        return np.where(water, MAX_DISTANCE_M, -MAX_DISTANCE_M)
+
+    sampling = cell_size_m(lattice)
+    # distance_transform_edt measures each non-zero cell to the nearest zero
+    to_land = distance_transform_edt(water, sampling=sampling)
+    to_water = distance_transform_edt(~water, sampling=sampling)
+    return np.clip(np.where(water, to_land, -to_water), -MAX_DISTANCE_M, MAX_DISTANCE_M)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Build the signed distance-to-shore field')
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    build = subparsers.add_parser('build', help='Build the field from the water boundary')
+    build.add_argument('boundary_file', help='Water boundary GeoJSON file')
+    build.add_argument('output_file', help='Output .bin file (depth grid format)')
+
+    info = subparsers.add_parser('info', help='Summarize a shore distance field')
+    info.add_argument('field_file')
+
+    lookup = subparsers.add_parser('lookup', help='Shore distance at a coordinate')
+    lookup.add_argument('field_file')
+    lookup.add_argument('lat', type=float)
+    lookup.add_argument('lng', type=float)
+
+    args = parser.parse_args()
+
+    if args.command == 'build':
+        lattice = GRID_LATTICE
+        lats, lngs = lattice.axes()
+        water = rasterize_water_mask(args.boundary_file, lats, lngs)
+        distances = signed_shore_distance(water, lattice)
+        size = write_depth_grid(args.output_file, lattice, distances)
+
+        north_south, east_west = cell_size_m(lattice)
+        print(f"✓ Wrote shore distance field to {args.output_file} ({size / 1024:.1f} KB)")
+        print(f"  Lattice: {lattice.rows} rows x {lattice.cols} cols "
+              f"({north_south:.0f} m x {east_west:.0f} m cells)")
+        print(f"  Water cells: {int(water.sum()):,}, "
+              f"farthest from shore {distances[water].max():.0f} m")
+
+    elif args.command == 'info':
+        grid = DepthGrid(args.field_file)
+        distances = grid.to_array()
+        water = distances > 0
+        print(f"Shore distance field: {args.field_file}")
+        print(f"  Lattice: {grid.rows} rows x {grid.cols} cols")
+        print(f"  Water cells: {int(water.sum()):,}")
+        for limit in (250, 500, 1000):
+            share = (distances[water] < limit).mean() if water.any() else 0
+            print(f"  Water within {limit} m of shore: {share:.1%}")
+
+    else:
+        distance = DepthGrid(args.field_file).depth_at(args.lat, args.lng)
+        if distance is None:
+            print(f"({args.lat}, {args.lng}) is outside the field")
+        elif distance > 0:
+            print(f"({args.lat}, {args.lng}) is in water, {distance:.1f} m from shore")
+        else:
+            print(f"({args.lat}, {args.lng}) is on land, {-distance:.1f} m from water")
+
+
+if __name__ == '__main__':
+    main()
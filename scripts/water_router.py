@@ -0,0 +1,558 @@
+#!/usr/bin/env python3
+"""
+Water routing outside the browser
+
+A Python port of findPath() in js/navigation.js over the prebuilt CSR
+routing graph (routing_graph.py). The search is the same A*: haversine
+or ALT landmark heuristic (routing_landmarks.py), precomputed edge
+lengths scaled by the shore clearance factor (shore_distance.py), the
+ROUTING_CONFIG.turnPenalty turn costs and the same nearest-water
+snapping, so routes match the app. State lives in flat per-node arrays
+and the open set is a binary heap ordered by (f, insertion order),
+the same order as the app's indexed heap, so ties break identically.
+
+Usage:
+    python water_router.py route <start_poi_id> <end_poi_id> [--draft M] [--margin M]
+    python water_router.py bench [--pairs N] [--seed S]
+"""
+
+import argparse
+import heapq
+import json
+import math
+import random
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+try:
+    import numpy as np
+    from depth_grid_binary import DEPTH_SCALE, NODATA, DepthGrid
+    from routing_graph import (EARTH_RADIUS_KM, SHORE_CLEARANCE, TURN_PENALTY, RoutingGraph,
+                               clearance_factors, haversine_km, turn_cost)
+    from routing_landmarks import LandmarkTable
+except ImportError as e:
+    print(f"Missing dependency: {e}")
+    print("\nInstall required packages:")
+    print("pip install numpy scipy")
+    sys.exit(1)
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+DEFAULT_GRAPH_FILE = REPO_ROOT / 'data' / 'routing' / 'lake-champlain-graph.bin'
+DEFAULT_LANDMARK_FILE = REPO_ROOT / 'data' / 'routing' / 'lake-champlain-landmarks.bin'
+DEFAULT_SHORE_DISTANCE_FILE = REPO_ROOT / 'data' / 'depth' / 'lake-champlain-shore-distance.bin'
+DEFAULT_POI_FILE = REPO_ROOT / 'pois' / 'lake_champlain_pois.json'
+JS_BENCHMARK = Path(__file__).resolve().parent / 'benchmark_routing.js'
+
+# Vessel defaults (VESSEL_DRAFT / SAFETY_MARGIN in navigation.js)
+DEFAULT_DRAFT_M = 0.6
+DEFAULT_SAFETY_MARGIN_M = 0.3
+
+# Common vessel drafts in meters for precomputed routing tables
+DEFAULT_DRAFTS_M = (0.6, 1.0, 1.5, 2.0)
+
+# Farthest a route endpoint may be from navigable water (km)
+MAX_GRID_SEARCH_DISTANCE_KM = 5
+
+# Rings of cells nearest_node() probes before scanning every node instead;
+# past this, numpy is faster than probing cell by cell
+NEAREST_RING_LIMIT = 24
+
+def haversine(lat1, lng1, lat2, lng2):
+    """Scalar haversineDistance() in km"""
+    d_lat = (lat2 - lat1) * math.pi / 180
+    d_lng = (lng2 - lng1) * math.pi / 180
+    a = (math.sin(d_lat / 2) * math.sin(d_lat / 2) +
+         math.cos(lat1 * math.pi / 180) * math.cos(lat2 * math.pi / 180) *
+         math.sin(d_lng / 2) * math.sin(d_lng / 2))
+    return EARTH_RADIUS_KM * 2 * math.atan2(math.sqrt(a), math.sqrt(1 - a))
+
+
+def minimum_depth_decimetres(draft_m, margin_m):
+    """minimumDepthDecimetres() in navigation.js"""
+    return math.ceil((draft_m + margin_m) * DEPTH_SCALE - 1e-6)
+
+
+def load_pois(poi_file=DEFAULT_POI_FILE):
+    """POIs by id as {'id', 'name', 'lat', 'lng'} dicts"""
+    with open(poi_file, 'r') as f:
+        data = json.load(f)
+
+    pois = {}
+    for poi in data['pois']:
+        coordinates = poi['location']['coordinates']
+        pois[poi['id']] = {
+            'id': poi['id'],
+            'name': poi['name'],
+            'lat': coordinates['latitude'],
+            'lng': coordinates['longitude']
+        }
+    return pois
+
+
+class WaterRouter:
+    """
+    A* router over a CSR routing graph for one vessel draft
+
+    Nodes too shallow for draft plus margin are skipped; nodes without
+    depth data stay navigable, as in the app. With a landmark table
+    (routing_landmarks.py) the heuristic is the larger of the haversine
+    and ALT lower bounds; pass landmarks=None for haversine alone. Edge
+    costs are lengths scaled by the clearance factor of the node entered,
+    from the shore distance field; pass shore_distance=None to route on
+    plain lengths.
+    """
+
+    def __init__(self, graph=None, draft_m=DEFAULT_DRAFT_M, margin_m=DEFAULT_SAFETY_MARGIN_M,
+                 turn_penalty=TURN_PENALTY, landmarks=DEFAULT_LANDMARK_FILE,
+                 shore_distance=DEFAULT_SHORE_DISTANCE_FILE, clearance=SHORE_CLEARANCE):
+        if graph is None or isinstance(graph, (str, Path)):
+            graph = RoutingGraph.load(graph or DEFAULT_GRAPH_FILE)
+        self.graph = graph
+        self.turn_penalty = turn_penalty
+
+        if isinstance(landmarks, (str, Path)):
+            landmarks = LandmarkTable.load(landmarks) if Path(landmarks).exists() else None
+        if landmarks is not None and not landmarks.matches(graph):
+            print("Warning: landmark table was built for another routing graph - ignoring it")
+            landmarks = None
+        if landmarks is not None and not landmarks.admissible_for(turn_penalty):
+            print("Warning: landmark table assumes larger turn penalties - ignoring it")
+            landmarks = None
+        self.landmarks = landmarks
+
+        # Plain lists index fastest from the search loop
+        self.lats = graph.lats.tolist()
+        self.lngs = graph.lngs.tolist()
+        self.offsets = graph.offsets.tolist()
+        self.neighbors = graph.neighbors.tolist()
+        self.edge_costs = (graph.lengths_km.astype(np.float64) *
+                           self._clearance(shore_distance, clearance)[graph.neighbors]).tolist()
+
+        self.edge_bearings = graph.edge_bearings().tolist()
+
+        self.set_vessel(draft_m, margin_m)
+
+    def _clearance(self, shore_distance, clearance):
+        """Clearance factor of every node (ones without a usable field)"""
+        if isinstance(shore_distance, (str, Path)):
+            shore_distance = DepthGrid(shore_distance) if Path(shore_distance).exists() else None
+        if shore_distance is not None and shore_distance.lattice != self.graph.lattice:
+            print("Warning: shore distance field is on another lattice - ignoring it")
+            shore_distance = None
+        self.shore_distance = shore_distance
+
+        if shore_distance is None:
+            return np.ones(self.graph.node_count)
+        return clearance_factors(shore_distance.to_array().ravel()[self.graph.cells], clearance)
+
+    def set_vessel(self, draft_m, margin_m=DEFAULT_SAFETY_MARGIN_M):
+        """Switch draft (and safety margin); only the navigable mask changes"""
+        self.draft_m = draft_m
+        self.margin_m = margin_m
+        threshold = minimum_depth_decimetres(draft_m, margin_m)
+        depths = self.graph.depths_dm
+        self.navigable_mask = (depths == NODATA) | (depths >= threshold)
+        self.navigable = self.navigable_mask.tolist()
+
+        # Navigable node of every lattice cell, or -1 (gridIndex in the app)
+        lattice = self.graph.lattice
+        cell_nodes = np.full(lattice.rows * lattice.cols, -1, dtype=np.int64)
+        nodes = np.flatnonzero(self.navigable_mask)
+        cell_nodes[self.graph.cells[nodes]] = nodes
+        self.cell_nodes = cell_nodes.tolist()
+
+    def nearest_node(self, lat, lng):
+        """
+        (node, distance_km) of the nearest navigable node, or None
+
+        Probes the lattice in square rings of cells around the coordinate
+        until no unvisited cell can be closer than the best node found,
+        as findNearestGridPoint() does, or scans every node for coordinates
+        far from water. Ties go to the lowest node index.
+        """
+        lattice = self.graph.lattice
+        rows, cols = lattice.rows, lattice.cols
+        row_pos = (lat - lattice.south) / lattice.lat_step
+        col_pos = (lng - lattice.west) / lattice.lng_step
+        center_row = min(max(round(row_pos), 0), rows - 1)
+        center_col = min(max(round(col_pos), 0), cols - 1)
+        last_ring = max(center_row, rows - 1 - center_row, center_col, cols - 1 - center_col)
+
+        # Row and col gaps in km, less half a cell for rounding
+        km_per_degree = EARTH_RADIUS_KM * math.pi / 180
+        farthest_lat = max(abs(lat), abs(lattice.south), abs(lattice.south + (rows - 1) * lattice.lat_step))
+        row_km = lattice.lat_step * km_per_degree
+        col_km = lattice.lng_step * km_per_degree * math.cos(math.radians(farthest_lat))
+
+        def block_km(first_row, last_row, first_col, last_col):
+            return max(row_km * (max(first_row - row_pos, row_pos - last_row, 0) - 0.5),
+                       col_km * (max(first_col - col_pos, col_pos - last_col, 0) - 0.5))
+
+        cell_nodes = self.cell_nodes
+        best = None
+        for ring in range(last_ring + 1):
+            if ring > NEAREST_RING_LIMIT:
+                return self._nearest_node_scan(lat, lng)
+
+            top, bottom = center_row - ring, center_row + ring
+            left, right = center_col - ring, center_col + ring
+            first_row, last_row = max(top, 0), min(bottom, rows - 1)
+            first_col, last_col = max(left, 0), min(right, cols - 1)
+
+            sides = []
+            if top >= 0:
+                sides.append(block_km(top, top, first_col, last_col))
+            if bottom < rows:
+                sides.append(block_km(bottom, bottom, first_col, last_col))
+            if left >= 0:
+                sides.append(block_km(first_row, last_row, left, left))
+            if right < cols:
+                sides.append(block_km(first_row, last_row, right, right))
+            if best is not None and min(sides) > best[0]:
+                break
+
+            for row in range(first_row, last_row + 1):
+                if row in (top, bottom):
+                    ring_cols = range(first_col, last_col + 1)
+                else:
+                    ring_cols = [col for col in (left, right) if 0 <= col < cols]
+                for col in ring_cols:
+                    node = cell_nodes[row * cols + col]
+                    if node >= 0:
+                        candidate = (haversine(lat, lng, self.lats[node], self.lngs[node]), node)
+                        if best is None or candidate < best:
+                            best = candidate
+
+        if best is None:
+            return None
+        return best[1], best[0]
+
+    def _nearest_node_scan(self, lat, lng):
+        """nearest_node() by measuring to every navigable node"""
+        if not self.navigable_mask.any():
+            return None
+
+        dists = haversine_km(lat, lng, self.graph.lats, self.graph.lngs)
+        dists[~self.navigable_mask] = np.inf
+        node = int(np.argmin(dists))
+        return node, float(dists[node])
+
+    def find_path(self, start_lat, start_lng, end_lat, end_lng):
+        """
+        Water route between two coordinates
+
+        Returns {'nodes', 'coordinates', 'distance_km', 'cost_km',
+        'expanded'}, or None when an endpoint is more than MAX_GRID_SEARCH_DISTANCE_KM
+        from navigable water or no water path exists. distance_km covers
+        the grid path only, as in findPath(); cost_km is the search cost,
+        with shore clearance and turn penalties.
+        """
+        for value, limit in ((start_lat, 90), (end_lat, 90), (start_lng, 180), (end_lng, 180)):
+            if not math.isfinite(value) or abs(value) > limit:
+                raise ValueError(f"Invalid coordinate {value}")
+
+        start_snap = self.nearest_node(start_lat, start_lng)
+        end_snap = self.nearest_node(end_lat, end_lng)
+        if start_snap is None or end_snap is None:
+            return None
+        if start_snap[1] > MAX_GRID_SEARCH_DISTANCE_KM or end_snap[1] > MAX_GRID_SEARCH_DISTANCE_KM:
+            return None
+
+        start, end = start_snap[0], end_snap[0]
+        result = self._search(start, end)
+        if result is None:
+            return None
+
+        nodes, expanded, cost = result
+        coordinates = [(self.lats[n], self.lngs[n]) for n in nodes]
+        distance = sum(haversine(*a, *b) for a, b in zip(coordinates, coordinates[1:]))
+
+        return {
+            'nodes': nodes,
+            'coordinates': coordinates,
+            'distance_km': distance,
+            'cost_km': cost,
+            'expanded': expanded
+        }
+
+    def heuristic(self, end):
+        """Lower bound on the remaining cost (km) from every node to end"""
+        bounds = haversine_km(self.graph.lats[end], self.graph.lngs[end],
+                              self.graph.lats, self.graph.lngs)
+        if self.landmarks is not None:
+            bounds = np.maximum(bounds, self.landmarks.lower_bounds(end))
+        return bounds
+
+    def _search(self, start, end, navigable=None):
+        """
+        A* from start to end node; (nodes, expanded count, cost) or None
+
+        navigable overrides the vessel's navigable list, e.g. to keep
+        the search inside a corridor.
+        """
+        n = self.graph.node_count
+        offsets, neighbors, edge_costs = self.offsets, self.neighbors, self.edge_costs
+        edge_bearings = self.edge_bearings
+        navigable = self.navigable if navigable is None else navigable
+        penalties = self.turn_penalty
+        turns = penalties['enabled']
+
+        heuristic = self.heuristic(end).tolist()
+        g_score = [math.inf] * n
+        f_score = [math.inf] * n
+        came_from = [-1] * n
+        came_by = [-1] * n  # edge used to reach each node, for turn angles
+        closed = bytearray(n)
+
+        g_score[start] = 0.0
+        f_score[start] = heuristic[start]
+        order = [-1] * n  # open set insertion order, the tie-breaker
+        order[start] = 0
+        inserted = 1
+        heap = [(f_score[start], 0, start)]
+        expanded = 0
+
+        while heap:
+            f, _, current = heapq.heappop(heap)
+            if closed[current] or f != f_score[current]:
+                continue  # Stale heap entry
+
+            if current == end:
+                path = [current]
+                while came_from[path[-1]] >= 0:
+                    path.append(came_from[path[-1]])
+                path.reverse()
+                return path, expanded, g_score[current]
+
+            closed[current] = 1
+            expanded += 1
+            arrived = came_by[current]
+            current_g = g_score[current]
+
+            for edge in range(offsets[current], offsets[current + 1]):
+                neighbor = neighbors[edge]
+                if closed[neighbor] or not navigable[neighbor]:
+                    continue
+
+                tentative = current_g + edge_costs[edge]
+                if turns and arrived >= 0:
+                    angle = abs(edge_bearings[edge] - edge_bearings[arrived])
+                    if angle > 180:
+                        angle = 360 - angle
+                    tentative += turn_cost(angle, penalties)
+
+                if tentative < g_score[neighbor]:
+                    came_from[neighbor] = current
+                    came_by[neighbor] = edge
+                    g_score[neighbor] = tentative
+                    f_score[neighbor] = tentative + heuristic[neighbor]
+                    if order[neighbor] < 0:
+                        order[neighbor] = inserted
+                        inserted += 1
+                    heapq.heappush(heap, (f_score[neighbor], order[neighbor], neighbor))
+
+        return None
+
+    def path_cost(self, nodes):
+        """Cost (km) of a node path: edge costs plus turn penalties"""
+        cost = 0.0
+        arrived = -1
+        for current, following in zip(nodes, nodes[1:]):
+            edge = self.offsets[current]
+            while self.neighbors[edge] != following:
+                edge += 1
+                if edge >= self.offsets[current + 1]:
+                    raise ValueError(f"Nodes {current} and {following} are not adjacent")
+
+            cost += self.edge_costs[edge]
+            if self.turn_penalty['enabled'] and arrived >= 0:
+                angle = abs(self.edge_bearings[edge] - self.edge_bearings[arrived])
+                if angle > 180:
+                    angle = 360 - angle
+                cost += turn_cost(angle, self.turn_penalty)
+            arrived = edge
+        return cost
+
+    def route_pois(self, start_poi, end_poi):
+        """
+        Route between two POI dicts (see load_pois)
+
+        Like calculateWaterRoute(): coordinates run from the start POI
+        through the grid path to the end POI, and a straight line with
+        'fallback': True is returned when there is no water route.
+        """
+        if start_poi['id'] == end_poi['id']:
+            return {'coordinates': [(start_poi['lat'], start_poi['lng'])], 'distance_km': 0.0,
+                    'nodes': [], 'fallback': False}
+
+        path = self.find_path(start_poi['lat'], start_poi['lng'], end_poi['lat'], end_poi['lng'])
+        if path is None:
+            return {
+                'coordinates': [(start_poi['lat'], start_poi['lng']), (end_poi['lat'], end_poi['lng'])],
+                'distance_km': haversine(start_poi['lat'], start_poi['lng'],
+                                         end_poi['lat'], end_poi['lng']),
+                'nodes': [],
+                'fallback': True
+            }
+
+        coordinates = ([(start_poi['lat'], start_poi['lng'])] + path['coordinates'] +
+                       [(end_poi['lat'], end_poi['lng'])])
+        distance = sum(haversine(*a, *b) for a, b in zip(coordinates, coordinates[1:]))
+
+        return {
+            'coordinates': coordinates,
+            'distance_km': distance,
+            'nodes': path['nodes'],
+            'expanded': path['expanded'],
+            'fallback': False
+        }
+
+
+def run_js_benchmark(pairs, draft_m, margin_m, hierarchy=False):
+    """Time findPath() in node for the same pairs; list of results or None"""
+    node = shutil.which('node')
+    if node is None:
+        print("  node not found - skipping the JavaScript comparison")
+        return None
+
+    with tempfile.NamedTemporaryFile('w', suffix='.json', delete=False) as f:
+        json.dump({'pairs': pairs, 'draft': draft_m, 'margin': margin_m, 'hierarchy': hierarchy}, f)
+        pairs_file = f.name
+
+    try:
+        completed = subprocess.run([node, str(JS_BENCHMARK), pairs_file],
+                                   capture_output=True, text=True, check=True)
+    except subprocess.CalledProcessError as e:
+        print(f"  JavaScript benchmark failed: {e.stderr.strip()}")
+        return None
+    finally:
+        Path(pairs_file).unlink()
+
+    return json.loads(completed.stdout)
+
+
+def summarize_latency(label, millis):
+    millis = np.sort(np.asarray(millis))
+    print(f"  {label}: median {np.median(millis):.1f} ms, "
+          f"p95 {np.percentile(millis, 95):.1f} ms, max {millis[-1]:.1f} ms")
+
+
+def time_routes(router, pairs):
+    """find_path() results with timings for [start lat, lng, end lat, lng] pairs"""
+    results = []
+    for pair in pairs:
+        started = time.perf_counter()
+        path = router.find_path(*pair)
+        results.append({
+            'ms': (time.perf_counter() - started) * 1000,
+            'distance': path['distance_km'] if path else None,
+            'nodes': path['nodes'] if path else None,
+            'expanded': path['expanded'] if path else None
+        })
+    return results
+
+
+def benchmark(router, pois, n_pairs, seed):
+    """Time random POI-to-POI routes in Python and (if available) node"""
+    rng = random.Random(seed)
+    ids = sorted(pois)
+    pairs = []
+    while len(pairs) < n_pairs:
+        a, b = rng.sample(ids, 2)
+        pairs.append([pois[a]['lat'], pois[a]['lng'], pois[b]['lat'], pois[b]['lng']])
+
+    print(f"Benchmarking {len(pairs)} POI-to-POI routes "
+          f"(draft {router.draft_m} m + margin {router.margin_m} m)...")
+
+    py_results = time_routes(router, pairs)
+    found = [r for r in py_results if r['nodes'] is not None]
+    print(f"  Routes found: {len(found)} of {len(pairs)}")
+    summarize_latency("Python", [r['ms'] for r in py_results])
+
+    if router.landmarks is not None:
+        baseline = WaterRouter(router.graph, router.draft_m, router.margin_m,
+                               router.turn_penalty, landmarks=None)
+        baseline_results = time_routes(baseline, pairs)
+        summarize_latency("Python (haversine only)", [r['ms'] for r in baseline_results])
+
+        expanded = sum(r['expanded'] for r in found)
+        baseline_expanded = sum(r['expanded'] for r in baseline_results if r['nodes'] is not None)
+        if baseline_expanded:
+            print(f"  Nodes expanded: {baseline_expanded:,} with haversine, {expanded:,} with landmarks "
+                  f"({1 - expanded / baseline_expanded:.0%} fewer)")
+    elif found:
+        print(f"  Mean nodes expanded: {np.mean([r['expanded'] for r in found]):,.0f}")
+
+    js_results = run_js_benchmark(pairs, router.draft_m, router.margin_m)
+    if js_results is None:
+        return
+
+    summarize_latency("JavaScript", [r['ms'] for r in js_results])
+
+    same_path = sum(1 for py, js in zip(py_results, js_results) if py['nodes'] == js['nodes'])
+    distance_diff = max((abs(py['distance'] - js['distance'])
+                         for py, js in zip(py_results, js_results)
+                         if py['distance'] is not None and js['distance'] is not None), default=0)
+    print(f"  Identical paths: {same_path} of {len(pairs)} "
+          f"(max distance difference {distance_diff * 1000:.3f} m)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Compute water routes between POIs')
+    parser.add_argument('--graph', default=str(DEFAULT_GRAPH_FILE), help='Routing graph .bin file')
+    parser.add_argument('--pois', default=str(DEFAULT_POI_FILE), help='POI JSON file')
+    parser.add_argument('--draft', type=float, default=DEFAULT_DRAFT_M,
+                        help=f'Vessel draft in meters (default: {DEFAULT_DRAFT_M})')
+    parser.add_argument('--margin', type=float, default=DEFAULT_SAFETY_MARGIN_M,
+                        help=f'Safety margin in meters (default: {DEFAULT_SAFETY_MARGIN_M})')
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    route = subparsers.add_parser('route', help='Route between two POI IDs')
+    route.add_argument('start_poi')
+    route.add_argument('end_poi')
+    route.add_argument('--json', action='store_true', help='Print the route as JSON')
+
+    bench = subparsers.add_parser('bench', help='Compare routing latency and node expansions')
+    bench.add_argument('--pairs', type=int, default=20, help='Number of random POI pairs (default: 20)')
+    bench.add_argument('--seed', type=int, default=0, help='Random seed for POI pairs (default: 0)')
+
+    args = parser.parse_args()
+
+    pois = load_pois(args.pois)
+    router = WaterRouter(args.graph, args.draft, args.margin)
+
+    if args.command == 'bench':
+        benchmark(router, pois, args.pairs, args.seed)
+        return
+
+    for poi_id in (args.start_poi, args.end_poi):
+        if poi_id not in pois:
+            print(f"ERROR: Unknown POI id: {poi_id}")
+            sys.exit(1)
+
+    start, end = pois[args.start_poi], pois[args.end_poi]
+    started = time.perf_counter()
+    result = router.route_pois(start, end)
+    elapsed = time.perf_counter() - started
+
+    if args.json:
+        print(json.dumps(result))
+        return
+
+    print(f"Route: {start['name']} → {end['name']}")
+    if result['fallback']:
+        print(f"  No water route found - straight line {result['distance_km']:.2f} km")
+    else:
+        print(f"  Distance: {result['distance_km']:.2f} km ({result['distance_km'] * 0.539957:.2f} nm)")
+        print(f"  Waypoints: {len(result['coordinates'])}")
+        if 'expanded' in result:
+            print(f"  Nodes expanded: {result['expanded']:,}")
+    print(f"  Computed in {elapsed * 1000:.1f} ms")
+
+
+if __name__ == '__main__':
+    main()
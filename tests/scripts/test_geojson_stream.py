@@ -0,0 +1,41 @@
+"""
+Tests for scripts/geojson_stream.py
+Run with: python -m pytest tests/scripts
+"""
+
+import json
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[2] / 'scripts'))
+
+from geojson_stream import iter_features, iter_point_chunks  # noqa: E402
+
+
+def write_collection(path, features, **members):
+    path.write_text(json.dumps({'type': 'FeatureCollection', **members, 'features': features}))
+    return path
+
+
+def test_feature_much_larger_than_read_size(tmp_path):
+    # ~1 MB polygon read 7 characters at a time
+    ring = [[-73.3 + i * 1e-6, 44.5 + i * 1e-6] for i in range(40000)]
+    feature = {'type': 'Feature', 'properties': {'name': 'lake'},
+               'geometry': {'type': 'Polygon', 'coordinates': [ring]}}
+    path = write_collection(tmp_path / 'boundary.geojson', [feature], name='boundary')
+
+    assert list(iter_features(path, read_size=7)) == [feature]
+
+
+def test_numbers_split_across_reads(tmp_path):
+    features = [{'type': 'Feature', 'properties': {'DEPTH_FT': -12.25 - i},
+                 'geometry': {'type': 'Point', 'coordinates': [-73.123456 + i, 44.654321]}}
+                for i in range(20)]
+    path = write_collection(tmp_path / 'points.geojson', features)
+
+    for read_size in (1, 3, 7):
+        assert list(iter_features(path, read_size=read_size)) == features
+
+    lngs, lats, depths = next(iter_point_chunks(path))
+    assert len(lngs) == 20
+    assert depths[0] == 12.25 * 0.3048
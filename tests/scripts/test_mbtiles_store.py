@@ -0,0 +1,90 @@
+"""
+Tests for scripts/mbtiles_store.py
+Run with: python -m pytest tests/scripts
+"""
+
+import hashlib
+import sqlite3
+import subprocess
+import sys
+from pathlib import Path
+
+SCRIPTS_DIR = Path(__file__).resolve().parents[2] / 'scripts'
+sys.path.insert(0, str(SCRIPTS_DIR))
+
+from mbtiles_store import MBTilesStore, export_directory, import_directory  # noqa: E402
+
+TILE = b'\x89PNG tile 10/301/372'
+
+
+def write_tile(tiles_dir, z, x, y, data=TILE):
+    path = tiles_dir / str(z) / str(x) / f"{y}.png"
+    path.parent.mkdir(parents=True)
+    path.write_bytes(data)
+
+
+def stored_rows(mbtiles_file):
+    with sqlite3.connect(mbtiles_file) as db:
+        return db.execute("SELECT zoom_level, tile_column, tile_row, tile_data FROM tiles").fetchall()
+
+
+def test_tms_directory_rows_are_stored_unflipped(tmp_path):
+    # gdal2tiles (without --xyz) writes row 651 for XYZ row 372 at zoom 10
+    write_tile(tmp_path / 'gdal2tiles', 10, 301, 651)
+
+    with MBTilesStore(tmp_path / 'charts.mbtiles') as store:
+        import_directory(tmp_path / 'gdal2tiles', store, tms=True)
+        assert store.get(10, 301, 372) == TILE
+
+    assert stored_rows(tmp_path / 'charts.mbtiles') == [(10, 301, 651, TILE)]
+
+
+def test_xyz_directory_rows_are_flipped(tmp_path):
+    write_tile(tmp_path / 'xyz', 10, 301, 372)
+
+    with MBTilesStore(tmp_path / 'charts.mbtiles') as store:
+        import_directory(tmp_path / 'xyz', store)
+
+    assert stored_rows(tmp_path / 'charts.mbtiles') == [(10, 301, 651, TILE)]
+
+
+def test_export_restores_directory_layout(tmp_path):
+    write_tile(tmp_path / 'gdal2tiles', 10, 301, 651)
+
+    with MBTilesStore(tmp_path / 'charts.mbtiles') as store:
+        import_directory(tmp_path / 'gdal2tiles', store, tms=True)
+        export_directory(store, tmp_path / 'xyz')
+        export_directory(store, tmp_path / 'tms', tms=True)
+
+    assert (tmp_path / 'xyz' / '10' / '301' / '372.png').read_bytes() == TILE
+    assert (tmp_path / 'tms' / '10' / '301' / '651.png').read_bytes() == TILE
+
+
+def test_identical_tiles_share_one_image(tmp_path):
+    with MBTilesStore(tmp_path / 'charts.mbtiles') as store:
+        for y in range(4):
+            store.put(12, 1200, 1400 + y, TILE)
+        store.put(12, 1201, 1400, b'other')
+        stats = store.stats()
+
+    assert stats['tiles'] == 5
+    assert stats['images'] == 2
+
+
+def test_info_and_export_leave_the_file_untouched(tmp_path):
+    mbtiles_file = tmp_path / 'charts.mbtiles'
+    with MBTilesStore(mbtiles_file) as store:
+        store.put(10, 301, 372, TILE)
+    # Orphaned image and stale zoom range that a writable close would fix
+    with sqlite3.connect(mbtiles_file) as db:
+        db.execute("INSERT INTO images (tile_id, tile_data) VALUES ('orphan', x'00')")
+        db.execute("UPDATE metadata SET value = '3' WHERE name = 'maxzoom'")
+    digest = hashlib.sha256(mbtiles_file.read_bytes()).hexdigest()
+
+    for args in (['info', str(mbtiles_file)], ['export', str(mbtiles_file), str(tmp_path / 'xyz')]):
+        subprocess.run([sys.executable, str(SCRIPTS_DIR / 'mbtiles_store.py'), *args],
+                       check=True, capture_output=True)
+
+    assert hashlib.sha256(mbtiles_file.read_bytes()).hexdigest() == digest
+    assert sorted(path.name for path in tmp_path.iterdir()) == ['charts.mbtiles', 'xyz']
+    assert (tmp_path / 'xyz' / '10' / '301' / '372.png').read_bytes() == TILE
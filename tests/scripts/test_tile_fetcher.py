@@ -0,0 +1,63 @@
+"""
+Tests for scripts/tile_fetcher.py against the local stand-in tile server
+Run with: python -m pytest tests/scripts
+"""
+
+import asyncio
+import sys
+import time
+from pathlib import Path
+
+SCRIPTS_DIR = Path(__file__).resolve().parents[2] / 'scripts'
+sys.path.insert(0, str(SCRIPTS_DIR))
+
+from tile_fetcher import TileFetcher, serve_stand_in  # noqa: E402
+
+TILES = [(14, x, y) for x in range(4800, 4806) for y in range(5800, 5805)]
+RATE = 40.0
+
+
+async def fetch_from_stand_in(tiles, failure_rate, headers_for=None):
+    runner, url_template = await serve_stand_in(failure_rate=failure_rate, seed=7)
+    results = {}
+    try:
+        async with TileFetcher(url_template, rate=RATE, retries=10,
+                               backoff_base=0.01) as fetcher:
+            started = time.perf_counter()
+            async for tile, status, body, headers in fetcher.fetch_all(tiles, headers_for):
+                results[tile] = (status, body, headers)
+            elapsed = time.perf_counter() - started
+    finally:
+        await runner.cleanup()
+    return results, fetcher.stats, elapsed
+
+
+def test_all_tiles_arrive_through_server_failures_within_the_rate():
+    results, stats, elapsed = asyncio.run(fetch_from_stand_in(TILES, failure_rate=0.3))
+
+    assert sorted(results) == sorted(TILES)
+    for (z, x, y), (status, body, headers) in results.items():
+        assert status == 200
+        assert body == f"tile {z}/{x}/{y}".encode() * 16
+        assert headers['ETag'] == f'"{z}-{x}-{y}"'
+
+    # The 503s were retried, and every attempt spent a token: one up
+    # front (the bucket holds a single token) plus RATE per second after
+    assert stats['retries'] > 0
+    assert stats['failed'] == 0
+    assert stats['requests'] == len(TILES) + stats['retries']
+    assert stats['requests'] <= 1 + RATE * elapsed
+
+
+def test_matching_if_none_match_gets_304_without_a_body():
+    def if_none_match(z, x, y):
+        return {'If-None-Match': f'"{z}-{x}-{y}"'}
+
+    results, _, _ = asyncio.run(fetch_from_stand_in(TILES[:3], failure_rate=0.0,
+                                                    headers_for=if_none_match))
+
+    assert sorted(results) == sorted(TILES[:3])
+    for (z, x, y), (status, body, headers) in results.items():
+        assert status == 304
+        assert body is None
+        assert headers['ETag'] == f'"{z}-{x}-{y}"'
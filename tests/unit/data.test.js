@@ -102,6 +102,19 @@ describe('Data Validation', () => {
             }
         });
 
+        it('should have water snap tables in increasing depth order', () => {
+            for (const poi of POINTS_OF_INTEREST.filter(poi => poi.waterSnap)) {
+                expect(poi.waterSnap.length).toBeGreaterThan(0);
+                poi.waterSnap.forEach(([fromDm, node, distance], i) => {
+                    expect(Number.isInteger(node)).toBe(true);
+                    expect(distance).toBeGreaterThanOrEqual(0);
+                    if (i > 0) {
+                        expect(fromDm).toBeGreaterThan(poi.waterSnap[i - 1][0]);
+                    }
+                });
+            }
+        });
+
         it('should have all POIs with non-empty names', () => {
             for (const poi of POINTS_OF_INTEREST) {
                 expect(poi.name).toBeTruthy();
@@ -13,9 +13,29 @@ const {
     generateWaterGrid,
     getNeighbors,
     findNearestGridPoint,
+    poiGridPoint,
     findPath,
+    parseDepthGridBinary,
+    depthGridFromJson,
+    createGridLattice,
+    parseNavigabilityMasks,
+    parseRoutingGraph,
+    routingGraphDepthsHash,
+    parseLandmarkTable,
+    createRouteHeuristic,
+    parseRouteHierarchy,
+    calculateClearanceFactor,
+    updateVesselSettings,
+    loadWaterBoundaries,
+    loadDepthData,
+    loadNavigabilityMasks,
+    loadShoreDistance,
+    loadRoutingGraph,
+    loadLandmarkTable,
     LAKE_CHAMPLAIN_POLYGON,
     GRID_CONFIG,
+    GRID_LATTICE,
+    ROUTING_CONFIG,
     EARTH_RADIUS_KM,
     MAX_GRID_SEARCH_DISTANCE_KM,
     waterGrid,
@@ -25,7 +45,46 @@ const {
 // Need to reference data for POINTS_OF_INTEREST
 const { POINTS_OF_INTEREST } = require('../../js/data.js');
 
+const fs = require('fs');
+const path = require('path');
+
+const REPO_ROOT = path.resolve(__dirname, '..', '..');
+
+/**
+ * Serve the app's data requests from the repository, as the browser
+ * would from the site root
+ */
+function serveRepositoryFiles() {
+    global.fetch = async (file) => {
+        const filePath = path.join(REPO_ROOT, file);
+        if (!fs.existsSync(filePath)) {
+            return { ok: false, status: 404 };
+        }
+
+        const buffer = fs.readFileSync(filePath);
+        return {
+            ok: true,
+            status: 200,
+            json: async () => JSON.parse(buffer),
+            arrayBuffer: async () => buffer.buffer.slice(buffer.byteOffset, buffer.byteOffset + buffer.length)
+        };
+    };
+}
+
 describe('Navigation and Pathfinding', () => {
+    // Grid, routing and pathfinding tests run on the shipped data files
+    beforeAll(async () => {
+        serveRepositoryFiles();
+        await Promise.all([
+            loadWaterBoundaries(),
+            loadDepthData(),
+            loadNavigabilityMasks(),
+            loadShoreDistance(),
+            loadRoutingGraph(),
+            loadLandmarkTable()
+        ]);
+    });
+
     describe('pointInPolygon', () => {
         it('should correctly identify points inside polygon', () => {
             // Mid-lake Champlain coordinates (definitely in water)
@@ -191,6 +250,68 @@ describe('Navigation and Pathfinding', () => {
             expect(nearest).toBeDefined();
             expect(isInWater(nearest.lat, nearest.lng)).toBe(true);
         });
+
+        it('should match a linear scan of the water grid', () => {
+            const grid = generateWaterGrid();
+            // Open water, a shoreline, inland and south of the lattice
+            const queries = [[44.5, -73.3], [44.4759, -73.2121], [44.2, -72.9], [42.9, -73.5]];
+
+            for (const [lat, lng] of queries) {
+                let expected = null;
+                let expectedDist = Infinity;
+                for (const point of grid) {
+                    const dist = haversineDistance(lat, lng, point.lat, point.lng);
+                    if (dist < expectedDist) {
+                        expectedDist = dist;
+                        expected = point;
+                    }
+                }
+
+                expect(findNearestGridPoint(lat, lng)).toBe(expected);
+            }
+        });
+    });
+
+    describe('poiGridPoint', () => {
+        it('should fall back to the nearest grid point without a matching snap table', () => {
+            // Burlington, VT, with a table built for some other graph
+            const poi = {
+                lat: 44.4759,
+                lng: -73.2121,
+                waterSnap: { graphNodes: 1, graphEdges: 0, firstDepthDm: 0, lastDepthDm: 30, entries: [[0, 0, 0]] }
+            };
+
+            expect(poiGridPoint(poi)).toBe(findNearestGridPoint(poi.lat, poi.lng));
+            expect(poiGridPoint({ lat: poi.lat, lng: poi.lng })).toBe(findNearestGridPoint(poi.lat, poi.lng));
+        });
+
+        it('should only trust a snap table built on the loaded graph depths', () => {
+            const { ROUTING_GRAPH } = require('../../js/navigation.js');
+            const grid = generateWaterGrid();
+            const far = grid[grid.length - 1];
+            const snap = {
+                graphNodes: ROUTING_GRAPH.nodeCount,
+                graphEdges: ROUTING_GRAPH.edgeCount,
+                graphDepthsHash: routingGraphDepthsHash(ROUTING_GRAPH),
+                firstDepthDm: 0,
+                lastDepthDm: 30,
+                entries: [[0, far.node, 0]]
+            };
+            const poi = { lat: 44.4759, lng: -73.2121, waterSnap: snap };
+
+            expect(poiGridPoint(poi)).toBe(far);
+
+            // Same graph shape after a depth rebuild
+            poi.waterSnap = { ...snap, graphDepthsHash: (snap.graphDepthsHash + 1) >>> 0 };
+            expect(poiGridPoint(poi)).toBe(findNearestGridPoint(poi.lat, poi.lng));
+        });
+
+        it('should match the depths hash recorded with the shipped snap tables', () => {
+            const { ROUTING_GRAPH } = require('../../js/navigation.js');
+            const data = JSON.parse(fs.readFileSync(path.join(REPO_ROOT, 'pois', 'lake_champlain_pois.json'), 'utf8'));
+
+            expect(routingGraphDepthsHash(ROUTING_GRAPH)).toBe(data.waterSnap.graphDepthsHash);
+        });
     });
 
     describe('findPath', () => {
@@ -237,6 +358,274 @@ describe('Navigation and Pathfinding', () => {
                 }
             }
         });
+
+        it('should find the same path when search state is reused', () => {
+            // A different search in between leaves stale scores behind
+            const first = findPath(44.4759, -73.2121, 44.6995, -73.4529);
+            findPath(44.6995, -73.4529, 44.5, -73.3);
+            const second = findPath(44.4759, -73.2121, 44.6995, -73.4529);
+
+            expect(second.path.map(point => point.node)).toEqual(first.path.map(point => point.node));
+            expect(second.distance).toBe(first.distance);
+        });
+    });
+
+    describe('depth grid formats', () => {
+        // 2 x 3 lattice with one nodata cell
+        function buildBinaryGrid() {
+            const buffer = new ArrayBuffer(48 + 6 * 2);
+            const view = new DataView(buffer);
+            'DGRD'.split('').forEach((c, i) => view.setUint8(i, c.charCodeAt(0)));
+            view.setUint16(4, 1, true);
+            view.setInt16(6, -32768, true);
+            view.setUint32(8, 2, true);
+            view.setUint32(12, 3, true);
+            view.setFloat64(16, 44.0, true);
+            view.setFloat64(24, -73.5, true);
+            view.setFloat64(32, 0.0018, true);
+            view.setFloat64(40, 0.0024, true);
+            new Int16Array(buffer, 48, 6).set([12, 25, -32768, 40, 51, 66]);
+            return buffer;
+        }
+
+        it('should parse the binary header and depths', () => {
+            const grid = parseDepthGridBinary(buildBinaryGrid());
+
+            expect(grid.rows).toBe(2);
+            expect(grid.cols).toBe(3);
+            expect(grid.south).toBe(44.0);
+            expect(grid.west).toBe(-73.5);
+            expect(grid.count).toBe(5);
+            expect(grid.depths[4]).toBe(51);
+        });
+
+        it('should reject files without the magic number', () => {
+            expect(() => parseDepthGridBinary(new ArrayBuffer(64))).toThrow();
+        });
+
+        it('should place legacy JSON points on the same lattice', () => {
+            const grid = depthGridFromJson({
+                metadata: { bounds: { south: 44.0, north: 44.0036, west: -73.5, east: -73.4952 } },
+                depth_grid: {
+                    g0: { lat: 44.0018, lng: -73.4976, depth: 5.12 }
+                }
+            });
+
+            expect(grid.rows).toBe(3);
+            expect(grid.cols).toBe(3);
+            expect(grid.count).toBe(1);
+            expect(grid.depths[1 * 3 + 1]).toBe(51);
+        });
+
+        it('should place JSON points by their recorded lattice row/col', () => {
+            const grid = depthGridFromJson({
+                metadata: {
+                    bounds: { south: 44.0, north: 44.0036, west: -73.5, east: -73.4952 },
+                    lattice: { south: 44.0, west: -73.5, latStep: 0.0018, lngStep: 0.0024, rows: 3, cols: 4 }
+                },
+                depth_grid: {
+                    g0: { lat: 44.0036, lng: -73.4928, row: 2, col: 3, depth: 2.5 }
+                }
+            });
+
+            expect(grid.cols).toBe(4);
+            expect(grid.count).toBe(1);
+            expect(grid.depths[2 * 4 + 3]).toBe(25);
+        });
+
+        it('should round JSON depths down to whole decimetres', () => {
+            const grid = depthGridFromJson({
+                metadata: {
+                    bounds: { south: 44.0, north: 44.0, west: -73.5, east: -73.4976 },
+                    lattice: { south: 44.0, west: -73.5, latStep: 0.0018, lngStep: 0.0024, rows: 1, cols: 2 }
+                },
+                depth_grid: {
+                    g0: { lat: 44.0, lng: -73.5, row: 0, col: 0, depth: 3.96 },
+                    g1: { lat: 44.0, lng: -73.4976, row: 0, col: 1, depth: 4.0 }
+                }
+            });
+
+            // 3.96 m must not pass a 4.0 m minimum depth as 40 dm
+            expect(grid.depths[0]).toBe(39);
+            expect(grid.depths[1]).toBe(40);
+        });
+    });
+
+    describe('navigability masks', () => {
+        // 2 x 5 lattice with masks for 0.0 m and 0.1 m
+        function buildMaskFile() {
+            const buffer = new ArrayBuffer(56 + 2 * 2);
+            const view = new DataView(buffer);
+            'NAVM'.split('').forEach((c, i) => view.setUint8(i, c.charCodeAt(0)));
+            view.setUint16(4, 1, true);
+            view.setUint16(6, 2, true);
+            view.setUint16(8, 0, true);
+            view.setUint16(10, 1, true);
+            view.setUint32(12, 2, true);
+            view.setUint32(16, 5, true);
+            view.setFloat64(20, 44.0, true);
+            view.setFloat64(28, -73.5, true);
+            view.setFloat64(36, 0.0018, true);
+            view.setFloat64(44, 0.0024, true);
+            new Uint8Array(buffer, 56, 4).set([0b11111111, 0b11, 0b01101111, 0b10]);
+            return buffer;
+        }
+
+        it('should parse one bit-packed mask per threshold', () => {
+            const masks = parseNavigabilityMasks(buildMaskFile());
+
+            expect(masks.rows).toBe(2);
+            expect(masks.cols).toBe(5);
+            expect(masks.thresholdStep).toBe(1);
+            expect(masks.masks.length).toBe(2);
+            // Cell 9 (row 1, col 4) is bit 1 of byte 1
+            expect((masks.masks[1][1] >> 1) & 1).toBe(1);
+            expect((masks.masks[1][0] >> 4) & 1).toBe(0);
+        });
+
+        it('should shrink the grid for deeper drafts without rebuilding water cells', () => {
+            const shallow = generateWaterGrid().length;
+
+            updateVesselSettings(2.5, 0.5);
+            const deep = generateWaterGrid();
+            updateVesselSettings(0.6, 0.3);
+
+            expect(deep.length).toBeLessThanOrEqual(shallow);
+            for (const point of deep) {
+                expect(point.depth === null || point.depth >= 3.0).toBe(true);
+            }
+            expect(generateWaterGrid().length).toBe(shallow);
+        });
+    });
+
+    describe('routing graph', () => {
+        it('should reject files without the magic number', () => {
+            expect(() => parseRoutingGraph(new ArrayBuffer(64))).toThrow();
+        });
+
+        it('should connect each grid point to its navigable graph neighbours', () => {
+            const grid = generateWaterGrid();
+            const { ROUTING_GRAPH } = require('../../js/navigation.js');
+            const point = grid[Math.floor(grid.length / 3)];
+            const degree = ROUTING_GRAPH.offsets[point.node + 1] - ROUTING_GRAPH.offsets[point.node];
+
+            expect(getNeighbors(point).length).toBeLessThanOrEqual(degree);
+            for (let edge = ROUTING_GRAPH.offsets[point.node]; edge < ROUTING_GRAPH.offsets[point.node + 1]; edge++) {
+                // Edges join lattice neighbours roughly 200-280 m apart
+                expect(ROUTING_GRAPH.lengths[edge]).toBeGreaterThan(0.15);
+                expect(ROUTING_GRAPH.lengths[edge]).toBeLessThan(0.3);
+            }
+        });
+    });
+
+    describe('landmark heuristic', () => {
+        it('should parse landmark costs per node', () => {
+            // 2 landmarks over 3 nodes
+            const buffer = new ArrayBuffer(56 + 2 * 4 + 2 * 3 * 2);
+            const view = new DataView(buffer);
+            [65, 76, 84, 76].forEach((byte, i) => view.setUint8(i, byte));  // "ALTL"
+            view.setUint16(4, 1, true);
+            view.setUint16(6, 2, true);
+            view.setUint32(8, 3, true);
+            view.setUint32(12, 4, true);
+            view.setFloat64(16, 0.01, true);
+            view.setFloat64(48, 0.8, true);
+            new Uint32Array(buffer, 56, 2).set([0, 2]);
+            new Uint16Array(buffer, 64, 6).set([0, 20, 0xFFFF, 40, 20, 0]);
+
+            const table = parseLandmarkTable(buffer);
+
+            expect(table.landmarkCount).toBe(2);
+            expect(table.penalties.verySharp).toBe(0.8);
+            expect(Array.from(table.landmarks)).toEqual([0, 2]);
+            expect(table.costs[1 * 3 + 1]).toBe(20);
+        });
+
+        it('should reject files without the magic number', () => {
+            expect(() => parseLandmarkTable(new ArrayBuffer(64))).toThrow();
+        });
+
+        it('should never fall below the straight-line distance', () => {
+            const grid = generateWaterGrid();
+            const end = grid[Math.floor(grid.length / 2)];
+            const heuristic = createRouteHeuristic(end);
+
+            expect(heuristic(end)).toBe(0);
+            for (let i = 0; i < grid.length; i += 211) {
+                const point = grid[i];
+                expect(heuristic(point)).toBeGreaterThanOrEqual(
+                    haversineDistance(point.lat, point.lng, end.lat, end.lng)
+                );
+            }
+        });
+    });
+
+    describe('shore clearance', () => {
+        it('should weight edges near shore and leave open water at plain length', () => {
+            const { distance, weight } = ROUTING_CONFIG.shoreClearance;
+
+            expect(calculateClearanceFactor(0)).toBeCloseTo(1 + weight);
+            expect(calculateClearanceFactor(distance / 2)).toBeCloseTo(1 + weight / 2);
+            expect(calculateClearanceFactor(distance)).toBe(1);
+            expect(calculateClearanceFactor(distance * 10)).toBe(1);
+        });
+    });
+
+    describe('route hierarchy', () => {
+        it('should parse entrances, abstract edges and cached paths', () => {
+            // 2 entrances joined both ways by one-step paths
+            const buffer = new ArrayBuffer(32 + 4 * (2 + 3 + 2 + 2 + 3 + 4));
+            const view = new DataView(buffer);
+            [72, 80, 65, 71].forEach((byte, i) => view.setUint8(i, byte));  // "HPAG"
+            view.setUint16(4, 1, true);
+            view.setUint16(6, 9, true);
+            view.setUint16(8, 16, true);
+            view.setUint32(12, 10, true);
+            view.setUint32(16, 30, true);
+            view.setUint32(20, 2, true);
+            view.setUint32(24, 2, true);
+            view.setUint32(28, 4, true);
+            new Uint32Array(buffer, 32, 7).set([3, 4, 0, 1, 2, 1, 0]);
+            new Float32Array(buffer, 60, 2).set([0.25, 0.25]);
+            new Uint32Array(buffer, 68, 7).set([0, 2, 4, 3, 4, 4, 3]);
+
+            const hierarchy = parseRouteHierarchy(buffer);
+
+            expect(hierarchy.minimumDepthDm).toBe(9);
+            expect(hierarchy.clusterSize).toBe(16);
+            expect(Array.from(hierarchy.entrances)).toEqual([3, 4]);
+            expect(Array.from(hierarchy.targets)).toEqual([1, 0]);
+            expect(hierarchy.costs[1]).toBe(0.25);
+            expect(Array.from(hierarchy.pathNodes.subarray(hierarchy.pathOffsets[1], hierarchy.pathOffsets[2])))
+                .toEqual([4, 3]);
+        });
+
+        it('should reject files without the magic number', () => {
+            expect(() => parseRouteHierarchy(new ArrayBuffer(64))).toThrow();
+        });
+    });
+
+    describe('grid lattice', () => {
+        it('should count rows and cols without float drift', () => {
+            const lattice = createGridLattice({
+                latStep: 0.0018,
+                lngStep: 0.0024,
+                bounds: { south: 43.53, north: 45.09, west: -73.52, east: -73.07 }
+            });
+
+            expect(lattice.rows).toBe(867);
+            expect(lattice.cols).toBe(188);
+        });
+
+        it('should index every water grid point by row/col', () => {
+            const grid = generateWaterGrid();
+            const { gridIndex } = require('../../js/navigation.js');
+
+            for (let i = 0; i < grid.length; i += 97) {
+                const point = grid[i];
+                expect(gridIndex[point.row * GRID_LATTICE.cols + point.col]).toBe(i);
+            }
+        });
     });
 
     describe('GRID_CONFIG constants', () => {
@@ -0,0 +1,72 @@
+/**
+ * Unit Tests for the Routing Service
+ *
+ * Tests route requests, progress and cancellation on the main-thread
+ * fallback (the test environment has no Web Workers)
+ * Run with: npm test (after setting up test runner)
+ */
+
+const RoutingService = require('../../js/routing-service.js');
+
+describe('RoutingService', () => {
+    let routedLegs;
+
+    beforeEach(() => {
+        routedLegs = [];
+        global.calculateWaterRoute = (startId, endId) => {
+            routedLegs.push([startId, endId]);
+            return { coordinates: [[44.5, -73.3], [44.6, -73.4]], distance: 12.5 };
+        };
+    });
+
+    it('should route on the main thread without worker support', () => {
+        expect(RoutingService.supported()).toBe(false);
+    });
+
+    it('should return one route per leg and report progress', async () => {
+        await RoutingService.init([]);
+        const progress = [];
+
+        const routes = await RoutingService.route(['a', 'b', 'c'], (legsDone, legs) => {
+            progress.push([legsDone, legs]);
+        });
+
+        expect(routes.length).toBe(2);
+        expect(routes[1].distance).toBe(12.5);
+        expect(routedLegs).toEqual([['a', 'b'], ['b', 'c']]);
+        expect(progress).toEqual([[1, 2], [2, 2]]);
+    });
+
+    it('should cancel a route when a newer one is requested', async () => {
+        await RoutingService.init([]);
+
+        const stale = RoutingService.route(['a', 'b', 'c', 'd']);
+        const current = RoutingService.route(['e', 'f']);
+
+        expect(await stale).toBeNull();
+        expect((await current).length).toBe(1);
+        expect(routedLegs).toEqual([['e', 'f']]);
+    });
+
+    it('should settle init and route in the page when the worker fails to start', async () => {
+        global.Worker = class {
+            postMessage(message) {
+                if (message.type === 'init') {
+                    setTimeout(() => this.onmessage({ data: { type: 'error', message: 'Routing graph missing' } }), 0);
+                }
+            }
+            terminate() {}
+        };
+
+        try {
+            expect(RoutingService.supported()).toBe(true);
+            await RoutingService.init([]);
+
+            const routes = await RoutingService.route(['a', 'b']);
+            expect(routes.length).toBe(1);
+            expect(routedLegs).toEqual([['a', 'b']]);
+        } finally {
+            delete global.Worker;
+        }
+    });
+});